@@ -0,0 +1,2 @@
+# Con este archivo en la raíz, pytest agrega la raíz a sys.path y los tests
+# pueden importar el paquete myquestions sin instalarlo.
@@ -0,0 +1,36 @@
+"""
+Preguntas de Programación con LLMs y sus generadores de casos de uso.
+
+    import myquestions
+
+    generador = myquestions.cargar_generador("matriz_transicion")
+    casos = generador.generate(100, size=10_000, seed=0)
+
+Importar el paquete solo lee el registro: pandas, numpy y sklearn se importan
+cuando se carga el generador de una pregunta que los usa.
+
+Línea de comandos (ver python -m myquestions --help):
+
+    python -m myquestions listar
+    python -m myquestions generar mejor_umbral_f1 -n 1000 --seed 0 --salida casos.pkl
+    python -m myquestions generar matriz_transicion -n 1000 --seed 0 --corpus corpus/
+"""
+from .registro import (
+    DEPENDENCIAS,
+    ENUNCIADOS,
+    PREGUNTAS,
+    cargar_generador,
+    enunciado,
+    escribir_casos,
+    iterar_casos,
+    leer_casos,
+)
+
+
+def __getattr__(nombre):
+    # Corpus (ver corpus.py) importa numpy: se carga solo si se usa
+    if nombre == "Corpus":
+        from .corpus import Corpus
+
+        return Corpus
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,112 @@
+import argparse
+import inspect
+import sys
+import time
+from contextlib import nullcontext
+
+from . import DEPENDENCIAS, PREGUNTAS, cargar_generador, escribir_casos, iterar_casos
+
+
+def _resumen(valor):
+    """
+    Descripción corta de un valor de input/output para imprimir en consola.
+    """
+    forma = getattr(valor, "shape", None)
+    if forma is not None:
+        return f"{type(valor).__name__}{tuple(forma)}"
+    if isinstance(valor, dict):
+        return "{" + ", ".join(f"{k}: {_resumen(v)}" for k, v in valor.items()) + "}"
+    if isinstance(valor, (list, tuple)) and len(valor) > 6:
+        return f"{type(valor).__name__}[{len(valor)}]"
+    texto = repr(valor)
+    return texto if len(texto) <= 60 else texto[:57] + "..."
+
+
+def listar(args):
+    for pregunta, generador in PREGUNTAS.items():
+        print(f"{pregunta:>22} | {generador} | dependencias: {', '.join(DEPENDENCIAS[pregunta])}")
+
+
+def generar(args):
+    """
+    Genera args.n casos en este proceso: el generador y sus dependencias se
+    importan una sola vez para todo el lote.
+    """
+    t0 = time.perf_counter()
+    generador = cargar_generador(args.pregunta)
+    segundos_carga = time.perf_counter() - t0
+
+    opciones = {}
+    if args.procesos is not None:
+        if "n_procesos" not in inspect.signature(generador.iterar_casos).parameters:
+            sys.exit(f"--procesos no aplica a {args.pregunta}")
+        opciones["n_procesos"] = args.procesos
+
+    cache = None
+    if args.cache:
+        from .cache_resultados import configurar_cache
+
+        cache = configurar_cache(args.cache)
+
+    perfil = nullcontext()
+    if args.perfil:
+        from .perfilado import SumideroJSONL, perfilar
+
+        perfil = perfilar(SumideroJSONL(args.perfil), memoria=args.memoria)
+
+    t0 = time.perf_counter()
+    with perfil:
+        casos = iterar_casos(args.pregunta, args.n, size=args.size, seed=args.seed, cache=cache, **opciones)
+        if args.corpus:
+            from .corpus import Corpus
+
+            corpus = Corpus(args.corpus, formato=args.formato)
+            n = len(corpus.agregar_casos(args.pregunta, casos, size=args.size, seed=args.seed))
+        elif args.salida:
+            n = escribir_casos(casos, args.salida)
+        else:
+            n = 0
+            for i, (input_data, output_data) in enumerate(casos):
+                print(f"caso {i}: input={_resumen(input_data)} | output={_resumen(output_data)}")
+                n += 1
+    segundos = time.perf_counter() - t0
+
+    print(
+        f"{n} casos de {args.pregunta} en {segundos:.2f} s "
+        f"({n / segundos if segundos > 0 else float('inf'):.1f} casos/s; carga del generador {segundos_carga:.2f} s)"
+        + (f" -> {args.corpus or args.salida}" if args.corpus or args.salida else ""),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m myquestions", description="Generadores de casos de uso de las preguntas."
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    parser_listar = subparsers.add_parser("listar", help="preguntas registradas y sus dependencias")
+    parser_listar.set_defaults(funcion=listar)
+
+    parser_generar = subparsers.add_parser("generar", help="genera casos de una pregunta")
+    parser_generar.add_argument("pregunta", choices=sorted(PREGUNTAS))
+    parser_generar.add_argument("-n", type=int, default=1, help="cantidad de casos")
+    parser_generar.add_argument("--size", type=int, default=None, help="tamaño de cada caso (filas/muestras)")
+    parser_generar.add_argument("--seed", type=int, default=None, help="semilla del lote")
+    parser_generar.add_argument("--procesos", type=int, default=None,
+                                help="procesos para el ground truth (solo mejor_k_kmeans)")
+    parser_generar.add_argument("--cache", default=None, help="directorio de la cache en disco del ground truth")
+    destino = parser_generar.add_mutually_exclusive_group()
+    destino.add_argument("--salida", default=None,
+                         help="archivo de casos (pickles consecutivos, ver leer_casos); "
+                              "sin --salida ni --corpus se imprime un resumen por caso")
+    destino.add_argument("--corpus", default=None,
+                         help="directorio de un corpus (ver corpus.Corpus) al que se agregan los casos")
+    parser_generar.add_argument("--formato", choices=("npy", "arrow"), default="npy",
+                                help="formato de las tablas del corpus (arrow requiere pyarrow)")
+    parser_generar.add_argument("--perfil", default=None, help="archivo JSON lines con el perfil por etapa de cada caso")
+    parser_generar.add_argument("--memoria", action="store_true", help="incluir el pico de memoria en el perfil")
+    parser_generar.set_defaults(funcion=generar)
+
+    args = parser.parse_args()
+    args.funcion(args)
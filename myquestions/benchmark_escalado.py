@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+import numpy as np
+import sklearn
+
+if not __package__:
+    # Corrido como script: los auxiliares se importan desde el paquete myquestions (PEP 366)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "myquestions"
+
+from .registro import PREGUNTAS, cargar_generador
+
+
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Tamaños por defecto por pregunta: (inicio, factor, pasos). KMeans + silhouette
+# es O(n²) por k, así que empieza más abajo.
+TAMANOS_POR_DEFECTO = {
+    "detectar_solapamientos": (1_000, 4, 5),
+    "matriz_transicion": (1_000, 4, 5),
+    "mejor_umbral_f1": (1_000, 4, 5),
+    "mejor_k_kmeans": (250, 2, 5),
+}
+
+# Segunda dimensión del trabajo: pasos de umbral (pregunta 3) y cantidad de k (pregunta 4)
+STEPS_UMBRAL = (0.1, 0.01)
+CANTIDADES_K = (2, 4)
+
+
+# Cálculos de ground truth que se miden por pregunta: el motor que usa el
+# generador y la implementación de referencia del enunciado (nombre -> función)
+MOTORES = {
+    "detectar_solapamientos": {
+        "columnar": "detectar_solapamientos_columnar",
+        "referencia": "detectar_solapamientos_referencia",
+    },
+    "matriz_transicion": {
+        "bincount": "matriz_transicion_bincount",
+        "referencia": "matriz_transicion_referencia",
+    },
+    "mejor_umbral_f1": {
+        "vectorizado": "mejor_umbral_f1_vectorizado",
+        "referencia": "mejor_umbral_f1_referencia",
+    },
+    "mejor_k_kmeans": {
+        "referencia": "mejor_k_kmeans_referencia",
+        "por_bloques": "mejor_k_kmeans_por_bloques",
+    },
+}
+
+
+def motores(pregunta):
+    """
+    Funciones de MOTORES de una pregunta, tomadas de su generador.
+    """
+    g = cargar_generador(pregunta)
+    return {nombre: getattr(g, funcion) for nombre, funcion in MOTORES[pregunta].items()}
+
+
+def entradas(pregunta, n, seed=0):
+    """
+    Entradas de tamaño n para una pregunta, con la dimensión de trabajo de cada una:
+
+    - preguntas 1 y 2: filas;
+    - pregunta 3: n × cantidad de umbrales (una entrada por step de STEPS_UMBRAL);
+    - pregunta 4: n × |k_values| (una entrada por cantidad de CANTIDADES_K).
+
+    Retorna:
+        list[tuple]: (input_data, parámetros, trabajo).
+    """
+    g = cargar_generador(pregunta)
+    if pregunta == "detectar_solapamientos":
+        return [(g.generar_entrada_detectar_solapamientos(size=n, seed=seed), {"filas": n}, n)]
+    if pregunta == "matriz_transicion":
+        return [(g.generar_entrada_matriz_transicion(size=n, seed=seed), {"filas": n}, n)]
+    if pregunta == "mejor_umbral_f1":
+        base = g.generar_entrada_mejor_umbral_f1(size=n, seed=seed)
+        casos = []
+        for step in STEPS_UMBRAL:
+            n_umbrales = len(g.generar_umbrales(step))
+            casos.append(({**base, "step": step}, {"n": n, "umbrales": n_umbrales}, n * n_umbrales))
+        return casos
+    base = g.generar_entrada_mejor_k_kmeans(size=n, seed=seed)
+    n_filas = len(base["X"])
+    return [
+        ({**base, "k_values": list(range(2, 2 + m))}, {"n": n_filas, "k": m}, n_filas * m)
+        for m in CANTIDADES_K
+    ]
+
+
+def medir(funcion, input_data, repeticiones=3):
+    """
+    Tiempo de pared (mínimo de `repeticiones` corridas) y pico de memoria
+    (tracemalloc en una corrida aparte, para no inflar el tiempo).
+
+    tracemalloc ve las asignaciones de Python y de numpy, no las internas de
+    BLAS/OpenMP; sirve para comparar tendencias entre commits.
+    """
+    segundos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion(**input_data)
+        segundos.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        funcion(**input_data)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(segundos), pico
+
+
+def ajustar_exponente(trabajo, valores):
+    """
+    Exponente empírico b de valores ≈ a * trabajo^b (mínimos cuadrados en log-log).
+    None si hay menos de dos puntos positivos.
+    """
+    trabajo = np.asarray(trabajo, dtype=float)
+    valores = np.asarray(valores, dtype=float)
+    validos = (trabajo > 0) & (valores > 0)
+    if validos.sum() < 2 or np.unique(trabajo[validos]).size < 2:
+        return None
+    return float(np.polyfit(np.log(trabajo[validos]), np.log(valores[validos]), 1)[0])
+
+
+def metadatos():
+    """
+    Contexto de la corrida para comparar resultados entre commits.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=_DIRECTORIO, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def benchmark_escalado(preguntas=None, inicio=None, factor=None, pasos=None, repeticiones=3,
+                       motores_elegidos=None, seed=0):
+    """
+    Corre cada motor de ground truth a tamaños geométricos inicio * factor^i
+    (i = 0..pasos-1) y ajusta el exponente de tiempo y de memoria respecto del
+    trabajo de cada pregunta (ver entradas).
+
+    Parámetros:
+        inicio, factor, pasos: tamaños; None usa TAMANOS_POR_DEFECTO de cada pregunta.
+        motores_elegidos (list[str]): nombres de motor a medir (por defecto todos).
+
+    Retorna:
+        dict: metadatos, mediciones (una fila por motor/tamaño) y ajustes
+            (exponentes por pregunta y motor).
+    """
+    mediciones = []
+    ajustes = []
+
+    for pregunta in preguntas or list(PREGUNTAS):
+        i0, f0, p0 = TAMANOS_POR_DEFECTO[pregunta]
+        tamanos = [int((inicio or i0) * (factor or f0) ** i) for i in range(pasos or p0)]
+
+        casos = [caso for n in tamanos for caso in entradas(pregunta, n, seed=seed)]
+        for nombre, funcion in motores(pregunta).items():
+            if motores_elegidos and nombre not in motores_elegidos:
+                continue
+
+            filas = []
+            for input_data, parametros, trabajo in casos:
+                segundos, pico = medir(funcion, input_data, repeticiones)
+                filas.append({
+                    "pregunta": pregunta, "motor": nombre, **parametros,
+                    "trabajo": trabajo, "segundos": segundos, "pico_memoria_bytes": pico,
+                })
+            mediciones.extend(filas)
+
+            ajustes.append({
+                "pregunta": pregunta,
+                "motor": nombre,
+                "exponente_tiempo": ajustar_exponente(
+                    [f["trabajo"] for f in filas], [f["segundos"] for f in filas]
+                ),
+                "exponente_memoria": ajustar_exponente(
+                    [f["trabajo"] for f in filas], [f["pico_memoria_bytes"] for f in filas]
+                ),
+            })
+
+    return {"metadatos": metadatos(), "mediciones": mediciones, "ajustes": ajustes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de escalado de los motores de ground truth.")
+    parser.add_argument("--pregunta", action="append", choices=sorted(PREGUNTAS),
+                        help="pregunta a medir (repetible); por defecto todas")
+    parser.add_argument("--motor", action="append", help="motor a medir (repetible); por defecto todos")
+    parser.add_argument("--inicio", type=int, default=None, help="tamaño inicial")
+    parser.add_argument("--factor", type=float, default=None, help="factor geométrico entre tamaños")
+    parser.add_argument("--pasos", type=int, default=None, help="cantidad de tamaños")
+    parser.add_argument("--repeticiones", type=int, default=3, help="corridas por medición (se toma el mínimo)")
+    parser.add_argument("--seed", type=int, default=0, help="semilla de las entradas")
+    parser.add_argument("--salida", default="benchmark_escalado.json", help="archivo JSON de resultados")
+    args = parser.parse_args()
+
+    resultado = benchmark_escalado(
+        args.pregunta, args.inicio, args.factor, args.pasos, args.repeticiones, args.motor, args.seed
+    )
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+    for fila in resultado["mediciones"]:
+        print(
+            f"{fila['pregunta']:>22} | {fila['motor']:>11} | trabajo={fila['trabajo']:>12,} | "
+            f"{fila['segundos']:.4f} s | pico={fila['pico_memoria_bytes'] / 1024 ** 2:.1f} MiB"
+        )
+    print()
+    for ajuste in resultado["ajustes"]:
+        exp_t, exp_m = ajuste["exponente_tiempo"], ajuste["exponente_memoria"]
+        print(
+            f"{ajuste['pregunta']:>22} | {ajuste['motor']:>11} | "
+            f"tiempo ~ trabajo^{exp_t if exp_t is None else round(exp_t, 2)} | "
+            f"memoria ~ trabajo^{exp_m if exp_m is None else round(exp_m, 2)}"
+        )
+    print(f"\nResultados en {args.salida}")
@@ -0,0 +1,242 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+
+import numpy as np
+
+
+def _actualizar_hash(h, valor):
+    """
+    Agrega valor al hash h de forma determinista según su contenido (no su
+    identidad): arrays por bytes + dtype + forma, DataFrames/Series con
+    pd.util.hash_pandas_object, contenedores recursivamente.
+
+    pandas no se importa aquí: si quien llama no lo cargó, valor no puede ser
+    un objeto de pandas (las preguntas 3 y 4 no lo necesitan).
+    """
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(valor, pd.DataFrame):
+        h.update(b"DataFrame")
+        h.update(repr([(str(c), str(t)) for c, t in valor.dtypes.items()]).encode())
+        h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+    elif pd is not None and isinstance(valor, (pd.Series, pd.Index)):
+        h.update(type(valor).__name__.encode())
+        h.update(repr((valor.name, str(valor.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(valor).to_numpy().tobytes())
+    elif isinstance(valor, np.ndarray):
+        h.update(repr(("ndarray", str(valor.dtype), valor.shape)).encode())
+        if valor.dtype == object:
+            import pandas as pd
+
+            h.update(pd.util.hash_array(valor.ravel()).tobytes())
+        else:
+            h.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        h.update(b"dict")
+        for k in sorted(valor, key=repr):
+            _actualizar_hash(h, k)
+            _actualizar_hash(h, valor[k])
+    elif isinstance(valor, (list, tuple)):
+        h.update(type(valor).__name__.encode() + str(len(valor)).encode())
+        for v in valor:
+            _actualizar_hash(h, v)
+    else:
+        h.update(repr((type(valor).__name__, valor)).encode())
+
+
+def clave_contenido(*partes, **parametros):
+    """
+    Clave sha256 (hex) del contenido de partes y parametros.
+    """
+    h = hashlib.sha256()
+    _actualizar_hash(h, partes)
+    _actualizar_hash(h, parametros)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def version_motor(funcion):
+    """
+    Hash (hex) del código del que depende funcion: el archivo de su módulo y
+    los módulos hermanos (mismo directorio) de los que ese módulo importa
+    funciones o clases, más el atributo opcional funcion.version_motor para
+    invalidar a mano. Si se edita el motor o un helper suyo, la clave de la
+    cache cambia y el ground truth se vuelve a calcular.
+
+    Se calcula una vez por función y proceso.
+    """
+    h = hashlib.sha256()
+    modulo = sys.modules.get(getattr(funcion, "__module__", None))
+    try:
+        ruta_modulo = inspect.getsourcefile(funcion)
+    except TypeError:
+        ruta_modulo = None
+
+    if modulo is None or ruta_modulo is None or not os.path.isfile(ruta_modulo):
+        # Sin archivo (por ejemplo, definida en el intérprete): su bytecode
+        codigo = getattr(funcion, "__code__", None)
+        h.update(repr((codigo.co_code, codigo.co_consts) if codigo else funcion).encode())
+    else:
+        directorio = os.path.dirname(os.path.abspath(ruta_modulo))
+        rutas = {os.path.abspath(ruta_modulo)}
+        for objeto in vars(modulo).values():
+            if inspect.isfunction(objeto) or inspect.isclass(objeto) or inspect.ismodule(objeto):
+                try:
+                    ruta = inspect.getsourcefile(objeto)
+                except TypeError:
+                    continue
+                if ruta is not None and os.path.isfile(ruta) and os.path.dirname(os.path.abspath(ruta)) == directorio:
+                    rutas.add(os.path.abspath(ruta))
+        for ruta in sorted(rutas):
+            h.update(os.path.basename(ruta).encode())
+            with open(ruta, "rb") as f:
+                h.update(f.read())
+
+    h.update(repr(getattr(funcion, "version_motor", None)).encode())
+    return h.hexdigest()
+
+
+def _es_npz(valor):
+    """
+    Un resultado va a .npz si es un dict de arrays/escalares numéricos con
+    claves str; lo demás (DataFrames, dicts anidados, matrices dispersas) va a
+    .pkl, que conserva exactamente los dtypes de pandas.
+    """
+    return isinstance(valor, dict) and len(valor) > 0 and all(
+        isinstance(k, str) and (
+            isinstance(v, (bool, int, float, np.generic))
+            or (isinstance(v, np.ndarray) and v.dtype != object)
+        )
+        for k, v in valor.items()
+    )
+
+
+class CacheResultados:
+    """
+    Cache en disco de resultados esperados (ground truth), direccionada por
+    contenido: la clave es un hash de las entradas y los parámetros, así que
+    volver a generar el mismo caso (misma semilla) no recalcula la salida.
+
+    Cada entrada es un archivo <clave>.npz (dicts de arrays/escalares) o
+    <clave>.pkl (DataFrames y el resto). Cuando el directorio supera max_bytes
+    se borran las entradas usadas hace más tiempo (mtime, que se actualiza en
+    cada acierto).
+    """
+
+    def __init__(self, directorio, max_bytes=512 * 1024 ** 2):
+        self.directorio = str(directorio)
+        self.max_bytes = int(max_bytes)
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, clave, extension):
+        return os.path.join(self.directorio, f"{clave}{extension}")
+
+    def obtener(self, clave):
+        """
+        Retorna (True, valor) si la clave está en la cache y (False, None) si no.
+        """
+        for extension in (".npz", ".pkl"):
+            ruta = self._ruta(clave, extension)
+            try:
+                if extension == ".npz":
+                    with np.load(ruta) as datos:
+                        valor = {k: datos[k].item() if datos[k].ndim == 0 else datos[k] for k in datos.files}
+                else:
+                    with open(ruta, "rb") as f:
+                        valor = pickle.load(f)
+            except FileNotFoundError:
+                continue
+            os.utime(ruta)
+            self.aciertos += 1
+            return True, valor
+
+        self.fallos += 1
+        return False, None
+
+    def guardar(self, clave, valor):
+        """
+        Escribe el valor (atómicamente: archivo temporal + os.replace) y aplica
+        el límite de tamaño.
+        """
+        extension = ".npz" if _es_npz(valor) else ".pkl"
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            if extension == ".npz":
+                np.savez(f, **valor)
+            else:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, self._ruta(clave, extension))
+        self.desalojar()
+
+    def desalojar(self):
+        """
+        Borra las entradas menos recientes hasta quedar en max_bytes o menos.
+        """
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith((".npz", ".pkl")):
+                estado = os.stat(os.path.join(self.directorio, nombre))
+                entradas.append((estado.st_mtime, estado.st_size, nombre))
+
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, nombre in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except FileNotFoundError:
+                pass
+            total -= tamano
+
+    def tamano_bytes(self):
+        return sum(
+            os.path.getsize(os.path.join(self.directorio, n))
+            for n in os.listdir(self.directorio) if n.endswith((".npz", ".pkl"))
+        )
+
+
+# Cache usada por defecto en los generadores (desactivada hasta configurar_cache)
+_CACHE_GLOBAL = None
+
+
+def configurar_cache(directorio, max_bytes=512 * 1024 ** 2):
+    """
+    Activa (o, con directorio=None, desactiva) la cache en disco global que
+    usan por defecto los generadores para su ground truth.
+
+    Retorna:
+        CacheResultados o None.
+    """
+    global _CACHE_GLOBAL
+    _CACHE_GLOBAL = CacheResultados(directorio, max_bytes) if directorio else None
+    return _CACHE_GLOBAL
+
+
+def calcular_con_cache(funcion, *args, cache=None, **kwargs):
+    """
+    funcion(*args, **kwargs), reutilizando el resultado guardado si ya se
+    calculó con las mismas entradas. La clave incluye el nombre de la función
+    (los motores de cada pregunta tienen nombres distintos) y su version_motor,
+    así que cambiar el código del motor no reutiliza resultados viejos.
+
+    Parámetros:
+        cache (CacheResultados): por defecto la global de configurar_cache
+            (cache=False la ignora).
+    """
+    if cache is None:
+        cache = _CACHE_GLOBAL
+    if not isinstance(cache, CacheResultados):
+        return funcion(*args, **kwargs)
+
+    clave = clave_contenido(funcion.__qualname__, version_motor(funcion), *args, **kwargs)
+    encontrado, valor = cache.obtener(clave)
+    if not encontrado:
+        valor = funcion(*args, **kwargs)
+        cache.guardar(clave, valor)
+    return valor
@@ -0,0 +1,445 @@
+import json
+import os
+import pickle
+import sys
+
+import numpy as np
+
+
+_MANIFIESTO = "manifiesto.jsonl"
+_CASOS = "casos"
+
+
+def _cargar_npy(ruta, mmap_mode):
+    """
+    np.load con mmap_mode, como ndarray (una vista que mantiene vivo el mapeo)
+    en vez de np.memmap, para que se compare y se comporte igual que el original.
+    """
+    valor = np.load(ruta, mmap_mode=mmap_mode)
+    return valor.view(np.ndarray) if isinstance(valor, np.memmap) else valor
+
+
+# ----- Tablas (DataFrames) -----
+
+# Formatos con los que se prueba reconstruir los strings de una columna de
+# fechas mixta (str y pd.Timestamp, como el timestamp de la pregunta 2)
+_FORMATOS_FECHA = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+# Etiquetas por fila de una columna de fechas mixta
+_ES_TIMESTAMP, _ES_TEXTO, _ES_NONE = 0, 1, 2
+
+
+def _codificar_fechas_mixtas(serie):
+    """
+    Si la columna object tiene solo str, pd.Timestamp (sin zona horaria, todos
+    con la misma unidad) y None, y cada string se reconstruye exactamente con
+    uno de _FORMATOS_FECHA, retorna (valores datetime64, etiquetas, formato).
+    Si no, retorna None.
+    """
+    import pandas as pd
+
+    valores = serie.to_numpy()
+    es_texto = np.fromiter((isinstance(v, str) for v in valores), dtype=bool, count=len(valores))
+    es_timestamp = np.fromiter((isinstance(v, pd.Timestamp) for v in valores), dtype=bool, count=len(valores))
+    es_none = np.fromiter((v is None for v in valores), dtype=bool, count=len(valores))
+    if not (es_texto | es_timestamp | es_none).all() or not es_texto.any():
+        return None
+
+    unidades = {v.unit for v in valores[es_timestamp]}
+    if len(unidades) > 1 or any(v.tz is not None for v in valores[es_timestamp]):
+        return None
+    unidad = unidades.pop() if unidades else "s"
+
+    codigos, textos = pd.factorize(valores[es_texto])
+    textos = np.asarray(textos, dtype=object)
+    for formato in _FORMATOS_FECHA:
+        parseadas = pd.to_datetime(pd.Index(textos, dtype=object), format=formato, errors="coerce")
+        if not parseadas.isna().any() and (parseadas.strftime(formato) == textos).all():
+            break
+    else:
+        return None
+
+    fechas = np.full(len(valores), np.datetime64("NaT"), dtype=f"datetime64[{unidad}]")
+    fechas[es_texto] = parseadas.to_numpy().astype(fechas.dtype)[codigos]
+    if es_timestamp.any():
+        fechas[es_timestamp] = np.array([v.to_datetime64() for v in valores[es_timestamp]], dtype=fechas.dtype)
+
+    etiquetas = np.full(len(valores), _ES_TIMESTAMP, dtype=np.uint8)
+    etiquetas[es_texto] = _ES_TEXTO
+    etiquetas[es_none] = _ES_NONE
+    return fechas, etiquetas, formato
+
+
+def _decodificar_fechas_mixtas(fechas, etiquetas, formato):
+    """
+    Inversa de _codificar_fechas_mixtas: columna object con los mismos str,
+    pd.Timestamp y None. Cada fecha distinta se formatea una sola vez.
+    """
+    import pandas as pd
+
+    codigos, unicas = pd.factorize(fechas)
+    indice = pd.DatetimeIndex(unicas)
+    textos = np.asarray(indice.strftime(formato), dtype=object)
+    timestamps = np.asarray(indice, dtype=object)
+
+    valores = np.where(etiquetas == _ES_TEXTO, textos[codigos], timestamps[codigos])
+    valores[etiquetas == _ES_NONE] = None
+    return valores
+
+
+def _guardar_columna(serie, base):
+    """
+    Escribe una columna y retorna su codificación:
+
+    - "npy": dtypes de numpy (números, bool, datetime64), un .npy que se lee con mmap;
+    - "diccionario": texto (StringDtype), códigos + valores únicos ordenados en .npy;
+      los códigos tienen el dtype que usa pd.Categorical para esa cantidad de
+      valores, así que se pueden leer como categorías sin copiarlos;
+    - "fecha_mixta": columnas object de str y pd.Timestamp (el timestamp de la
+      pregunta 2), como datetime64 + etiqueta por fila + formato de los strings;
+    - "pickle": lo demás (otras columnas object, otros dtypes de pandas).
+    """
+    import pandas as pd
+
+    if isinstance(serie.dtype, np.dtype) and serie.dtype != object:
+        np.save(base + ".npy", serie.to_numpy())
+        return "npy"
+
+    if isinstance(serie.dtype, pd.StringDtype):
+        categorias = pd.Categorical(serie)
+        np.save(base + ".codigos.npy", categorias.codes)
+        np.save(base + ".unicos.npy", np.asarray(categorias.categories, dtype=str))
+        return "diccionario"
+
+    if serie.dtype == object:
+        fechas_mixtas = _codificar_fechas_mixtas(serie)
+        if fechas_mixtas is not None:
+            fechas, etiquetas, formato = fechas_mixtas
+            np.save(base + ".npy", fechas)
+            np.save(base + ".etiquetas.npy", etiquetas)
+            np.save(base + ".formato.npy", np.array(formato))
+            return "fecha_mixta"
+
+    with open(base + ".pkl", "wb") as f:
+        pickle.dump(serie.array, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return "pickle"
+
+
+def _leer_columna(base, codificacion, dtype, mmap_mode, vistas):
+    """
+    Inversa de _guardar_columna. Las columnas "npy" quedan sobre el archivo
+    mapeado (sin copia). Con vistas=True el texto y las fechas mixtas también:
+    el texto como pd.Categorical sobre los códigos mapeados (categorías
+    ordenadas, así que ordenar da lo mismo que con los strings) y las fechas
+    mixtas como datetime64. Con vistas=False se reconstruyen el dtype y los
+    objetos originales (una copia en memoria).
+    """
+    import pandas as pd
+
+    if codificacion == "npy":
+        return _cargar_npy(base + ".npy", mmap_mode)
+
+    if codificacion == "diccionario":
+        codigos = _cargar_npy(base + ".codigos.npy", mmap_mode)
+        unicos = np.load(base + ".unicos.npy")
+        if vistas:
+            categorias = pd.CategoricalDtype(pd.Index(unicos.astype(object), dtype=dtype))
+            return pd.Categorical.from_codes(codigos, dtype=categorias, validate=False)
+        valores = unicos.astype(object)[np.where(codigos < 0, 0, codigos)] if len(unicos) else np.empty(len(codigos), dtype=object)
+        valores[codigos < 0] = dtype.na_value
+        return pd.arrays.StringArray(valores, dtype=dtype)
+
+    if codificacion == "fecha_mixta":
+        fechas = _cargar_npy(base + ".npy", mmap_mode)
+        if vistas:
+            return fechas
+        formato = str(np.load(base + ".formato.npy"))
+        return _decodificar_fechas_mixtas(fechas, np.load(base + ".etiquetas.npy"), formato)
+
+    with open(base + ".pkl", "rb") as f:
+        return pickle.load(f)
+
+
+def _guardar_tabla(df, carpeta, formato):
+    """
+    Guarda un DataFrame en `carpeta`: meta.pkl (etiquetas de columnas, índice
+    y dtypes) y los datos, una columna por archivo (formato "npy") o un solo
+    archivo Arrow IPC (formato "arrow", requiere pyarrow).
+
+    Si Arrow no puede representar alguna columna (object con tipos mezclados,
+    como el timestamp de la pregunta 2) la tabla se guarda en formato "npy".
+
+    Retorna:
+        str: formato con el que quedó guardada.
+    """
+    os.makedirs(carpeta)
+    meta = {"columnas": df.columns, "indice": df.index, "dtypes": list(df.dtypes)}
+
+    if formato == "arrow":
+        import pyarrow as pa
+
+        try:
+            # Columnas por posición: las etiquetas (que pueden no ser str) van en meta.pkl
+            tabla = pa.Table.from_pandas(df.set_axis([str(i) for i in range(df.shape[1])], axis=1),
+                                         preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            formato = "npy"
+        else:
+            with pa.OSFile(os.path.join(carpeta, "datos.arrow"), "wb") as f:
+                with pa.ipc.new_file(f, tabla.schema) as escritor:
+                    escritor.write_table(tabla)
+
+    if formato == "npy":
+        meta["codificacion"] = [
+            _guardar_columna(df.iloc[:, i], os.path.join(carpeta, f"c{i}")) for i in range(df.shape[1])
+        ]
+
+    with open(os.path.join(carpeta, "meta.pkl"), "wb") as f:
+        pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return formato
+
+
+def _leer_tabla(carpeta, formato, mmap_mode, vistas):
+    """
+    Inversa de _guardar_tabla. En formato "npy" las columnas de texto y de
+    fechas mixtas dependen de vistas (ver _leer_columna); en formato "arrow"
+    los dtypes siempre se restauran a los originales.
+    """
+    import pandas as pd
+
+    with open(os.path.join(carpeta, "meta.pkl"), "rb") as f:
+        meta = pickle.load(f)
+
+    if formato == "arrow":
+        import pyarrow as pa
+
+        # read_all sobre memory_map no copia los buffers; to_pandas con split_blocks
+        # deja las columnas numéricas sin nulos como vistas sobre ellos
+        fuente = pa.memory_map(os.path.join(carpeta, "datos.arrow"), "r")
+        df = pa.ipc.open_file(fuente).read_all().to_pandas(split_blocks=True)
+        columnas = {i: df.iloc[:, i] for i in range(df.shape[1])}
+        columnas = {
+            i: (serie if serie.dtype == dtype else serie.astype(dtype)).array
+            for (i, serie), dtype in zip(columnas.items(), meta["dtypes"])
+        }
+    else:
+        columnas = {
+            i: _leer_columna(os.path.join(carpeta, f"c{i}"), codificacion, dtype, mmap_mode, vistas)
+            for i, (codificacion, dtype) in enumerate(zip(meta["codificacion"], meta["dtypes"]))
+        }
+
+    df = pd.DataFrame(columnas, index=meta["indice"], copy=False)
+    df.columns = meta["columnas"]
+    return df
+
+
+# ----- Valores de un caso -----
+
+def _guardar_valor(valor, carpeta, nombre, objetos, formato):
+    """
+    Guarda un valor de input_data/output_data y retorna su descriptor (JSON).
+    Los archivos se nombran por la ruta del valor (input.X.npy, output/...):
+
+    - dict con claves str: {"tipo": "dict", "items": {clave: descriptor}};
+    - DataFrame: {"tipo": "tabla", ...} (ver _guardar_tabla);
+    - np.ndarray no object: {"tipo": "array", "archivo": ...} (.npy);
+    - str, bool, int, float, None: {"tipo": "valor", "valor": ...} en el manifiesto;
+    - lo demás (listas, dicts con claves int, escalares de numpy): en objetos.pkl.
+    """
+    # pandas no se importa aquí: si quien llama no lo cargó, valor no es un DataFrame
+    pd = sys.modules.get("pandas")
+
+    if isinstance(valor, dict) and all(isinstance(k, str) for k in valor):
+        return {
+            "tipo": "dict",
+            "items": {
+                k: _guardar_valor(v, carpeta, f"{nombre}.{k}", objetos, formato) for k, v in valor.items()
+            },
+        }
+    if pd is not None and isinstance(valor, pd.DataFrame):
+        formato = _guardar_tabla(valor, os.path.join(carpeta, nombre), formato)
+        return {"tipo": "tabla", "carpeta": nombre, "formato": formato}
+    if isinstance(valor, np.ndarray) and valor.dtype != object:
+        np.save(os.path.join(carpeta, nombre + ".npy"), valor)
+        return {"tipo": "array", "archivo": nombre + ".npy"}
+    if valor is None or type(valor) in (str, bool, int, float):
+        return {"tipo": "valor", "valor": valor}
+
+    objetos.append(valor)
+    return {"tipo": "objeto", "posicion": len(objetos) - 1}
+
+
+def _leer_valor(descriptor, carpeta, objetos, mmap_mode, vistas):
+    tipo = descriptor["tipo"]
+    if tipo == "dict":
+        return {k: _leer_valor(d, carpeta, objetos, mmap_mode, vistas) for k, d in descriptor["items"].items()}
+    if tipo == "tabla":
+        return _leer_tabla(os.path.join(carpeta, descriptor["carpeta"]), descriptor["formato"], mmap_mode, vistas)
+    if tipo == "array":
+        return _cargar_npy(os.path.join(carpeta, descriptor["archivo"]), mmap_mode)
+    if tipo == "valor":
+        return descriptor["valor"]
+    return objetos()[descriptor["posicion"]]
+
+
+class Corpus:
+    """
+    Corpus persistente de casos de uso: cada caso es una carpeta casos/<id>/
+    con sus arrays y columnas en .npy (o tablas en Arrow IPC) y una línea en
+    manifiesto.jsonl con la pregunta, los metadatos y la estructura de
+    input_data/output_data.
+
+    Al leer, los .npy se abren con np.load(mmap_mode=...): los arrays y las
+    columnas numéricas de los DataFrames quedan sobre las páginas del archivo,
+    sin copiarlos ni deserializarlos, y muchos procesos pueden leer el mismo
+    corpus compartiendo la cache de páginas del sistema. Con mmap_mode="c"
+    (por defecto) una solución que modifica su input escribe en una copia
+    privada, nunca en el corpus.
+
+    Con vistas=True (por defecto) las columnas de texto (pregunta 1 y estados
+    de la 2) se leen como pd.Categorical sobre los códigos mapeados y el
+    timestamp mixto de la pregunta 2 como datetime64 mapeado: ningún DataFrame
+    del corpus se copia. Con vistas=False se reconstruyen los dtypes y objetos
+    originales (str, mezcla de str y pd.Timestamp), que es lo que debe recibir
+    una solución del enunciado.
+
+    Agregar casos no reescribe nada: cada escritor reserva el id creando la
+    carpeta (os.mkdir falla si ya existe) y al final agrega su línea al
+    manifiesto en una sola escritura en modo append. Los lectores solo ven
+    los casos que ya están en el manifiesto (ver actualizar).
+    """
+
+    def __init__(self, directorio, formato="npy", mmap_mode="c", vistas=True):
+        if formato not in ("npy", "arrow"):
+            raise ValueError(f"formato debe ser 'npy' o 'arrow', no {formato!r}")
+        self.directorio = str(directorio)
+        self.formato = formato
+        self.mmap_mode = mmap_mode
+        self.vistas = vistas
+        self._entradas = {}
+        self._leido = 0
+        self.actualizar()
+
+    def _carpeta(self, id_caso):
+        return os.path.join(self.directorio, _CASOS, f"{id_caso:08d}")
+
+    def actualizar(self):
+        """
+        Lee las líneas nuevas del manifiesto (casos agregados por otros procesos
+        desde la última lectura). Una línea sin terminar se deja para después.
+        """
+        try:
+            with open(os.path.join(self.directorio, _MANIFIESTO), "rb") as f:
+                f.seek(self._leido)
+                datos = f.read()
+        except FileNotFoundError:
+            return
+
+        completas = datos[:datos.rfind(b"\n") + 1]
+        for linea in completas.splitlines():
+            if linea.strip():
+                entrada = json.loads(linea)
+                self._entradas[entrada["id"]] = entrada
+        self._leido += len(completas)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, id_caso):
+        return id_caso in self._entradas
+
+    def ids(self, pregunta=None):
+        """
+        Ids de los casos (de una pregunta, si se indica), en orden.
+        """
+        return sorted(i for i, e in self._entradas.items() if pregunta is None or e["pregunta"] == pregunta)
+
+    def entrada(self, id_caso):
+        """
+        Línea del manifiesto de un caso: id, pregunta, metadatos y descriptores.
+        """
+        if id_caso not in self._entradas:
+            self.actualizar()
+        return self._entradas[id_caso]
+
+    def leer(self, id_caso):
+        """
+        Retorna (input_data, output_data) de un caso, con los arrays mapeados
+        desde disco (ver la descripción de la clase).
+        """
+        entrada = self.entrada(id_caso)
+        carpeta = self._carpeta(id_caso)
+
+        cargados = []
+
+        def objetos():
+            # objetos.pkl solo se abre si el caso tiene valores que no son arrays ni tablas
+            if not cargados:
+                with open(os.path.join(carpeta, "objetos.pkl"), "rb") as f:
+                    cargados.append(pickle.load(f))
+            return cargados[0]
+
+        return (
+            _leer_valor(entrada["input"], carpeta, objetos, self.mmap_mode, self.vistas),
+            _leer_valor(entrada["output"], carpeta, objetos, self.mmap_mode, self.vistas),
+        )
+
+    def __getitem__(self, id_caso):
+        return self.leer(id_caso)
+
+    def __iter__(self):
+        for id_caso in self.ids():
+            yield self.leer(id_caso)
+
+    def agregar(self, pregunta, input_data, output_data, **metadatos):
+        """
+        Agrega un caso al corpus.
+
+        Retorna:
+            int: id del caso.
+        """
+        casos = os.path.join(self.directorio, _CASOS)
+        os.makedirs(casos, exist_ok=True)
+
+        # El id se reserva creando su carpeta: dos escritores no pueden tomar el mismo
+        id_caso = max(self._entradas, default=-1) + 1
+        while True:
+            try:
+                os.mkdir(self._carpeta(id_caso))
+                break
+            except FileExistsError:
+                id_caso += 1
+        carpeta = self._carpeta(id_caso)
+
+        objetos = []
+        entrada = {
+            "id": id_caso,
+            "pregunta": pregunta,
+            "metadatos": metadatos,
+            "input": _guardar_valor(input_data, carpeta, "input", objetos, self.formato),
+            "output": _guardar_valor(output_data, carpeta, "output", objetos, self.formato),
+        }
+        if objetos:
+            with open(os.path.join(carpeta, "objetos.pkl"), "wb") as f:
+                pickle.dump(objetos, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Una sola escritura en modo append: la línea entra completa al manifiesto
+        linea = (json.dumps(entrada, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(os.path.join(self.directorio, _MANIFIESTO), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, linea)
+        finally:
+            os.close(fd)
+
+        self._entradas[id_caso] = entrada
+        return id_caso
+
+    def agregar_casos(self, pregunta, casos, **metadatos):
+        """
+        Agrega una secuencia de (input_data, output_data), por ejemplo la de
+        iterar_casos de un generador, sin tenerla completa en memoria.
+
+        Retorna:
+            list[int]: ids de los casos agregados.
+        """
+        return [self.agregar(pregunta, i, o, **metadatos) for i, o in casos]
@@ -0,0 +1,206 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def ordenar_por_grupo(codigos, clave):
+    """
+    Orden estable por (grupo, clave), como sort_values por [grupo, tiempo].
+
+    Parámetros:
+        codigos (np.ndarray): código entero del grupo por fila (-1 si es nulo;
+            los nulos van al final).
+        clave (np.ndarray): clave int64 de orden dentro del grupo (los NaT ya
+            convertidos a un valor máximo para que queden al final).
+
+    Retorna:
+        np.ndarray: posiciones de las filas en el orden final.
+    """
+    if len(codigos) == 0:
+        return np.empty(0, dtype=np.int64)
+    clave_grupo = np.where(codigos < 0, codigos.max() + 1, codigos)
+    return np.lexsort((clave, clave_grupo))
+
+
+def _tarea_particion(rutas, desde_codigo, hasta_codigo, desde, periodos, relleno):
+    """
+    Tarea de un proceso: ordena las filas de los grupos con código en
+    [desde_codigo, hasta_codigo) (hasta_codigo None: hasta el final, más los
+    nulos) y, si hay valores, los desfasa dentro de cada grupo (la partición
+    tiene sus grupos enteros, así que el desfase local es el global).
+
+    Lee las entradas de los .npy compartidos (mapeados, sin copiarlas del
+    proceso principal) y escribe las salidas en el tramo [desde, desde + filas)
+    de los .npy de salida, que ya es su lugar en el orden final.
+    """
+    codigos = np.load(rutas["codigos"], mmap_mode="r")
+    clave = np.load(rutas["clave"], mmap_mode="r")
+
+    if hasta_codigo is None:
+        filas = np.flatnonzero((codigos >= desde_codigo) | (codigos < 0))
+    else:
+        filas = np.flatnonzero((codigos >= desde_codigo) & (codigos < hasta_codigo))
+    filas = filas[ordenar_por_grupo(codigos[filas], clave[filas])]
+    hasta = desde + len(filas)
+
+    orden = np.load(rutas["orden"], mmap_mode="r+")
+    orden[desde:hasta] = filas
+    orden.flush()
+
+    if "valores" in rutas:
+        valores = np.load(rutas["valores"], mmap_mode="r")
+        desfasados, validos = desfasar(codigos[filas], valores[filas], periodos, relleno)
+        for nombre, resultado in (("desfasados", desfasados), ("validos", validos)):
+            salida = np.load(rutas[nombre], mmap_mode="r+")
+            salida[desde:hasta] = resultado
+            salida.flush()
+
+
+def _rangos_de_grupos(codigos, n_particiones):
+    """
+    Parte los códigos de grupo en rangos contiguos con una cantidad parecida
+    de filas (los nulos van en el último).
+
+    Retorna:
+        list: (desde_codigo, hasta_codigo, desde_fila) por partición no vacía;
+            hasta_codigo es None en la última.
+    """
+    conteos = np.bincount(codigos + 1)  # posición 0: nulos
+    acumulado = np.cumsum(conteos[1:])
+    n_grupos = len(acumulado)
+
+    objetivos = np.arange(1, n_particiones) * (len(codigos) / n_particiones)
+    cortes = np.unique(np.clip(np.searchsorted(acumulado, objetivos) + 1, 1, n_grupos))
+    cortes = [0] + [int(c) for c in cortes if c < n_grupos] + [None]
+
+    rangos = []
+    for desde_codigo, hasta_codigo in zip(cortes[:-1], cortes[1:]):
+        desde_fila = int(acumulado[desde_codigo - 1]) if desde_codigo > 0 else 0
+        rangos.append((desde_codigo, hasta_codigo, desde_fila))
+    return rangos
+
+
+def _repartir(codigos, clave, valores, periodos, relleno, n_particiones, pool):
+    """
+    Parte paralela de ordenar_y_desfasar_paralelo: las entradas se escriben
+    una vez en .npy temporales que cada proceso abre con mmap, y cada proceso
+    escribe su orden (y su desfase) directamente en su tramo de los .npy de
+    salida; el proceso principal no reordena nada.
+    """
+    codigos = np.asarray(codigos, dtype=np.int64)
+    n = len(codigos)
+    rangos = _rangos_de_grupos(codigos, n_particiones)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        nombres = ("codigos", "clave", "orden") + (() if valores is None else ("valores", "desfasados", "validos"))
+        rutas = {nombre: os.path.join(carpeta, f"{nombre}.npy") for nombre in nombres}
+        np.save(rutas["codigos"], codigos)
+        np.save(rutas["clave"], np.asarray(clave))
+        salidas = {"orden": np.int64}
+        if valores is not None:
+            valores = np.asarray(valores)
+            np.save(rutas["valores"], valores)
+            salidas.update({"desfasados": valores.dtype, "validos": bool})
+        for nombre, dtype in salidas.items():
+            # .npy de salida del tamaño final: cada proceso escribe su tramo
+            np.lib.format.open_memmap(rutas[nombre], mode="w+", dtype=dtype, shape=(n,)).flush()
+
+        propio = pool is None
+        if propio:
+            pool = ProcessPoolExecutor(max_workers=len(rangos))
+        try:
+            tareas = [pool.submit(_tarea_particion, rutas, *rango, periodos, relleno) for rango in rangos]
+            for tarea in tareas:
+                tarea.result()
+        finally:
+            if propio:
+                pool.shutdown()
+
+        return tuple(np.load(rutas[nombre]) for nombre in salidas) + ((None, None) if valores is None else ())
+
+
+def ordenar_y_desfasar_paralelo(codigos, clave, valores=None, periodos=1, relleno=0, n_procesos=1, pool=None):
+    """
+    Orden estable por (grupo, clave) y desfase de valores dentro de cada grupo
+    (sort_values + groupby().shift), repartiendo los grupos entre procesos:
+
+    1) los códigos de grupo se parten en rangos contiguos con una cantidad
+       parecida de filas (los nulos, que van al final, en el último rango);
+    2) cada proceso ordena su rango por (grupo, clave) y desfasa sus valores,
+       leyendo y escribiendo en .npy compartidos (ver _repartir);
+    3) como los rangos están en orden de código, el tramo de cada proceso ya
+       es su lugar en el resultado: no hay que unir ni reordenar.
+
+    El resultado es el mismo que ordenar_por_grupo + desfasar en un proceso.
+    Solo compensa con varios núcleos y muchas filas: el arranque de los
+    procesos y la escritura de los .npy son un costo fijo por llamada.
+
+    Parámetros:
+        codigos, clave: como en ordenar_por_grupo.
+        valores (np.ndarray): valores a desfasar, en el orden original de las
+            filas; None solo ordena.
+        periodos, relleno: como en desfasar.
+        n_procesos (int): particiones; 1 calcula en el proceso actual y None
+            usa todos los núcleos.
+        pool (ProcessPoolExecutor): pool a reutilizar entre llamadas; por
+            defecto se abre uno por llamada.
+
+    Retorna:
+        orden (np.ndarray): posiciones de las filas en el orden final.
+        desfasados, validos (np.ndarray): como en desfasar, en el orden final
+            (None si valores es None).
+    """
+    n_particiones = n_procesos or os.cpu_count()
+    if n_particiones > 1 and len(codigos) > 0:
+        return _repartir(codigos, clave, valores, periodos, relleno, n_particiones, pool)
+
+    orden = ordenar_por_grupo(codigos, clave)
+    if valores is None:
+        return orden, None, None
+    desfasados, validos = desfasar(codigos[orden], np.asarray(valores)[orden], periodos, relleno)
+    return orden, desfasados, validos
+
+
+def ordenar_por_grupo_paralelo(codigos, clave, n_procesos=1, pool=None):
+    """
+    Mismo resultado que ordenar_por_grupo, repartiendo los grupos entre
+    procesos (ver ordenar_y_desfasar_paralelo).
+    """
+    return ordenar_y_desfasar_paralelo(codigos, clave, n_procesos=n_procesos, pool=pool)[0]
+
+
+def desfasar(codigos, valores, periodos=1, relleno=0):
+    """
+    Equivalente a groupby(grupo).shift(periodos) sobre arrays ya ordenados por
+    grupo: el valor de la fila i - periodos si es del mismo grupo (no nulo).
+
+    Como los grupos son tramos contiguos, basta comparar el código de la fila
+    con el de la fila desplazada; no hace falta recorrer los grupos.
+
+    Parámetros:
+        codigos (np.ndarray): código de grupo por fila, en el orden ordenado (-1 si es nulo).
+        valores (np.ndarray): valores a desfasar, en el mismo orden.
+        periodos (int): como en shift: 1 es la fila anterior, -1 la siguiente.
+        relleno: valor para las filas sin vecino válido.
+
+    Retorna:
+        desfasados (np.ndarray): valores desplazados (relleno donde no hay vecino).
+        validos (np.ndarray): filas con vecino en el mismo grupo.
+    """
+    n = len(valores)
+    k = abs(int(periodos))
+    desfasados = np.full(n, relleno, dtype=np.asarray(valores).dtype)
+    validos = np.zeros(n, dtype=bool)
+    if k >= n:
+        return desfasados, validos
+
+    if periodos >= 0:
+        destino, origen = slice(k, n), slice(0, n - k)
+    else:
+        destino, origen = slice(0, n - k), slice(k, n)
+
+    validos[destino] = (codigos[destino] == codigos[origen]) & (codigos[destino] >= 0)
+    desfasados[destino] = np.where(validos[destino], valores[origen], relleno)
+    return desfasados, validos
@@ -0,0 +1,266 @@
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+
+
+# Formatos ISO con ruta rápida: (formato para pd.to_datetime, regex que deben cumplir todos los strings)
+FORMATOS_ISO = [
+    ("%Y-%m-%d %H:%M:%S", r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"),
+    ("%Y-%m-%dT%H:%M:%S", r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"),
+    ("%Y-%m-%d %H:%M", r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}"),
+    ("%Y-%m-%d", r"\d{4}-\d{2}-\d{2}"),
+]
+
+# dtype con el que pandas devuelve fechas parseadas (ns en pandas 2, us en pandas 3)
+_DTYPE_DATETIME = pd.to_datetime(pd.Series(["2000-01-01 00:00:00"]), format="%Y-%m-%d %H:%M:%S").dtype
+
+
+class CacheFechas:
+    """
+    Cache LRU de strings ya parseados, compartida entre llamadas a parsear_fechas.
+
+    Solo guarda valores parseados con un formato ISO conocido (la clave es
+    (texto, formato)), porque con inferencia de formato el mismo texto puede
+    interpretarse distinto según el resto de la columna.
+    """
+
+    def __init__(self, max_entradas=100_000):
+        self.max_entradas = int(max_entradas)
+        self.aciertos = 0
+        self.fallos = 0
+        self._valores = OrderedDict()
+
+    def __len__(self):
+        return len(self._valores)
+
+    def parsear(self, textos, formato):
+        """
+        Retorna un array datetime64 con el valor de cada texto, parseando solo
+        los que no están en la cache.
+        """
+        resultado = np.empty(len(textos), dtype=_DTYPE_DATETIME)
+        faltantes = []
+
+        for i, texto in enumerate(textos):
+            clave = (texto, formato)
+            if clave in self._valores:
+                self._valores.move_to_end(clave)
+                resultado[i] = self._valores[clave]
+                self.aciertos += 1
+            else:
+                faltantes.append(i)
+
+        if faltantes:
+            self.fallos += len(faltantes)
+            nuevos = pd.to_datetime(
+                pd.Series([textos[i] for i in faltantes], dtype=object), errors="coerce", format=formato
+            ).to_numpy().astype(_DTYPE_DATETIME)
+            resultado[faltantes] = nuevos
+
+            for i, valor in zip(faltantes, nuevos):
+                self._valores[(textos[i], formato)] = valor
+            while len(self._valores) > self.max_entradas:
+                self._valores.popitem(last=False)
+
+        return resultado
+
+
+# Cache opcional usada por defecto en parsear_fechas (desactivada hasta configurar_cache)
+_CACHE_GLOBAL = None
+
+
+def configurar_cache(max_entradas=100_000):
+    """
+    Activa (o, con max_entradas=None/0, desactiva) la cache LRU global que usan
+    por defecto los pipelines de solapamientos y de transiciones.
+
+    Retorna:
+        CacheFechas o None.
+    """
+    global _CACHE_GLOBAL
+    _CACHE_GLOBAL = CacheFechas(max_entradas) if max_entradas else None
+    return _CACHE_GLOBAL
+
+
+def formato_iso(valores):
+    """
+    Formato ISO que cumplen todos los strings de valores (los no-strings, como
+    pd.Timestamp, se ignoran), o None si no hay uno común.
+    """
+    textos = pd.Series([v for v in valores if isinstance(v, str)], dtype=object)
+    if len(textos) == 0:
+        return None
+
+    for formato, regex in FORMATOS_ISO:
+        if textos.str.fullmatch(regex).all():
+            return formato
+    return None
+
+
+def _parsear_textos(unicos, formato, cache):
+    """
+    Parseo de strings únicos con un formato ISO conocido, por la cache si hay.
+    """
+    if isinstance(cache, CacheFechas):
+        return cache.parsear(list(unicos), formato)
+    return pd.to_datetime(
+        pd.Series(unicos, dtype=object), errors="coerce", format=formato
+    ).to_numpy().astype(_DTYPE_DATETIME)
+
+
+def _parsear_unicos(serie, cache):
+    """
+    Ruta por valores distintos de parsear_fechas: factorize, parseo de los
+    únicos (con format ISO explícito si aplica) y reparto con los códigos.
+    """
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) == 0:
+        return None
+    unicos = np.asarray(unicos, dtype=object)
+    formato = formato_iso(unicos)
+
+    if formato is not None:
+        valores = pd.array(_parsear_textos(unicos, formato, cache))
+    else:
+        valores = pd.to_datetime(pd.Series(unicos, dtype=object), errors="coerce").array
+
+    # El código -1 (nulo) toma el valor faltante del dtype (NaT, también con zona horaria)
+    return pd.api.extensions.take(valores, codigos, allow_fill=True)
+
+
+def _parsear_mixta(serie, cache):
+    """
+    Ruta de parsear_fechas para columnas object que mezclan strings con
+    pd.Timestamp/datetime (el time_col de la pregunta 2): solo los strings se
+    deduplican y pasan por la cache; los demás valores se convierten directo
+    con pd.to_datetime, sin hashear cada Timestamp.
+
+    Retorna None (y decide pd.to_datetime sobre la columna completa) si los
+    strings no cumplen un formato ISO común o si los demás valores no dan el
+    mismo dtype que los strings (otra unidad, zona horaria).
+    """
+    valores = serie.to_numpy()
+    es_texto = np.frompyfunc(type, 1, 1)(valores) == str
+    codigos, unicos = pd.factorize(valores[es_texto])
+    formato = formato_iso(unicos)
+    if formato is None:
+        return None
+
+    directos = pd.to_datetime(pd.Series(valores[~es_texto], dtype=object), errors="coerce")
+    if directos.dtype != _DTYPE_DATETIME:
+        return None
+
+    resultado = np.empty(len(valores), dtype=_DTYPE_DATETIME)
+    resultado[es_texto] = _parsear_textos(np.asarray(unicos, dtype=object), formato, cache)[codigos]
+    resultado[~es_texto] = directos.to_numpy()
+    return resultado
+
+
+def parsear_fechas(serie, cache=None):
+    """
+    Equivalente a pd.to_datetime(serie, errors="coerce"), pero parseando solo
+    los valores distintos:
+
+    1) pd.factorize de la columna (códigos + valores únicos en orden de aparición,
+       así la inferencia de formato ve el mismo primer valor que con la columna entera);
+    2) parseo de los únicos, con format explícito si todos los strings cumplen un
+       formato ISO conocido (ruta rápida) y con inferencia si no;
+    3) los resultados se reparten a las filas con los códigos (nulos -> NaT).
+
+    Las columnas object que mezclan strings con pd.Timestamp/datetime (como el
+    time_col de la pregunta 2) se separan por tipo: solo los strings se
+    deduplican (factorizar la columna completa hashearía cada Timestamp) y
+    el resto va directo a pd.to_datetime (ver _parsear_mixta). Para strings en
+    formatos ISO el resultado es idéntico al de pd.to_datetime sobre la
+    columna completa.
+
+    Parámetros:
+        cache (CacheFechas): cache LRU opcional; por defecto la global de
+            configurar_cache (cache=False la ignora).
+
+    Retorna:
+        pd.Series datetime64 con el mismo índice y nombre.
+    """
+    serie = pd.Series(serie) if not isinstance(serie, pd.Series) else serie
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    if cache is None:
+        cache = _CACHE_GLOBAL
+
+    tipo = pd.api.types.infer_dtype(serie, skipna=True)
+    if tipo == "empty":
+        return pd.to_datetime(serie, errors="coerce")
+
+    if serie.dtype == object and tipo != "string":
+        parseados = _parsear_mixta(serie, cache)
+    else:
+        parseados = _parsear_unicos(serie, cache)
+    if parseados is None:
+        return pd.to_datetime(serie, errors="coerce")
+    return pd.Series(parseados, index=serie.index, name=serie.name)
+
+
+def _mejor_tiempo(funcion, repeticiones):
+    segundos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        segundos.append(time.perf_counter() - t0)
+    return min(segundos)
+
+
+def benchmark_parseo(n_filas=1_000_000, n_unicos=2_000, seed=0, repeticiones=5):
+    """
+    Compara pd.to_datetime contra parsear_fechas sobre columnas repetitivas
+    (mínimo de `repeticiones` corridas):
+
+    - "iso": strings "YYYY-MM-DD HH:MM:SS" con n_unicos valores distintos;
+    - "mixta": la misma columna con ~40% de los valores como pd.Timestamp
+      (como el time_col del generador de transiciones); solo se deduplican
+      los strings, así que la aceleración es menor que en "iso".
+
+    Retorna:
+        list[dict]: por columna, segundos con pd.to_datetime, con parsear_fechas,
+            con parsear_fechas y cache caliente, aceleración y si coinciden.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp("2026-02-01 08:00:00")
+    momentos = base + pd.to_timedelta(np.sort(rng.integers(0, 60 * 24 * 30, size=n_unicos)), unit="min")
+    textos = np.asarray(momentos.strftime("%Y-%m-%d %H:%M:%S"), dtype=object)
+
+    idx = rng.integers(0, n_unicos, size=n_filas)
+    iso = pd.Series(textos[idx], dtype=object)
+    mixta = iso.copy()
+    como_timestamp = rng.random(n_filas) < 0.4
+    mixta[como_timestamp] = pd.Series(momentos[idx[como_timestamp]], dtype=object).to_numpy()
+
+    resultados = []
+    for nombre, columna in [("iso", iso), ("mixta", mixta)]:
+        esperado = pd.to_datetime(columna, errors="coerce")
+        obtenido = parsear_fechas(columna, cache=False)
+        segundos_pandas = _mejor_tiempo(lambda: pd.to_datetime(columna, errors="coerce"), repeticiones)
+        segundos_unicos = _mejor_tiempo(lambda: parsear_fechas(columna, cache=False), repeticiones)
+
+        cache = CacheFechas()
+        parsear_fechas(columna, cache=cache)
+        segundos_cache = _mejor_tiempo(lambda: parsear_fechas(columna, cache=cache), repeticiones)
+
+        resultados.append({
+            "columna": nombre,
+            "n_filas": n_filas,
+            "n_unicos": n_unicos,
+            "segundos_to_datetime": segundos_pandas,
+            "segundos_unicos": segundos_unicos,
+            "segundos_cache": segundos_cache,
+            "aceleracion": segundos_pandas / segundos_unicos,
+            "coincide": esperado.equals(obtenido),
+        })
+
+    return resultados
+
+
+if __name__ == "__main__":
+    for fila in benchmark_parseo():
+        print(fila)
@@ -0,0 +1,152 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+# Contexto vacío reutilizable: lo que retornan etapa() y caso() sin perfilador activo
+_NULO = nullcontext()
+
+# Perfilador activo (None = instrumentación desactivada, costo de una comparación)
+_PERFILADOR_ACTIVO = None
+
+
+class SumideroMemoria:
+    """
+    Guarda los reportes en una lista (self.reportes).
+    """
+
+    def __init__(self):
+        self.reportes = []
+
+    def escribir(self, reporte):
+        self.reportes.append(reporte)
+
+
+class SumideroJSONL:
+    """
+    Agrega cada reporte como una línea JSON al final de un archivo.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = str(ruta)
+
+    def escribir(self, reporte):
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(reporte, ensure_ascii=False) + "\n")
+
+
+class Perfilador:
+    """
+    Tiempos (y opcionalmente pico de memoria) por etapa con nombre, agrupados
+    en un reporte por caso que se envía a un sumidero.
+
+    Las etapas se pueden anidar; si una etapa se repite dentro del mismo caso
+    (por ejemplo, un KMeans por k) se suman sus tiempos y se cuentan las llamadas.
+    La memoria se mide con tracemalloc como pico por encima de lo asignado al
+    entrar a la etapa.
+    """
+
+    def __init__(self, sumidero=None, memoria=False):
+        self.sumidero = sumidero if sumidero is not None else SumideroMemoria()
+        self.memoria = memoria
+        self._caso = None
+        self._pila = []  # por etapa abierta: [memoria al entrar, pico visto en etapas hijas]
+
+    @contextmanager
+    def caso(self, pregunta, **metadatos):
+        """
+        Agrupa las etapas de un caso y, al salir, envía el reporte al sumidero.
+        Un caso dentro de otro (un generador que llama a otro) se suma al de afuera.
+        """
+        if self._caso is not None:
+            yield
+            return
+
+        self._caso = {"pregunta": pregunta, **metadatos, "etapas": {}}
+        t0 = time.perf_counter()
+        try:
+            with self.etapa("total"):
+                yield
+        finally:
+            reporte, self._caso = self._caso, None
+            reporte["segundos_total"] = time.perf_counter() - t0
+            self.sumidero.escribir(reporte)
+
+    @contextmanager
+    def etapa(self, nombre):
+        """
+        Mide el bloque como la etapa `nombre` del caso actual (fuera de un caso no mide).
+        """
+        if self._caso is None:
+            yield
+            return
+
+        if self.memoria:
+            actual, pico_previo = tracemalloc.get_traced_memory()
+            # El pico de la etapa padre se conserva antes de reiniciarlo
+            if self._pila:
+                self._pila[-1][1] = max(self._pila[-1][1], pico_previo)
+            tracemalloc.reset_peak()
+            self._pila.append([actual, 0])
+
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - t0
+            registro = self._caso["etapas"].setdefault(nombre, {"segundos": 0.0, "llamadas": 0})
+            registro["segundos"] += segundos
+            registro["llamadas"] += 1
+
+            if self.memoria:
+                inicio, pico_hijas = self._pila.pop()
+                pico = max(tracemalloc.get_traced_memory()[1], pico_hijas)
+                registro["pico_memoria_bytes"] = max(registro.get("pico_memoria_bytes", 0), pico - inicio)
+                if self._pila:
+                    self._pila[-1][1] = max(self._pila[-1][1], pico)
+
+
+def etapa(nombre):
+    """
+    Etapa del perfilador activo; sin perfilador, un contexto vacío.
+    """
+    if _PERFILADOR_ACTIVO is None:
+        return _NULO
+    return _PERFILADOR_ACTIVO.etapa(nombre)
+
+
+def caso(pregunta, **metadatos):
+    """
+    Caso del perfilador activo (ver Perfilador.caso); sin perfilador, un contexto vacío.
+    """
+    if _PERFILADOR_ACTIVO is None:
+        return _NULO
+    return _PERFILADOR_ACTIVO.caso(pregunta, **metadatos)
+
+
+@contextmanager
+def perfilar(sumidero=None, memoria=False):
+    """
+    Activa la instrumentación de los generadores dentro del bloque:
+
+        with perfilar(SumideroJSONL("perfil.jsonl"), memoria=True) as perfilador:
+            generate(10, size=1_000_000)
+
+    Retorna (en el with):
+        Perfilador: con su sumidero (por defecto un SumideroMemoria).
+    """
+    global _PERFILADOR_ACTIVO
+    anterior = _PERFILADOR_ACTIVO
+    perfilador = Perfilador(sumidero, memoria)
+
+    iniciar_memoria = memoria and not tracemalloc.is_tracing()
+    if iniciar_memoria:
+        tracemalloc.start()
+    _PERFILADOR_ACTIVO = perfilador
+    try:
+        yield perfilador
+    finally:
+        _PERFILADOR_ACTIVO = anterior
+        if iniciar_memoria:
+            tracemalloc.stop()
@@ -1,19 +1,470 @@
+import os
+import sys
+import time
+
 import pandas as pd
 import numpy as np
 
+if not __package__:
+    # Corrido como script: los auxiliares se importan desde el paquete myquestions (PEP 366)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "myquestions"
+
+from .desfase_grupos import desfasar, ordenar_y_desfasar_paralelo
+from .cache_resultados import calcular_con_cache
+from .parseo_fechas import parsear_fechas
+from .perfilado import caso, etapa
+
+
+# Resolución con la que pandas parsea "YYYY-MM-DD HH:MM" (ns en pandas 2, us en pandas 3);
+# el motor columnar la usa para devolver exactamente el mismo dtype que la referencia.
+_DTYPE_DATETIME = pd.to_datetime(pd.Series(["2000-01-01 00:00"])).dtype
+
+# Valor int64 que numpy interpreta como NaT al verlo como datetime64
+_NAT_INT = np.iinfo(np.int64).min
+
 
-def generar_caso_de_uso_detectar_solapamientos():
+def detectar_solapamientos_referencia(df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col):
     """
-    Genera un caso de uso aleatorio (input/output esperado) para la función:
+    Implementación directa del enunciado (strftime + concatenación + to_datetime,
+    sort_values y groupby().shift). Se conserva para verificar el motor columnar.
+    """
+    expected = df.copy()
 
-        detectar_solapamientos(df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col)
+    with etapa("to_datetime"):
+        # Convertir fecha a datetime y combinar con hora
+        fecha_dt = pd.to_datetime(expected[fecha_col], errors="coerce")
+        # Combinar fecha + hora (asumimos formato HH:MM)
+        inicio_dt = pd.to_datetime(
+            fecha_dt.dt.strftime("%Y-%m-%d") + " " + expected[hora_inicio_col].astype(str),
+            errors="coerce",
+        )
+        expected["inicio_dt"] = inicio_dt
+
+        # fin_dt
+        expected["fin_dt"] = expected["inicio_dt"] + pd.to_timedelta(expected[duracion_min_col].astype(int), unit="m")
+
+    # ordenar
+    with etapa("sort_values"):
+        expected = expected.sort_values(by=[paciente_col, "inicio_dt"], ascending=[True, True]).reset_index(drop=True)
+
+    # fin anterior por paciente
+    with etapa("groupby_shift"):
+        fin_anterior = expected.groupby(paciente_col)["fin_dt"].shift(1)
+
+    # solapamiento
+    expected["solapada"] = (expected["inicio_dt"] < fin_anterior).fillna(False).astype(bool)
+
+    return expected
+
+
+def _minutos_fecha(serie):
+    """
+    Fecha -> minutos desde epoch al inicio del día (int64, _NAT_INT si es nula).
+    El parseo pasa por la capa compartida parsear_fechas (un parseo por fecha
+    distinta), con el mismo resultado que pd.to_datetime(errors="coerce").
+    """
+    dias = parsear_fechas(serie).to_numpy().astype("datetime64[D]")
+    minutos = dias.astype("datetime64[m]").astype(np.int64)
+    minutos[np.isnat(dias)] = _NAT_INT
+    return minutos
+
+
+def _minutos_hora(serie):
+    """
+    "HH:MM" -> minutos desde medianoche (int64), leyendo los códigos de carácter
+    directamente (un array unicode de ancho 5 visto como uint32). Solo se leen
+    las horas distintas (pd.factorize) y se reparten con los códigos.
+    Retorna None si alguna hora es nula o no cumple exactamente el formato.
+    """
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) == 0 or np.any(codigos < 0):
+        return None
+
+    texto = pd.Series(unicos).astype(str).to_numpy(dtype="U")
+    if texto.dtype.itemsize != 5 * 4:
+        return None
+
+    chars = texto.view(np.uint32).reshape(-1, 5).astype(np.int64)
+    digitos = chars[:, [0, 1, 3, 4]] - ord("0")
+    if not (np.all((digitos >= 0) & (digitos <= 9)) and np.all(chars[:, 2] == ord(":"))):
+        return None
+
+    horas = digitos[:, 0] * 10 + digitos[:, 1]
+    mins = digitos[:, 2] * 10 + digitos[:, 3]
+    if np.any(horas > 23) or np.any(mins > 59):
+        return None
+
+    return (horas * 60 + mins)[codigos]
+
+
+def _citas_ordenadas(df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col, n_procesos=1, pool=None):
+    """
+    Parte común de los motores columnares: ordena las citas y calcula inicio/fin.
+
+    - fecha (vía parsear_fechas) y hora se llevan a minutos desde epoch (int64);
+    - los pacientes se codifican como categorías ordenadas (pd.factorize);
+    - ordenar_y_desfasar_paralelo ordena por (paciente, inicio) de forma estable,
+      NaT al final, y trae el fin de la cita anterior del mismo paciente (con
+      n_procesos != 1, repartiendo pacientes entre procesos o en pool).
+
+    Si la hora no tiene el formato "HH:MM", inicio_dt/fin_dt salen de la
+    referencia y los arrays quedan en la unidad de su dtype.
+
+    Retorna:
+        expected (pd.DataFrame): citas ordenadas, índice reiniciado, con inicio_dt y fin_dt.
+        codigos (np.ndarray): código de paciente por fila (-1 si es nulo).
+        inicio, fin (np.ndarray): int64 en una unidad común.
+        es_nat (np.ndarray): filas sin inicio válido.
+        fin_anterior, con_anterior (np.ndarray): fin de la cita anterior del
+            mismo paciente y si existe (groupby().shift(1)).
+    """
+    n = len(df)
+    with etapa("parseo_fechas"):
+        minutos_fecha = _minutos_fecha(df[fecha_col]) if n else None
+    with etapa("parseo_horas"):
+        minutos_hora = _minutos_hora(df[hora_inicio_col]) if n else None
+
+    if minutos_fecha is None or minutos_hora is None:
+        expected = detectar_solapamientos_referencia(
+            df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col
+        ).drop(columns="solapada")
+        codigos, _ = pd.factorize(expected[paciente_col], sort=True)
+        inicio = expected["inicio_dt"].to_numpy().view(np.int64)
+        fin = expected["fin_dt"].to_numpy().view(np.int64)
+        return (expected, codigos, inicio, fin, inicio == _NAT_INT) + desfasar(codigos, fin, periodos=1)
+
+    es_nat = minutos_fecha == _NAT_INT
+    inicio = np.where(es_nat, _NAT_INT, minutos_fecha + minutos_hora)
+    duracion = df[duracion_min_col].astype(int).to_numpy(dtype=np.int64)
+    fin = np.where(es_nat, _NAT_INT, inicio + duracion)
+
+    # Pacientes nulos (código -1) van al final, como en sort_values
+    with etapa("orden"):
+        codigos, _ = pd.factorize(df[paciente_col], sort=True)
+        clave_inicio = np.where(es_nat, np.iinfo(np.int64).max, inicio)
+        orden, fin_anterior, con_anterior = ordenar_y_desfasar_paralelo(
+            codigos, clave_inicio, fin, periodos=1, n_procesos=n_procesos, pool=pool
+        )
+
+    inicio = inicio[orden]
+    fin = fin[orden]
+
+    with etapa("reordenar_filas"):
+        expected = df.take(orden).reset_index(drop=True)
+        expected["inicio_dt"] = inicio.view("datetime64[m]").astype(_DTYPE_DATETIME)
+        expected["fin_dt"] = fin.view("datetime64[m]").astype(_DTYPE_DATETIME)
+    return expected, codigos[orden], inicio, fin, es_nat[orden], fin_anterior, con_anterior
+
+
+def detectar_solapamientos_columnar(df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col, n_procesos=1,
+                                    pool=None):
+    """
+    Mismo resultado que detectar_solapamientos_referencia, sin el ida y vuelta
+    por strings (ver _citas_ordenadas). El fin anterior sale del desfase por
+    arrays (el equivalente de groupby().shift(1)).
+
+    Parámetros:
+        n_procesos (int): procesos para el orden y el desfase por paciente (1
+            por defecto; None usa todos los núcleos). El resultado no cambia.
+        pool (ProcessPoolExecutor): pool a reutilizar entre llamadas.
+    """
+    expected, codigos, inicio, fin, es_nat, fin_anterior, con_anterior = _citas_ordenadas(
+        df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col, n_procesos, pool
+    )
+
+    # Los NaT quedan al final de cada paciente: si la fila actual es válida, la anterior también
+    with etapa("desfase"):
+        expected["solapada"] = con_anterior & ~es_nat & (inicio < fin_anterior)
+    return expected
+
+
+def detectar_solapamientos_barrido(df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col, pares=False):
+    """
+    Modo "todas las superposiciones" (barrido / sweep-line).
+
+    Una cita queda solapada si empieza antes del MÁXIMO fin de todas las citas
+    anteriores del mismo paciente, no solo de la inmediatamente anterior; así
+    una cita larga que cubre varias posteriores las marca a todas.
+
+    Como las citas de cada paciente están ordenadas por inicio, las que chocan
+    con la cita i son un rango contiguo: desde i + 1 hasta la primera que empieza
+    en o después de fin_i (un searchsorted). Por eso los pares se generan en
+    O(n log n + conflictos), sin comparar todas contra todas por paciente.
+
+    Parámetros:
+        pares (bool): si es True, también retorna los pares en conflicto.
+
+    Retorna:
+        expected (pd.DataFrame): mismas columnas que detectar_solapamientos.
+        pares_df (pd.DataFrame, solo si pares=True): columnas i, j (posiciones en
+            expected, i < j) para cada par del mismo paciente con inicio_j < fin_i.
+    """
+    expected, codigos, inicio, fin, es_nat, _, _ = _citas_ordenadas(
+        df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col
+    )
+    n = len(expected)
+    solapada = np.zeros(n, dtype=bool)
+    pos = np.flatnonzero(~es_nat & (codigos >= 0))
+
+    pares_i = np.empty(0, dtype=np.int64)
+    pares_j = np.empty(0, dtype=np.int64)
+
+    if len(pos) > 0:
+        grupo = codigos[pos].astype(np.int64)
+        base = min(inicio[pos].min(), fin[pos].min())
+        inicio_rel = inicio[pos] - base
+        fin_rel = fin[pos] - base
+        rango = max(inicio_rel.max(), fin_rel.max()) + 1
+
+        # Claves grupo * rango + tiempo: cummax y searchsorted no cruzan pacientes.
+        # Si no caben en int64, se comprimen los tiempos a su rango denso.
+        if (int(grupo.max()) + 1) * int(rango) >= 2 ** 62:
+            valores = np.unique(np.concatenate([inicio_rel, fin_rel]))
+            inicio_rel = np.searchsorted(valores, inicio_rel)
+            fin_rel = np.searchsorted(valores, fin_rel)
+            rango = len(valores)
+
+        clave_inicio = grupo * rango + inicio_rel
+        clave_fin = grupo * rango + fin_rel
+
+        # Máximo fin acumulado de las citas anteriores del mismo paciente
+        max_fin = np.maximum.accumulate(clave_fin)
+        mismo_paciente = grupo[1:] == grupo[:-1]
+        solapada[pos[1:]] = mismo_paciente & (clave_inicio[1:] < max_fin[:-1])
+
+        if pares:
+            k = np.arange(len(pos))
+            limite = np.searchsorted(clave_inicio, clave_fin, side="left")
+            cuantos = np.maximum(limite - (k + 1), 0)
+
+            i = np.repeat(k, cuantos)
+            inicio_bloque = np.repeat(np.cumsum(cuantos) - cuantos, cuantos)
+            j = i + 1 + (np.arange(len(i)) - inicio_bloque)
+            pares_i, pares_j = pos[i], pos[j]
+
+    expected["solapada"] = solapada
+    if pares:
+        return expected, pd.DataFrame({"i": pares_i, "j": pares_j})
+    return expected
+
+
+def _minutos_cita(fecha, hora):
+    """
+    Minutos desde epoch de una sola cita (fecha YYYY-MM-DD o datetime, hora HH:MM).
+    """
+    if isinstance(fecha, str):
+        dia = np.datetime64(fecha, "D")
+    else:
+        dia = np.datetime64(pd.Timestamp(fecha).normalize().date(), "D")
+    if np.isnat(dia):
+        raise ValueError(f"Fecha inválida: {fecha!r}")
+
+    h, m = str(hora).split(":")
+    return int(dia.astype("datetime64[m]").astype(np.int64)) + int(h) * 60 + int(m)
+
+
+class IndiceSolapamientos:
+    """
+    Índice incremental de solapamientos para un flujo de citas (altas y cancelaciones).
+
+    Mantiene, por paciente, las claves (inicio, id) de sus citas en una
+    sortedcontainers.SortedList (inserción, borrado y acceso por posición en
+    O(log n)). El id es el orden de llegada, así que los empates de inicio se
+    resuelven igual que el sort estable del cálculo por lotes. Al agregar o
+    cancelar una cita solo cambian su bandera y la de la cita siguiente del
+    mismo paciente.
+
+    to_frame() devuelve exactamente lo que detectar_solapamientos daría sobre
+    las citas vigentes.
+    """
+
+    def __init__(self, paciente_col="paciente_id", fecha_col="fecha",
+                 hora_inicio_col="hora_inicio", duracion_min_col="duracion_min"):
+        # Solo el modo incremental la necesita: no se importa al cargar el generador
+        from sortedcontainers import SortedList
+
+        self._lista_ordenada = SortedList
+        self.paciente_col = paciente_col
+        self.fecha_col = fecha_col
+        self.hora_inicio_col = hora_inicio_col
+        self.duracion_min_col = duracion_min_col
+
+        self._siguiente_id = 0
+        self._filas = {}         # id -> dict con las columnas originales
+        self._inicio = {}        # id -> minutos desde epoch
+        self._fin = {}           # id -> minutos desde epoch
+        self._solapada = {}      # id -> bool
+        self._por_paciente = {}  # paciente -> SortedList de (inicio, id)
+
+    def __len__(self):
+        return len(self._filas)
+
+    def _recalcular(self, claves, pos):
+        """
+        Recalcula la bandera de claves[pos] contra la cita anterior; retorna
+        {id: bandera} si cambió.
+        """
+        if pos >= len(claves):
+            return {}
+        inicio, id_cita = claves[pos]
+        nueva = pos > 0 and inicio < self._fin[claves[pos - 1][1]]
+        if self._solapada.get(id_cita) == nueva:
+            return {}
+        self._solapada[id_cita] = nueva
+        return {id_cita: nueva}
+
+    def agregar(self, cita):
+        """
+        Agrega una cita (dict o pd.Series con las columnas originales).
+
+        Retorna:
+            dict: id de la cita, su bandera solapada y cambios {id: bandera}
+                de otras citas cuya bandera cambió.
+        """
+        fila = dict(cita)
+        inicio = _minutos_cita(fila[self.fecha_col], fila[self.hora_inicio_col])
+        fin = inicio + int(fila[self.duracion_min_col])
+
+        id_cita = self._siguiente_id
+        self._siguiente_id += 1
+        self._filas[id_cita] = fila
+        self._inicio[id_cita] = inicio
+        self._fin[id_cita] = fin
+
+        claves = self._por_paciente.get(fila[self.paciente_col])
+        if claves is None:
+            claves = self._por_paciente[fila[self.paciente_col]] = self._lista_ordenada()
+        claves.add((inicio, id_cita))
+        pos = claves.bisect_left((inicio, id_cita))
+
+        self._recalcular(claves, pos)
+        cambios = self._recalcular(claves, pos + 1)
+        return {"id": id_cita, "solapada": self._solapada[id_cita], "cambios": cambios}
+
+    def cancelar(self, id_cita):
+        """
+        Cancela una cita por id.
+
+        Retorna:
+            dict: cambios {id: bandera} de las citas cuya bandera cambió.
+        """
+        fila = self._filas.pop(id_cita)
+        paciente = fila[self.paciente_col]
+        inicio = self._inicio.pop(id_cita)
+        del self._fin[id_cita]
+        del self._solapada[id_cita]
+
+        claves = self._por_paciente[paciente]
+        pos = claves.bisect_left((inicio, id_cita))
+        del claves[pos]
+        if len(claves) == 0:
+            del self._por_paciente[paciente]
+            return {"cambios": {}}
+
+        return {"cambios": self._recalcular(claves, pos)}
+
+    def solapada(self, id_cita):
+        return self._solapada[id_cita]
+
+    def to_frame(self):
+        """
+        Mismo DataFrame que detectar_solapamientos sobre las citas vigentes.
+        """
+        ids = [id_cita for paciente in sorted(self._por_paciente) for _, id_cita in self._por_paciente[paciente]]
+
+        expected = pd.DataFrame([self._filas[i] for i in ids])
+        inicio = np.array([self._inicio[i] for i in ids], dtype=np.int64)
+        fin = np.array([self._fin[i] for i in ids], dtype=np.int64)
+        expected["inicio_dt"] = inicio.view("datetime64[m]").astype(_DTYPE_DATETIME)
+        expected["fin_dt"] = fin.view("datetime64[m]").astype(_DTYPE_DATETIME)
+        expected["solapada"] = np.array([self._solapada[i] for i in ids], dtype=bool)
+        return expected
+
+
+def benchmark_reproduccion_incremental(df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col,
+                                       prob_cancelar=0.1, seed=None):
+    """
+    Reproduce las filas de df como un flujo de eventos (altas y, con probabilidad
+    prob_cancelar, la cancelación de una cita vigente) y compara:
+
+    - incremental: IndiceSolapamientos, un evento a la vez;
+    - lotes: detectar_solapamientos_columnar recalculado tras cada evento.
+
+    Retorna:
+        dict: n_eventos, segundos_incremental, segundos_lotes y coincide
+            (to_frame() igual al cálculo por lotes al final del flujo).
+    """
+    rng = np.random.default_rng(seed)
+    filas = df.to_dict(orient="records")
+
+    # Guión de eventos: ("alta", fila) o ("baja", posición entre las citas vigentes)
+    eventos = []
+    vigentes = 0
+    for fila in filas:
+        eventos.append(("alta", fila))
+        vigentes += 1
+        if vigentes > 1 and rng.random() < prob_cancelar:
+            eventos.append(("baja", int(rng.integers(0, vigentes))))
+            vigentes -= 1
+
+    indice = IndiceSolapamientos(paciente_col, fecha_col, hora_inicio_col, duracion_min_col)
+    ids_vigentes = []
+    t0 = time.perf_counter()
+    for tipo, dato in eventos:
+        if tipo == "alta":
+            ids_vigentes.append(indice.agregar(dato)["id"])
+        else:
+            indice.cancelar(ids_vigentes.pop(dato))
+    segundos_incremental = time.perf_counter() - t0
+
+    filas_vigentes = []
+    t0 = time.perf_counter()
+    for tipo, dato in eventos:
+        if tipo == "alta":
+            filas_vigentes.append(dato)
+        else:
+            filas_vigentes.pop(dato)
+        lotes = detectar_solapamientos_columnar(
+            pd.DataFrame(filas_vigentes), paciente_col, fecha_col, hora_inicio_col, duracion_min_col
+        )
+    segundos_lotes = time.perf_counter() - t0
+
+    return {
+        "n_eventos": len(eventos),
+        "segundos_incremental": segundos_incremental,
+        "segundos_lotes": segundos_lotes,
+        "coincide": indice.to_frame().equals(lotes),
+    }
+
+
+def _textos_por_codigo(codigos, formatear):
+    """
+    Strings para un array de códigos enteros formateando solo los valores
+    distintos (pd.factorize) y repartiéndolos con take.
+    """
+    codigos_unicos, unicos = pd.factorize(codigos)
+    textos = np.array([formatear(v) for v in unicos.tolist()], dtype=object)
+    return textos[codigos_unicos]
+
+
+def generar_entrada_detectar_solapamientos(size=None, seed=None):
+    """
+    Input aleatorio de un caso de uso de detectar_solapamientos (pasos 1 a 4 de
+    generar_caso_de_uso_detectar_solapamientos), sin calcular el ground truth.
+
+    Parámetros:
+        size (int): número de citas (filas); por defecto 3 a 7 pacientes con
+            4 a 9 citas cada uno. Con size, los pacientes se ajustan para
+            tener 4 a 9 citas en promedio.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
 
     Retorna:
         input_data (dict): Diccionario con las claves esperadas por la función solución.
-        output_data (pd.DataFrame): DataFrame esperado tras aplicar la lógica del enunciado.
     """
 
-    rng = np.random.default_rng()  # aleatorio distinto en cada ejecución
+    rng = np.random.default_rng(seed)  # aleatorio distinto en cada ejecución, salvo con seed
 
     # ------------------------------------------------------------
     # 1) Definir nombres de columnas (pueden ser fijos; lo importante es que sean coherentes)
@@ -26,15 +477,19 @@ def generar_caso_de_uso_detectar_solapamientos():
     # ------------------------------------------------------------
     # 2) Generar datos aleatorios realistas
     # ------------------------------------------------------------
-    n_pacientes = int(rng.integers(3, 8))          # 3 a 7 pacientes
     citas_por_paciente = int(rng.integers(4, 10)) # 4 a 9 citas por paciente
-    total_citas = n_pacientes * citas_por_paciente
+    if size is None:
+        n_pacientes = int(rng.integers(3, 8))      # 3 a 7 pacientes
+        total_citas = n_pacientes * citas_por_paciente
+    else:
+        total_citas = int(size)
+        n_pacientes = max(1, -(-total_citas // citas_por_paciente))
 
-    pacientes = [f"P{str(i).zfill(3)}" for i in range(1, n_pacientes + 1)]
+    pacientes = np.array([f"P{str(i).zfill(3)}" for i in range(1, n_pacientes + 1)], dtype=object)
 
-    # Rango de fechas (dentro de 7 días)
+    # Rango de fechas (dentro de 7 días), como días desde base_date
     base_date = pd.Timestamp("2026-02-01") + pd.Timedelta(days=int(rng.integers(0, 20)))
-    fechas = [base_date + pd.Timedelta(days=int(rng.integers(0, 7))) for _ in range(total_citas)]
+    dias = rng.integers(0, 7, size=total_citas)
 
     # Horas de inicio en minutos desde 08:00 hasta 17:30 (pasos de 5 min)
     start_min_candidates = np.arange(8 * 60, 17 * 60 + 31, 5)
@@ -44,20 +499,8 @@ def generar_caso_de_uso_detectar_solapamientos():
     duration_candidates = np.arange(10, 91, 5)
     duraciones = rng.choice(duration_candidates, size=total_citas, replace=True)
 
-    # Asignar paciente a cada cita (balanceado)
-    paciente_list = []
-    for p in pacientes:
-        paciente_list.extend([p] * citas_por_paciente)
-    rng.shuffle(paciente_list)
-
-    df = pd.DataFrame(
-        {
-            paciente_col: paciente_list,
-            fecha_col: [d.strftime("%Y-%m-%d") for d in fechas],  # string YYYY-MM-DD
-            hora_inicio_col: [f"{m//60:02d}:{m%60:02d}" for m in start_minutes],
-            duracion_min_col: duraciones.astype(int),
-        }
-    )
+    # Asignar paciente a cada cita (balanceado; con size el último puede tener menos)
+    codigo_paciente = rng.permutation(np.repeat(np.arange(n_pacientes), citas_por_paciente)[:total_citas])
 
     # ------------------------------------------------------------
     # 3) Forzar que haya al menos un solapamiento en algunos casos
@@ -65,22 +508,29 @@ def generar_caso_de_uso_detectar_solapamientos():
     # ------------------------------------------------------------
     if total_citas >= 6 and rng.random() < 0.85:
         # Elegimos un paciente y dos de sus citas para crear solapamiento
-        p = rng.choice(pacientes)
-        idxs = df.index[df[paciente_col] == p].to_list()
+        p = int(rng.integers(0, n_pacientes))
+        idxs = np.flatnonzero(codigo_paciente == p)
         if len(idxs) >= 2:
             i1, i2 = rng.choice(idxs, size=2, replace=False)
 
             # Poner ambas citas el mismo día
-            same_day = base_date + pd.Timedelta(days=int(rng.integers(0, 7)))
-            df.loc[i1, fecha_col] = same_day.strftime("%Y-%m-%d")
-            df.loc[i2, fecha_col] = same_day.strftime("%Y-%m-%d")
+            dias[[i1, i2]] = int(rng.integers(0, 7))
 
             # Definir una hora base y asegurar solapamiento:
             # cita 1: empieza 09:00 dura 60, cita 2: empieza 09:30 dura 30 => solapa
-            df.loc[i1, hora_inicio_col] = "09:00"
-            df.loc[i1, duracion_min_col] = 60
-            df.loc[i2, hora_inicio_col] = "09:30"
-            df.loc[i2, duracion_min_col] = 30
+            start_minutes[[i1, i2]] = [9 * 60, 9 * 60 + 30]
+            duraciones[[i1, i2]] = [60, 30]
+
+    df = pd.DataFrame(
+        {
+            paciente_col: pacientes[codigo_paciente],
+            fecha_col: _textos_por_codigo(  # string YYYY-MM-DD
+                dias, lambda d: (base_date + pd.Timedelta(days=d)).strftime("%Y-%m-%d")
+            ),
+            hora_inicio_col: _textos_por_codigo(start_minutes, lambda m: f"{m//60:02d}:{m%60:02d}"),
+            duracion_min_col: duraciones.astype(int),
+        }
+    )
 
     # ------------------------------------------------------------
     # 4) Construir INPUT
@@ -93,42 +543,78 @@ def generar_caso_de_uso_detectar_solapamientos():
         "duracion_min_col": duracion_min_col,
     }
 
-    # ------------------------------------------------------------
-    # 5) Calcular OUTPUT esperado (Ground Truth)
-    #    Replicamos la lógica del enunciado:
-    #    - inicio_dt = fecha + hora
-    #    - fin_dt = inicio_dt + duración
-    #    - ordenar por paciente, inicio_dt
-    #    - solapada = inicio_dt < fin_dt_anterior por paciente
-    # ------------------------------------------------------------
-    expected = df.copy()
+    return input_data
 
-    # Convertir fecha a datetime y combinar con hora
-    fecha_dt = pd.to_datetime(expected[fecha_col], errors="coerce")
-    # Combinar fecha + hora (asumimos formato HH:MM)
-    inicio_dt = pd.to_datetime(
-        fecha_dt.dt.strftime("%Y-%m-%d") + " " + expected[hora_inicio_col].astype(str),
-        errors="coerce",
-    )
-    expected["inicio_dt"] = inicio_dt
 
-    # fin_dt
-    expected["fin_dt"] = expected["inicio_dt"] + pd.to_timedelta(expected[duracion_min_col].astype(int), unit="m")
+def generar_caso_de_uso_detectar_solapamientos(size=None, seed=None, cache=None):
+    """
+    Genera un caso de uso aleatorio (input/output esperado) para la función:
 
-    # ordenar
-    expected = expected.sort_values(by=[paciente_col, "inicio_dt"], ascending=[True, True]).reset_index(drop=True)
+        detectar_solapamientos(df, paciente_col, fecha_col, hora_inicio_col, duracion_min_col)
 
-    # fin anterior por paciente
-    fin_anterior = expected.groupby(paciente_col)["fin_dt"].shift(1)
+    Todo el caso se sintetiza con arrays (sin Timedelta/strftime por fila): las
+    fechas y horas se formatean una vez por valor distinto.
 
-    # solapamiento
-    expected["solapada"] = (expected["inicio_dt"] < fin_anterior).fillna(False).astype(bool)
+    Parámetros:
+        size (int): número de citas (filas); por defecto 3 a 7 pacientes con
+            4 a 9 citas cada uno. Con size, los pacientes se ajustan para
+            tener 4 a 9 citas en promedio.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
+        cache (CacheResultados): cache en disco del ground truth; por defecto la
+            global de cache_resultados.configurar_cache (cache=False la ignora).
 
-    output_data = expected
+    Retorna:
+        input_data (dict): Diccionario con las claves esperadas por la función solución.
+        output_data (pd.DataFrame): DataFrame esperado tras aplicar la lógica del enunciado.
+    """
+
+    with caso("detectar_solapamientos", size=size):
+        with etapa("entrada"):
+            input_data = generar_entrada_detectar_solapamientos(size=size, seed=seed)
+
+        # ------------------------------------------------------------
+        # 5) Calcular OUTPUT esperado (Ground Truth)
+        #    Replicamos la lógica del enunciado:
+        #    - inicio_dt = fecha + hora
+        #    - fin_dt = inicio_dt + duración
+        #    - ordenar por paciente, inicio_dt
+        #    - solapada = inicio_dt < fin_dt_anterior por paciente
+        #    Se usa el motor columnar (minutos int64 + lexsort), que devuelve el
+        #    mismo DataFrame que detectar_solapamientos_referencia.
+        # ------------------------------------------------------------
+        with etapa("ground_truth"):
+            output_data = calcular_con_cache(detectar_solapamientos_columnar, cache=cache, **input_data)
 
     return input_data, output_data
 
 
+def iterar_casos(n_cases, size=None, seed=None, cache=None):
+    """
+    Mismos casos que generate (mismas semillas), uno a la vez: para lotes
+    grandes que se escriben a disco sin tenerlos todos en memoria.
+    """
+    for semilla in np.random.SeedSequence(seed).spawn(int(n_cases)):
+        yield generar_caso_de_uso_detectar_solapamientos(size=size, seed=semilla, cache=cache)
+
+
+def generate(n_cases, size=None, seed=None, cache=None):
+    """
+    Genera n_cases casos de uso de detectar_solapamientos.
+
+    Parámetros:
+        size (int): citas por caso (ver generar_caso_de_uso_detectar_solapamientos);
+            puede llegar a millones de filas para pruebas de carga.
+        seed (int): semilla del lote; cada caso usa una semilla derivada
+            (SeedSequence.spawn), así el lote completo es reproducible.
+        cache (CacheResultados): cache en disco del ground truth (ver calcular_con_cache).
+
+    Retorna:
+        list[tuple]: (input_data, output_data) por caso.
+    """
+    return list(iterar_casos(n_cases, size=size, seed=seed, cache=cache))
+
+
 if __name__ == "__main__":
     entrada, salida_esperada = generar_caso_de_uso_detectar_solapamientos()
 
@@ -145,4 +631,25 @@ if __name__ == "__main__":
     print(salida_esperada.head(10))
 
     # Conteo de solapadas para ver que no sea trivial
-    print("\nSolapadas:", int(salida_esperada["solapada"].sum()))
\ No newline at end of file
+    print("\nSolapadas:", int(salida_esperada["solapada"].sum()))
+
+    # Verificación rápida contra la implementación con strings + groupby().shift
+    referencia = detectar_solapamientos_referencia(
+        entrada["df"], entrada["paciente_col"], entrada["fecha_col"],
+        entrada["hora_inicio_col"], entrada["duracion_min_col"],
+    )
+    print("Coincide con la referencia:", referencia.equals(salida_esperada))
+
+    # Modo barrido: compara contra el máximo fin acumulado y lista los pares en conflicto
+    barrido, pares_conflicto = detectar_solapamientos_barrido(
+        entrada["df"], entrada["paciente_col"], entrada["fecha_col"],
+        entrada["hora_inicio_col"], entrada["duracion_min_col"], pares=True,
+    )
+    print("Solapadas (barrido):", int(barrido["solapada"].sum()), "| pares en conflicto:", len(pares_conflicto))
+
+    # Índice incremental: reproducir el caso como flujo de altas/cancelaciones
+    replay = benchmark_reproduccion_incremental(
+        entrada["df"], entrada["paciente_col"], entrada["fecha_col"],
+        entrada["hora_inicio_col"], entrada["duracion_min_col"],
+    )
+    print("Reproducción incremental:", replay)
@@ -1,19 +1,501 @@
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import pandas as pd
 import numpy as np
 
+if not __package__:
+    # Corrido como script: los auxiliares se importan desde el paquete myquestions (PEP 366)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "myquestions"
+
+from .desfase_grupos import desfasar, ordenar_por_grupo_paralelo, ordenar_y_desfasar_paralelo
+from .cache_resultados import calcular_con_cache
+from .parseo_fechas import parsear_fechas
+from .perfilado import caso, etapa
+
 
-def generar_caso_de_uso_matriz_transicion():
+def matriz_transicion_referencia(df, user_col, time_col, state_col):
     """
-    Genera un caso de uso aleatorio (input/output esperado) para la función:
+    Implementación directa del enunciado (groupby().shift, groupby().size, pivot,
+    reindex y div). Se conserva para verificar el motor con bincount.
+    """
+    expected = df.copy()
 
-        matriz_transicion(df, user_col, time_col, state_col)
+    # 1) Convertir time_col a datetime
+    with etapa("to_datetime"):
+        expected[time_col] = pd.to_datetime(expected[time_col], errors="coerce")
+
+    # 2) Ordenar por user y time ascendente
+    with etapa("sort_values"):
+        expected = expected.sort_values(by=[user_col, time_col], ascending=[True, True]).reset_index(drop=True)
+
+    # 3) next_state por usuario
+    with etapa("groupby_shift"):
+        expected["next_state"] = expected.groupby(user_col)[state_col].shift(-1)
+
+    # 4) Contar transiciones state -> next_state, ignorando next_state NaN
+    with etapa("groupby_size"):
+        transitions = expected.dropna(subset=["next_state"])
+
+        counts = (
+            transitions
+            .groupby([state_col, "next_state"])
+            .size()
+            .rename("count")
+            .reset_index()
+        )
+
+    # 5) Construir matriz de conteos (filas=estado actual, cols=siguiente estado)
+    with etapa("pivot"):
+        count_matrix = (
+            counts
+            .pivot(index=state_col, columns="next_state", values="count")
+            .fillna(0.0)
+            .astype(float)
+        )
+
+    # 6) Asegurar matriz cuadrada con todos los estados vistos (actuales y siguientes)
+    all_states = sorted(set(expected[state_col].dropna().unique()).union(set(transitions["next_state"].dropna().unique())))
+    count_matrix = count_matrix.reindex(index=all_states, columns=all_states, fill_value=0.0)
+
+    # 7) Convertir a probabilidades: cada fila suma 1.0 (si una fila es todo 0, se queda en 0)
+    row_sums = count_matrix.sum(axis=1)
+    prob_matrix = count_matrix.div(row_sums.replace(0.0, np.nan), axis=0).fillna(0.0)
+
+    # 8) Orden alfabético en filas y columnas
+    prob_matrix = prob_matrix.sort_index(axis=0).sort_index(axis=1)
+
+    return prob_matrix
+
+
+def _claves_eventos(df, user_col, time_col):
+    """
+    Claves del orden por (usuario, tiempo) como sort_values: código de usuario
+    (-1 si es nulo, van al final) y tiempo int64 (NaT como el máximo, al final).
+    """
+    with etapa("parseo_fechas"):
+        tiempos = parsear_fechas(df[time_col])
+        clave_tiempo = tiempos.to_numpy().view(np.int64).copy()
+        clave_tiempo[tiempos.isna().to_numpy()] = np.iinfo(np.int64).max
+
+    with etapa("factorize_usuarios"):
+        codigos_usuario, _ = pd.factorize(df[user_col], sort=True)
+    return codigos_usuario, clave_tiempo
+
+
+def _ordenar_eventos(df, user_col, time_col, n_procesos=1):
+    """
+    Orden estable por (usuario, tiempo) (ver _claves_eventos). Con
+    n_procesos != 1 los usuarios se reparten entre procesos (ver
+    ordenar_por_grupo_paralelo); el orden es el mismo.
+
+    Retorna:
+        orden (np.ndarray): posiciones de df en el orden final.
+        codigos_usuario (np.ndarray): código de usuario en ese orden (-1 si es nulo).
+    """
+    codigos_usuario, clave_tiempo = _claves_eventos(df, user_col, time_col)
+    with etapa("orden"):
+        orden = ordenar_por_grupo_paralelo(codigos_usuario, clave_tiempo, n_procesos)
+    return orden, codigos_usuario[orden]
+
+
+def _normalizar_filas_csr(conteos):
+    """
+    Normaliza una matriz CSR de conteos para que cada fila sume 1.0
+    (las filas vacías no tienen valores almacenados y quedan en 0).
+    """
+    conteos.sum_duplicates()
+    row_sums = np.asarray(conteos.sum(axis=1)).ravel()
+
+    # Dividir cada valor almacenado por la suma de su fila
+    filas = np.repeat(np.arange(conteos.shape[0]), np.diff(conteos.indptr))
+    conteos.data = conteos.data / row_sums[filas]
+    return conteos
+
+
+def _matriz_desde_pares(actual, siguiente, estados, state_col, disperso=False, pesos=None):
+    """
+    Matriz de probabilidades a partir de pares de códigos (actual, siguiente)
+    con pesos opcionales (conteos ya agregados). Filas normalizadas por su suma;
+    las filas sin salidas quedan en 0.
+    """
+    n_estados = len(estados)
+
+    if disperso:
+        # scipy solo se importa si se pide la matriz dispersa
+        from scipy import sparse
+
+        valores = np.ones(len(actual)) if pesos is None else pesos
+        conteos = sparse.coo_matrix((valores, (actual, siguiente)), shape=(n_estados, n_estados)).tocsr()
+        return _normalizar_filas_csr(conteos), np.asarray(estados)
+
+    conteos = np.bincount(actual * n_estados + siguiente, weights=pesos, minlength=n_estados * n_estados)
+    conteos = conteos.reshape(n_estados, n_estados).astype(float)
+    row_sums = conteos.sum(axis=1, keepdims=True)
+    probs = np.divide(conteos, row_sums, out=np.zeros_like(conteos), where=row_sums > 0)
+
+    return pd.DataFrame(
+        probs,
+        index=pd.Index(estados, name=state_col),
+        columns=pd.Index(estados, name="next_state"),
+    )
+
+
+def matriz_transicion_bincount(df, user_col, time_col, state_col, disperso=False, n_procesos=1, pool=None):
+    """
+    Mismo resultado que matriz_transicion_referencia, sin intermedios de pandas:
+
+    - los estados se factorizan a códigos 0..S-1 en orden alfabético;
+    - las transiciones son pares (código actual, código siguiente) de filas
+      consecutivas del mismo usuario;
+    - los conteos salen de un solo np.bincount sobre actual * S + siguiente
+      (o de una matriz COO con duplicados sumados en modo disperso);
+    - cada fila se normaliza por su suma (las filas sin salidas quedan en 0).
+
+    Parámetros:
+        disperso (bool): si es True retorna una matriz scipy.sparse CSR en vez
+            del DataFrame denso, para espacios de estados grandes.
+        n_procesos (int): procesos para el orden y el desfase por usuario (1
+            por defecto; None usa todos los núcleos). El resultado no cambia.
+        pool (ProcessPoolExecutor): pool a reutilizar entre llamadas.
+
+    Retorna:
+        pd.DataFrame de probabilidades (filas = estado actual, columnas = siguiente),
+        o (matriz_csr, estados) si disperso=True.
+    """
+    codigos_usuario, clave_tiempo = _claves_eventos(df, user_col, time_col)
+
+    with etapa("factorize_estados"):
+        codigos_estado, estados = pd.factorize(df[state_col], sort=True)
+        codigos_estado = codigos_estado.astype(np.int64)
+
+    # Siguiente estado del mismo usuario (groupby().shift(-1)), calculado junto con el orden
+    with etapa("orden"):
+        orden, siguiente, con_siguiente = ordenar_y_desfasar_paralelo(
+            codigos_usuario, clave_tiempo, codigos_estado, periodos=-1, relleno=-1,
+            n_procesos=n_procesos, pool=pool,
+        )
+        codigos_estado = codigos_estado[orden]
+
+    # Válida si ambos estados no son nulos
+    with etapa("desfase"):
+        validas = con_siguiente & (codigos_estado >= 0) & (siguiente >= 0)
+        actual = codigos_estado[validas]
+        siguiente = siguiente[validas]
+
+    with etapa("conteos"):
+        return _matriz_desde_pares(actual, siguiente, estados, state_col, disperso)
+
+
+class ContadorTransiciones:
+    """
+    Conteo de transiciones en streaming y fusionable, para clickstreams
+    particionados que no caben en un solo DataFrame.
+
+    Además de los conteos (estado, siguiente), guarda por usuario el primer y
+    el último estado vistos. Así la transición que cruza el borde entre dos
+    fragmentos (o dos particiones contadas en procesos distintos) no se pierde:
+    al procesar o fusionar la parte siguiente se enlaza el último estado de la
+    anterior con el primero de la nueva. La memoria es O(usuarios + pares
+    distintos), no O(eventos).
+
+    Los fragmentos deben llegar en orden temporal por usuario (por ejemplo,
+    particiones por fecha) y, dentro de cada uno, conservar el orden original
+    de las filas para que los empates de timestamp se resuelvan igual que en
+    matriz_transicion.
+    """
+
+    def __init__(self, user_col, time_col, state_col):
+        self.user_col = user_col
+        self.time_col = time_col
+        self.state_col = state_col
+
+        self.conteos = Counter()  # (estado, siguiente) -> conteo
+        self.estados = set()      # estados no nulos vistos
+        self.primero = {}         # usuario -> primer estado (None si es nulo)
+        self.ultimo = {}          # usuario -> último estado (None si es nulo)
+
+    def actualizar(self, fragmento):
+        """
+        Agrega un fragmento (pd.DataFrame) posterior a lo ya procesado.
+        """
+        orden, codigos_usuario = _ordenar_eventos(fragmento, self.user_col, self.time_col)
+        usuarios = fragmento[self.user_col].to_numpy(dtype=object)[orden]
+        codigos_estado, estados = pd.factorize(fragmento[self.state_col].to_numpy(dtype=object)[orden])
+        self.estados.update(estados.tolist())
+
+        # 1) Transiciones dentro del fragmento, agregadas por par de códigos
+        codigos_estado = codigos_estado.astype(np.int64)
+        siguiente, con_siguiente = desfasar(codigos_usuario, codigos_estado, periodos=-1, relleno=-1)
+        validas = con_siguiente & (codigos_estado >= 0) & (siguiente >= 0)
+        n_estados = len(estados)
+        claves = codigos_estado[validas] * n_estados + siguiente[validas]
+        pares, cuantos = np.unique(claves, return_counts=True)
+        for par, c in zip(pares.tolist(), cuantos.tolist()):
+            self.conteos[(estados[par // n_estados], estados[par % n_estados])] += c
+
+        # 2) Bordes: primer y último evento de cada usuario (no nulo) en el fragmento
+        cambia = np.flatnonzero(np.diff(codigos_usuario) != 0) + 1
+        inicios = np.concatenate(([0], cambia)) if len(orden) else cambia
+        fines = np.concatenate((cambia - 1, [len(orden) - 1])) if len(orden) else cambia
+
+        for i, f in zip(inicios.tolist(), fines.tolist()):
+            if codigos_usuario[i] < 0:
+                continue
+            u = usuarios[i]
+            estado_primero = estados[codigos_estado[i]] if codigos_estado[i] >= 0 else None
+            estado_ultimo = estados[codigos_estado[f]] if codigos_estado[f] >= 0 else None
+            self._enlazar(u, estado_primero)
+            self.ultimo[u] = estado_ultimo
+        return self
+
+    def _enlazar(self, usuario, estado_primero):
+        """
+        Registra el primer estado de un usuario en la parte nueva: transición
+        desde su último estado conocido o, si es nuevo, su primer estado.
+        """
+        if usuario in self.ultimo:
+            anterior = self.ultimo[usuario]
+            if anterior is not None and estado_primero is not None:
+                self.conteos[(anterior, estado_primero)] += 1
+        else:
+            self.primero[usuario] = estado_primero
+
+    def fusionar(self, otro):
+        """
+        Retorna un contador nuevo con self seguido de otro (otro es posterior en el
+        tiempo, o tiene usuarios disjuntos).
+        """
+        fusionado = ContadorTransiciones(self.user_col, self.time_col, self.state_col)
+        fusionado.conteos = self.conteos + otro.conteos
+        fusionado.estados = self.estados | otro.estados
+        fusionado.primero = dict(self.primero)
+        fusionado.ultimo = dict(self.ultimo)
+
+        for u, estado_primero in otro.primero.items():
+            fusionado._enlazar(u, estado_primero)
+        fusionado.ultimo.update(otro.ultimo)
+        return fusionado
+
+    def resultado(self, disperso=False):
+        """
+        Matriz de transición con el mismo formato que matriz_transicion_bincount.
+        """
+        estados = pd.Index(sorted(self.estados))
+        posicion = {e: i for i, e in enumerate(estados)}
+
+        pares = list(self.conteos.items())
+        actual = np.array([posicion[a] for (a, _), _ in pares], dtype=np.int64)
+        siguiente = np.array([posicion[b] for (_, b), _ in pares], dtype=np.int64)
+        pesos = np.array([c for _, c in pares], dtype=float)
+
+        return _matriz_desde_pares(actual, siguiente, estados, self.state_col, disperso, pesos=pesos)
+
+
+def leer_particion(particion, tamano_fragmento=None):
+    """
+    Itera los fragmentos de una partición: un pd.DataFrame, o una ruta a un
+    .csv (leído en fragmentos de tamano_fragmento filas) o .parquet.
+    """
+    if isinstance(particion, pd.DataFrame):
+        yield particion
+    elif str(particion).endswith(".parquet"):
+        yield pd.read_parquet(particion)
+    elif tamano_fragmento is None:
+        yield pd.read_csv(particion)
+    else:
+        yield from pd.read_csv(particion, chunksize=tamano_fragmento)
+
+
+def contar_particion(particion, user_col, time_col, state_col, tamano_fragmento=None):
+    """
+    ContadorTransiciones de una sola partición, fragmento a fragmento.
+    """
+    contador = ContadorTransiciones(user_col, time_col, state_col)
+    for fragmento in leer_particion(particion, tamano_fragmento):
+        contador.actualizar(fragmento)
+    return contador
+
+
+def matriz_transicion_particionada(particiones, user_col, time_col, state_col, n_procesos=1,
+                                   tamano_fragmento=None, disperso=False):
+    """
+    matriz_transicion sobre una lista de particiones (DataFrames o rutas), en
+    orden temporal. Cada partición se cuenta por separado (en un pool de
+    procesos si n_procesos != 1; None usa todos los núcleos) y los contadores
+    se reducen en orden con ContadorTransiciones.fusionar.
+    """
+    contar = partial(
+        contar_particion,
+        user_col=user_col, time_col=time_col, state_col=state_col, tamano_fragmento=tamano_fragmento,
+    )
+
+    if n_procesos == 1:
+        contadores = [contar(p) for p in particiones]
+    else:
+        with ProcessPoolExecutor(max_workers=n_procesos or os.cpu_count()) as pool:
+            contadores = list(pool.map(contar, particiones))
+
+    total = ContadorTransiciones(user_col, time_col, state_col)
+    for contador in contadores:
+        total = total.fusionar(contador)
+    return total.resultado(disperso=disperso)
+
+
+def matriz_transicion_orden(df, user_col, time_col, state_col, order=2):
+    """
+    Transiciones de orden superior (n-gramas): la probabilidad del siguiente
+    estado dado el contexto de los últimos `order` estados del mismo usuario.
+
+    Cada contexto (tupla de códigos de estado) se empaqueta en una clave int64
+    c_0 * S^(order-1) + ... + c_(order-1), que conserva el orden lexicográfico.
+    Si S^order no cabe en int64, los contextos se identifican con np.unique
+    por filas. Solo se guardan los contextos observados, así que la memoria es
+    O(transiciones) y no O(S^order).
+
+    Con order=1 equivale a matriz_transicion_bincount(..., disperso=True).
+
+    Retorna:
+        matriz (scipy.sparse.csr_matrix): probabilidades (n_contextos x S).
+        contextos (pd.MultiIndex): un nivel por posición del contexto, en orden alfabético.
+        estados (pd.Index): estados de las columnas, en orden alfabético.
+    """
+    if order < 1:
+        raise ValueError(f"order debe ser >= 1, no {order}")
+
+    orden, codigos_usuario = _ordenar_eventos(df, user_col, time_col)
+    with etapa("factorize_estados"):
+        codigos_estado, estados = pd.factorize(df[state_col], sort=True)
+        codigos_estado = codigos_estado[orden].astype(np.int64)
+    n_estados = len(estados)
+    n_ventanas = max(len(orden) - order, 0)
+
+    # Ventanas de order + 1 eventos consecutivos: contexto + siguiente
+    with etapa("ventanas"):
+        ventana_estados = [codigos_estado[j:j + n_ventanas] for j in range(order + 1)]
+        ventana_usuarios = [codigos_usuario[j:j + n_ventanas] for j in range(order + 1)]
+
+        validas = ventana_usuarios[0] >= 0
+        for j in range(order + 1):
+            validas &= (ventana_usuarios[j] == ventana_usuarios[0]) & (ventana_estados[j] >= 0)
+
+        contexto = np.column_stack([v[validas] for v in ventana_estados[:order]])
+        siguiente = ventana_estados[order][validas]
+
+    with etapa("contextos"):
+        if n_estados ** order < 2 ** 62:
+            potencias = n_estados ** np.arange(order - 1, -1, -1, dtype=np.int64)
+            claves, fila = np.unique(contexto @ potencias, return_inverse=True)
+            codigos_contexto = (claves[:, None] // potencias) % max(n_estados, 1)
+        else:
+            codigos_contexto, fila = np.unique(contexto, axis=0, return_inverse=True)
+        fila = fila.ravel()
+
+    from scipy import sparse
+
+    with etapa("conteos"):
+        conteos = sparse.coo_matrix(
+            (np.ones(len(siguiente)), (fila, siguiente)), shape=(len(codigos_contexto), n_estados)
+        ).tocsr()
+
+    nombres = [f"{state_col}_t-{order - 1 - j}" if j < order - 1 else state_col for j in range(order)]
+    contextos = pd.MultiIndex.from_arrays(
+        [np.asarray(estados)[codigos_contexto[:, j]] for j in range(order)] if len(codigos_contexto)
+        else [[] for _ in range(order)],
+        names=nombres,
+    )
+    return _normalizar_filas_csr(conteos), contextos, pd.Index(estados, name="next_state")
+
+
+def matriz_transicion_orden_referencia(df, user_col, time_col, state_col, order=2):
+    """
+    Versión con pandas (groupby().shift por cada posición y groupby().size)
+    de matriz_transicion_orden, para verificarla.
+
+    Retorna:
+        pd.Series: probabilidad indexada por (contexto..., next_state), solo pares observados.
+    """
+    expected = df.copy()
+    with etapa("to_datetime"):
+        expected[time_col] = pd.to_datetime(expected[time_col], errors="coerce")
+
+    with etapa("sort_values"):
+        expected = expected.sort_values(by=[user_col, time_col], ascending=[True, True]).reset_index(drop=True)
+
+    # Columnas del contexto: estados t-(order-1) .. t, más el siguiente
+    with etapa("groupby_shift"):
+        columnas = []
+        for lag in range(order - 1, 0, -1):
+            nombre = f"{state_col}_t-{lag}"
+            expected[nombre] = expected.groupby(user_col)[state_col].shift(lag)
+            columnas.append(nombre)
+        columnas.append(state_col)
+        expected["next_state"] = expected.groupby(user_col)[state_col].shift(-1)
+
+    with etapa("groupby_size"):
+        transitions = expected.dropna(subset=columnas + ["next_state"])
+        counts = transitions.groupby(columnas + ["next_state"]).size().astype(float)
+        totales = counts.groupby(level=list(range(order))).transform("sum")
+    return (counts / totales).sort_index()
+
+
+# Reglas simples de transición "realistas": estado -> candidatos (el primero es el más probable)
+_CANDIDATOS_TRANSICION = {
+    "Home": ["Search", "Product", "Profile"],
+    "Search": ["Product", "Home", "Search"],
+    "Product": ["Cart", "Search", "Product"],
+    "Cart": ["Checkout", "Product", "Cart"],
+    "Checkout": ["Payment", "Cart", "Checkout"],
+    "Payment": ["Home", "Profile", "Support"],
+    "Profile": ["Home", "Support", "Profile"],
+}
+_CANDIDATOS_POR_DEFECTO = ["Home", "Profile", "Support"]  # Support u otros
+
+
+def _eventos_por_usuario(rng, n_eventos_total, minimo, maximo):
+    """
+    Número de eventos de cada usuario (entre minimo y maximo - 1) para sumar
+    exactamente n_eventos_total; el último usuario puede quedar con menos.
+    """
+    if int(n_eventos_total) < 1:
+        raise ValueError(f"size debe ser >= 1 (número de eventos), no {n_eventos_total}")
+    n_eventos = rng.integers(minimo, maximo, size=-(-int(n_eventos_total) // minimo))
+    acumulado = np.cumsum(n_eventos)
+    n_usuarios = int(np.searchsorted(acumulado, n_eventos_total)) + 1
+    n_eventos = n_eventos[:n_usuarios]
+    n_eventos[-1] -= acumulado[n_usuarios - 1] - n_eventos_total
+    return n_eventos
+
+
+def _muestrear_categorica(rng, probs_acumuladas):
+    """
+    Una muestra por fila de probs_acumuladas (n, S): índice de la primera
+    probabilidad acumulada que supera un uniforme.
+    """
+    u = rng.random(len(probs_acumuladas))
+    return np.minimum((u[:, None] >= probs_acumuladas).sum(axis=1), probs_acumuladas.shape[1] - 1)
+
+
+def generar_entrada_matriz_transicion(size=None, seed=None):
+    """
+    Input aleatorio de un caso de uso de matriz_transicion (pasos 1 a 4 de
+    generar_caso_de_uso_matriz_transicion), sin calcular el ground truth.
+
+    Parámetros:
+        size (int): número de eventos (filas); por defecto 4 a 9 usuarios con
+            5 a 14 eventos cada uno.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
 
     Retorna:
         input_data (dict): Diccionario con las claves esperadas por la función solución.
-        output_data (pd.DataFrame): Matriz de transición esperada (probabilidades).
     """
 
-    rng = np.random.default_rng()  # aleatorio distinto en cada ejecución
+    rng = np.random.default_rng(seed)  # aleatorio distinto en cada ejecución, salvo con seed
 
     # ------------------------------------------------------------
     # 1) Nombres de columnas (coherentes con el enunciado)
@@ -35,83 +517,75 @@ def generar_caso_de_uso_matriz_transicion():
     states = rng.choice(possible_states, size=n_states, replace=False)
     states = np.array(sorted(states.tolist()), dtype=object)  # para consistencia
 
+    # Matriz de transición de la simulación: candidatos filtrados a los estados
+    # existentes, con sesgo al primero; sin candidatos, uniforme
+    probs = np.zeros((n_states, n_states))
+    for i, prev in enumerate(states.tolist()):
+        candidates = [c for c in _CANDIDATOS_TRANSICION.get(prev, _CANDIDATOS_POR_DEFECTO) if c in states]
+        if len(candidates) == 0:
+            probs[i] = 1.0 / n_states
+        else:
+            pesos = np.linspace(0.5, 0.1, num=len(candidates))
+            probs[i, np.searchsorted(states, candidates)] = pesos / pesos.sum()
+    probs_acumuladas = np.cumsum(probs, axis=1)
+
     # ------------------------------------------------------------
     # 3) Generar eventos por usuario
     # ------------------------------------------------------------
-    n_users = int(rng.integers(4, 10))  # 4 a 9 usuarios
-    users = [f"U{str(i).zfill(3)}" for i in range(1, n_users + 1)]
-
-    records = []
+    if size is None:
+        n_users = int(rng.integers(4, 10))  # 4 a 9 usuarios
+        n_eventos = rng.integers(5, 15, size=n_users)  # 5 a 14 eventos por usuario
+    else:
+        n_eventos = _eventos_por_usuario(rng, size, 5, 15)
+        n_users = len(n_eventos)
+    users = np.array([f"U{str(i).zfill(3)}" for i in range(1, n_users + 1)], dtype=object)
+    max_eventos = int(n_eventos.max())
+
+    # Camino de navegación (usuarios x pasos): estado inicial típico y un paso por columna
+    seq = np.empty((n_users, max_eventos), dtype=np.int64)
+    if "Home" in states:
+        seq[:, 0] = np.searchsorted(states, "Home")
+    else:
+        seq[:, 0] = rng.integers(0, n_states, size=n_users)
+    for j in range(1, max_eventos):
+        seq[:, j] = _muestrear_categorica(rng, probs_acumuladas[seq[:, j - 1]])
+
+    # Timestamps: incrementos aleatorios de 1 a 29 min desde base_time
     base_time = pd.Timestamp("2026-02-01 08:00:00") + pd.Timedelta(minutes=int(rng.integers(0, 600)))
+    increments = rng.integers(1, 30, size=(n_users, max_eventos))
+    increments[:, 0] = 0
+    minutos = np.cumsum(increments, axis=1)
+
+    # A veces meter eventos con el mismo timestamp (caso realista)
+    con_empate = np.flatnonzero((rng.random(n_users) < 0.3) & (n_eventos >= 7))
+    j = rng.integers(1, n_eventos[con_empate] - 1) if len(con_empate) else con_empate
+    minutos[con_empate, j] = minutos[con_empate, j - 1]
+
+    # Aplanar en orden usuario/paso, quedándose con los eventos de cada usuario
+    validos = np.arange(max_eventos)[None, :] < n_eventos[:, None]
+    minutos = minutos[validos]
+    total = len(minutos)
+
+    # ~60% como string "YYYY-MM-DD HH:MM:SS" y el resto como pd.Timestamp
+    como_texto = rng.random(total) < 0.6
+    codigos_minuto, minutos_unicos = pd.factorize(minutos)
+    momentos = base_time + pd.to_timedelta(minutos_unicos, unit="m")
+    tiempos = np.where(
+        como_texto,
+        np.asarray(momentos.strftime("%Y-%m-%d %H:%M:%S"), dtype=object)[codigos_minuto],
+        np.asarray(momentos, dtype=object)[codigos_minuto],
+    )
 
-    for u in users:
-        # 5 a 14 eventos por usuario
-        n_events = int(rng.integers(5, 15))
-
-        # Creamos un "camino" de navegación con alta probabilidad de avanzar y algo de ruido
-        seq = []
-
-        # Estado inicial típico
-        seq.append("Home" if "Home" in states else rng.choice(states))
-
-        for _ in range(1, n_events):
-            prev = seq[-1]
-
-            # Reglas simples de transición "realistas"
-            if prev == "Home":
-                candidates = ["Search", "Product", "Profile"]
-            elif prev == "Search":
-                candidates = ["Product", "Home", "Search"]
-            elif prev == "Product":
-                candidates = ["Cart", "Search", "Product"]
-            elif prev == "Cart":
-                candidates = ["Checkout", "Product", "Cart"]
-            elif prev == "Checkout":
-                candidates = ["Payment", "Cart", "Checkout"]
-            elif prev == "Payment":
-                candidates = ["Home", "Profile", "Support"]
-            elif prev == "Profile":
-                candidates = ["Home", "Support", "Profile"]
-            else:  # Support u otros
-                candidates = ["Home", "Profile", "Support"]
-
-            # Filtrar candidatos a los que realmente existan en `states`
-            candidates = [c for c in candidates if c in states]
-            if len(candidates) == 0:
-                next_state = rng.choice(states)
-            else:
-                # Sesgo al primer candidato (más probable)
-                probs = np.linspace(0.5, 0.1, num=len(candidates))
-                probs = probs / probs.sum()
-                next_state = rng.choice(np.array(candidates, dtype=object), p=probs)
-
-            seq.append(next_state)
-
-        # Timestamps: incrementos aleatorios, luego desordenamos un poco para forzar que el algoritmo ordene
-        increments = rng.integers(1, 30, size=n_events)  # 1 a 29 min
-        times = [base_time]
-        for inc in increments[1:]:
-            times.append(times[-1] + pd.Timedelta(minutes=int(inc)))
-
-        # A veces meter eventos con el mismo timestamp (caso realista)
-        if rng.random() < 0.3 and n_events >= 7:
-            j = int(rng.integers(1, n_events - 1))
-            times[j] = times[j - 1]
-
-        # Guardar registros
-        for t, s in zip(times, seq):
-            records.append(
-                {
-                    user_col: u,
-                    time_col: t.strftime("%Y-%m-%d %H:%M:%S") if rng.random() < 0.6 else t,
-                    state_col: s,
-                }
-            )
-
-    df = pd.DataFrame(records)
+    df = pd.DataFrame(
+        {
+            user_col: np.repeat(users, n_eventos),
+            time_col: tiempos,
+            state_col: states[seq[validos]],
+        }
+    )
 
     # Desordenar filas para asegurar que la solución debe ordenar
-    df = df.sample(frac=1.0, random_state=int(rng.integers(0, 10_000))).reset_index(drop=True)
+    df = df.iloc[rng.permutation(total)].reset_index(drop=True)
 
     # ------------------------------------------------------------
     # 4) Construir INPUT
@@ -123,55 +597,204 @@ def generar_caso_de_uso_matriz_transicion():
         "state_col": state_col,
     }
 
+    return input_data
+
+
+def generar_caso_de_uso_matriz_transicion(size=None, seed=None, cache=None):
+    """
+    Genera un caso de uso aleatorio (input/output esperado) para la función:
+
+        matriz_transicion(df, user_col, time_col, state_col)
+
+    Las secuencias se simulan para todos los usuarios a la vez (un paso de la
+    cadena por columna, con una matriz de probabilidades entre estados) y los
+    timestamps se formatean una vez por valor distinto.
+
+    Parámetros:
+        size (int): número de eventos (filas); por defecto 4 a 9 usuarios con
+            5 a 14 eventos cada uno.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
+        cache (CacheResultados): cache en disco del ground truth; por defecto la
+            global de cache_resultados.configurar_cache (cache=False la ignora).
+
+    Retorna:
+        input_data (dict): Diccionario con las claves esperadas por la función solución.
+        output_data (pd.DataFrame): Matriz de transición esperada (probabilidades).
+    """
+
+    with caso("matriz_transicion", size=size):
+        with etapa("entrada"):
+            input_data = generar_entrada_matriz_transicion(size=size, seed=seed)
+
+        # ------------------------------------------------------------
+        # 5) Calcular OUTPUT esperado (Ground Truth) replicando el enunciado
+        #    Se usa el motor con bincount, que devuelve la misma matriz que
+        #    matriz_transicion_referencia.
+        # ------------------------------------------------------------
+        with etapa("ground_truth"):
+            output_data = calcular_con_cache(matriz_transicion_bincount, cache=cache, **input_data)
+
+    return input_data, output_data
+
+
+def generar_entrada_matriz_transicion_orden(order=2, size=None, seed=None):
+    """
+    Input aleatorio de un caso de uso de matriz_transicion_orden, sin calcular
+    el ground truth, y los patrones plantados (ver
+    generar_caso_de_uso_matriz_transicion_orden).
+
+    Retorna:
+        input_data (dict): df, user_col, time_col, state_col y order.
+        patrones (dict): {contexto: siguiente} de los patrones plantados.
+    """
+
+    rng = np.random.default_rng(seed)  # aleatorio distinto en cada ejecución, salvo con seed
+
+    user_col = "user_id"
+    time_col = "timestamp"
+    state_col = "state"
+
+    states = np.array(["Cart", "Checkout", "Home", "Payment", "Product", "Profile", "Search", "Support"], dtype=object)
+    n_states = len(states)
+    potencias = n_states ** np.arange(order - 1, -1, -1, dtype=np.int64)
+
     # ------------------------------------------------------------
-    # 5) Calcular OUTPUT esperado (Ground Truth) replicando el enunciado
+    # 1) Plantar patrones: contexto (tupla de `order` estados) -> siguiente fijo
     # ------------------------------------------------------------
-    expected = df.copy()
+    n_patrones = int(rng.integers(4, 9))
+    patrones = {}
+    while len(patrones) < n_patrones:
+        contexto = tuple(rng.choice(states, size=order).tolist())
+        patrones[contexto] = str(rng.choice(states))
+
+    # Patrones como claves empaquetadas (ver matriz_transicion_orden), ordenadas para searchsorted
+    contextos_patron = np.searchsorted(states, np.array(list(patrones.keys()), dtype=object))
+    claves_patron = contextos_patron @ potencias
+    siguiente_patron = np.searchsorted(states, np.array(list(patrones.values()), dtype=object))
+    orden_claves = np.argsort(claves_patron)
+    claves_patron = claves_patron[orden_claves]
+    siguiente_patron = siguiente_patron[orden_claves]
 
-    # 1) Convertir time_col a datetime
-    expected[time_col] = pd.to_datetime(expected[time_col], errors="coerce")
+    # ------------------------------------------------------------
+    # 2) Secuencias: si el contexto actual es un patrón se sigue; si no, estado aleatorio
+    #    (todos los usuarios a la vez, un paso por columna)
+    # ------------------------------------------------------------
+    if size is None:
+        n_users = int(rng.integers(5, 15))
+        n_eventos = rng.integers(order + 5, order + 30, size=n_users)
+    else:
+        n_eventos = _eventos_por_usuario(rng, size, order + 5, order + 30)
+        n_users = len(n_eventos)
+    users = np.array([f"U{str(i).zfill(3)}" for i in range(1, n_users + 1)], dtype=object)
+    max_eventos = max(int(n_eventos.max()), order)
+
+    seq = np.empty((n_users, max_eventos), dtype=np.int64)
+    desde_patron = rng.random(n_users) < 0.8
+    seq[:, :order] = rng.integers(0, n_states, size=(n_users, order))
+    seq[desde_patron, :order] = contextos_patron[rng.integers(0, len(contextos_patron), size=desde_patron.sum())]
+
+    for j in range(order, max_eventos):
+        claves = seq[:, j - order:j] @ potencias
+        pos = np.minimum(np.searchsorted(claves_patron, claves), len(claves_patron) - 1)
+        es_patron = claves_patron[pos] == claves
+        seq[:, j] = np.where(es_patron, siguiente_patron[pos], rng.integers(0, n_states, size=n_users))
+
+    # Timestamps estrictamente crecientes (sin empates) para que el orden sea único;
+    # un usuario con menos de order + 1 eventos no aporta transiciones
+    validos = np.arange(max_eventos)[None, :] < n_eventos[:, None]
+    base_time = pd.Timestamp("2026-02-01 08:00:00")
+    minutos = np.cumsum(rng.integers(1, 30, size=(n_users, max_eventos)), axis=1)[validos]
+    total = len(minutos)
+
+    df = pd.DataFrame(
+        {
+            user_col: np.repeat(users, n_eventos),
+            time_col: base_time + pd.to_timedelta(minutos, unit="m"),
+            state_col: states[seq[validos]],
+        }
+    )
+    df = df.iloc[rng.permutation(total)].reset_index(drop=True)
 
-    # 2) Ordenar por user y time ascendente
-    expected = expected.sort_values(by=[user_col, time_col], ascending=[True, True]).reset_index(drop=True)
+    input_data = {
+        "df": df.copy(),
+        "user_col": user_col,
+        "time_col": time_col,
+        "state_col": state_col,
+        "order": order,
+    }
 
-    # 3) next_state por usuario
-    expected["next_state"] = expected.groupby(user_col)[state_col].shift(-1)
+    return input_data, patrones
 
-    # 4) Contar transiciones state -> next_state, ignorando next_state NaN
-    transitions = expected.dropna(subset=["next_state"])
-
-    counts = (
-        transitions
-        .groupby([state_col, "next_state"])
-        .size()
-        .rename("count")
-        .reset_index()
-    )
 
-    # 5) Construir matriz de conteos (filas=estado actual, cols=siguiente estado)
-    count_matrix = (
-        counts
-        .pivot(index=state_col, columns="next_state", values="count")
-        .fillna(0.0)
-        .astype(float)
-    )
+def generar_caso_de_uso_matriz_transicion_orden(order=2, size=None, seed=None, cache=None):
+    """
+    Genera un caso de uso aleatorio para transiciones de orden superior:
 
-    # 6) Asegurar matriz cuadrada con todos los estados vistos (actuales y siguientes)
-    all_states = sorted(set(expected[state_col].dropna().unique()).union(set(transitions["next_state"].dropna().unique())))
-    count_matrix = count_matrix.reindex(index=all_states, columns=all_states, fill_value=0.0)
+        matriz_transicion_orden(df, user_col, time_col, state_col, order)
 
-    # 7) Convertir a probabilidades: cada fila suma 1.0 (si una fila es todo 0, se queda en 0)
-    row_sums = count_matrix.sum(axis=1)
-    prob_matrix = count_matrix.div(row_sums.replace(0.0, np.nan), axis=0).fillna(0.0)
+    Las secuencias siguen patrones plantados: para algunos contextos de `order`
+    estados el siguiente estado es siempre el mismo, aunque el último estado
+    por sí solo no lo determine (por ejemplo Home -> Search -> Product pero
+    Product -> Search -> Cart). En la salida esos contextos deben tener
+    probabilidad 1.0 en el estado plantado.
 
-    # 8) Orden alfabético en filas y columnas
-    prob_matrix = prob_matrix.sort_index(axis=0).sort_index(axis=1)
+    Parámetros:
+        size (int): número de eventos (filas); por defecto 5 a 14 usuarios con
+            order + 5 a order + 29 eventos cada uno.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
+        cache (CacheResultados): cache en disco del ground truth; por defecto la
+            global de cache_resultados.configurar_cache (cache=False la ignora).
+
+    Retorna:
+        input_data (dict): df, user_col, time_col, state_col y order.
+        output_data (dict): matriz (CSR), contextos, estados y patrones
+            ({contexto: siguiente} de los patrones plantados).
+    """
+
+    with caso("matriz_transicion_orden", size=size, order=order):
+        with etapa("entrada"):
+            input_data, patrones = generar_entrada_matriz_transicion_orden(order=order, size=size, seed=seed)
 
-    output_data = prob_matrix
+        with etapa("ground_truth"):
+            matriz, contextos, estados = calcular_con_cache(matriz_transicion_orden, cache=cache, **input_data)
 
+    output_data = {
+        "matriz": matriz,
+        "contextos": contextos,
+        "estados": estados,
+        "patrones": patrones,
+    }
     return input_data, output_data
 
 
+def iterar_casos(n_cases, size=None, seed=None, cache=None):
+    """
+    Mismos casos que generate (mismas semillas), uno a la vez: para lotes
+    grandes que se escriben a disco sin tenerlos todos en memoria.
+    """
+    for semilla in np.random.SeedSequence(seed).spawn(int(n_cases)):
+        yield generar_caso_de_uso_matriz_transicion(size=size, seed=semilla, cache=cache)
+
+
+def generate(n_cases, size=None, seed=None, cache=None):
+    """
+    Genera n_cases casos de uso de matriz_transicion.
+
+    Parámetros:
+        size (int): eventos por caso (ver generar_caso_de_uso_matriz_transicion);
+            puede llegar a millones de filas para pruebas de carga.
+        seed (int): semilla del lote; cada caso usa una semilla derivada
+            (SeedSequence.spawn), así el lote completo es reproducible.
+        cache (CacheResultados): cache en disco del ground truth (ver calcular_con_cache).
+
+    Retorna:
+        list[tuple]: (input_data, output_data) por caso.
+    """
+    return list(iterar_casos(n_cases, size=size, seed=seed, cache=cache))
+
+
 if __name__ == "__main__":
     entrada, salida_esperada = generar_caso_de_uso_matriz_transicion()
 
@@ -190,4 +813,29 @@ if __name__ == "__main__":
     # Verificación rápida de suma por fila (aprox 1.0 o 0.0)
     row_sums = salida_esperada.sum(axis=1)
     print("\nSuma por fila (primeros 10):")
-    print(row_sums.head(10))
\ No newline at end of file
+    print(row_sums.head(10))
+
+    # Verificación rápida contra la implementación con groupby + pivot
+    referencia = matriz_transicion_referencia(
+        entrada["df"], entrada["user_col"], entrada["time_col"], entrada["state_col"]
+    )
+    print("\nCoincide con la referencia:", referencia.equals(salida_esperada))
+
+    # Conteo por particiones: filas en orden temporal cortadas en 4 partes
+    df_entrada = entrada["df"]
+    orden_tiempo = np.argsort(pd.to_datetime(df_entrada[entrada["time_col"]]).to_numpy(), kind="stable")
+    particiones = [df_entrada.iloc[parte] for parte in np.array_split(orden_tiempo, 4)]
+    particionada = matriz_transicion_particionada(
+        particiones, entrada["user_col"], entrada["time_col"], entrada["state_col"], n_procesos=2
+    )
+    print("Coincide por particiones:", particionada.equals(salida_esperada))
+
+    # Orden superior: los contextos plantados deben tener probabilidad 1.0 en su siguiente estado
+    entrada_orden, salida_orden = generar_caso_de_uso_matriz_transicion_orden(order=2)
+    matriz, contextos, estados = salida_orden["matriz"], salida_orden["contextos"], salida_orden["estados"]
+    observados = [ctx for ctx in salida_orden["patrones"] if ctx in contextos]
+    print("\n=== ORDEN 2 ===")
+    print("Contextos observados:", len(contextos), "| patrones plantados observados:", len(observados))
+    print("Patrones con probabilidad 1.0:", all(
+        matriz[contextos.get_loc(ctx), estados.get_loc(salida_orden["patrones"][ctx])] == 1.0 for ctx in observados
+    ))
@@ -1,30 +1,21 @@
+import os
+import sys
+
 import numpy as np
-from sklearn.metrics import f1_score
 
+if not __package__:
+    # Corrido como script: los auxiliares se importan desde el paquete myquestions (PEP 366)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "myquestions"
 
-def generar_caso_de_uso_mejor_umbral_f1():
-    """
-    Genera un caso de uso aleatorio (input/output esperado) para la función:
+from .cache_resultados import calcular_con_cache
+from .perfilado import caso, etapa
 
-        mejor_umbral_f1(y_true, y_proba, step=0.01)
 
-    Retorna:
-        input_data (dict): Diccionario con las claves esperadas por la función solución.
-        output_data (dict): Diccionario esperado con best_threshold, best_f1, support_positive.
+def _simular_etiquetas(rng, n):
+    """
+    y_true con proporción de positivos aleatoria y al menos 1 positivo y 1 negativo.
     """
-
-    rng = np.random.default_rng()  # aleatorio distinto en cada ejecución
-
-    # ------------------------------------------------------------
-    # 1) Tamaño del dataset y step
-    # ------------------------------------------------------------
-    n = int(rng.integers(40, 180))  # 40 a 179 muestras
-    possible_steps = np.array([0.01, 0.02, 0.05, 0.1], dtype=float)
-    step = float(rng.choice(possible_steps))
-
-    # ------------------------------------------------------------
-    # 2) Generar y_true con proporción de positivos aleatoria (evitar extremos triviales)
-    # ------------------------------------------------------------
     pos_ratio = float(rng.uniform(0.15, 0.55))  # entre 15% y 55% positivos
     y_true = (rng.random(n) < pos_ratio).astype(int)
 
@@ -34,16 +25,21 @@ def generar_caso_de_uso_mejor_umbral_f1():
     if y_true.sum() == n:
         y_true[int(rng.integers(0, n))] = 0
 
-    # ------------------------------------------------------------
-    # 3) Generar y_proba con cierta "separación" (pero con ruido)
-    #    - positivos tienden a proba más alta
-    #    - negativos tienden a proba más baja
-    # ------------------------------------------------------------
+    return y_true
+
+
+def _simular_probabilidades(rng, y_true, separacion=6.0):
+    """
+    y_proba con cierta "separación" (pero con ruido): los positivos tienden a
+    probabilidades altas y los negativos a bajas. Una separación menor simula
+    un modelo peor.
+    """
+    n = len(y_true)
     y_proba = np.empty(n, dtype=float)
 
     # Base para negativos y positivos (en Beta para que sea [0,1])
-    neg = rng.beta(2.0, 6.0, size=n)   # sesgada a valores bajos
-    pos = rng.beta(6.0, 2.0, size=n)   # sesgada a valores altos
+    neg = rng.beta(2.0, separacion, size=n)   # sesgada a valores bajos
+    pos = rng.beta(separacion, 2.0, size=n)   # sesgada a valores altos
 
     y_proba[y_true == 0] = neg[y_true == 0]
     y_proba[y_true == 1] = pos[y_true == 1]
@@ -57,29 +53,302 @@ def generar_caso_de_uso_mejor_umbral_f1():
         # poner algunos alrededor de 0.5
         y_proba[idx] = np.clip(0.5 + rng.normal(0.0, 0.02, size=len(idx)), 0.0, 1.0)
 
-    # ------------------------------------------------------------
-    # 4) Construir INPUT
-    # ------------------------------------------------------------
-    input_data = {
-        "y_true": y_true.copy(),
-        "y_proba": y_proba.copy(),
-        "step": step,
+    return y_proba
+
+
+def generar_umbrales(step):
+    """
+    Umbrales 0.0..1.0 (inclusive) con el mismo np.arange del enunciado.
+    """
+    return np.arange(0.0, 1.0 + (step / 2), step, dtype=float)  # incluye 1.0 por tolerancia
+
+
+def conteos_por_umbral(y_true, y_proba, thresholds):
+    """
+    Cuenta verdaderos positivos y predichos positivos para todos los umbrales
+    ordenando y_proba una sola vez.
+
+    Para cada t, los predichos positivos son los y_proba >= t, es decir, todo lo
+    que queda a la derecha de searchsorted(..., side="left") en el arreglo ordenado.
+    Con la suma acumulada de positivos reales en ese orden se obtiene TP sin
+    recorrer los datos otra vez. Los NaN (que argsort deja al final) nunca son
+    predichos positivos, como NaN >= t en el enunciado.
+
+    Retorna:
+        tp (np.ndarray): verdaderos positivos por umbral (int64).
+        pred_pos (np.ndarray): predichos positivos por umbral (int64).
+        support_positive (int): número de positivos reales.
+    """
+    y_true = np.asarray(y_true)
+    y_proba = np.asarray(y_proba, dtype=float)
+    thresholds = np.asarray(thresholds, dtype=float)
+
+    orden = np.argsort(y_proba, kind="stable")
+    proba_ordenada = y_proba[orden]
+    es_positivo = (y_true[orden] == 1).astype(np.int64)
+
+    # pos_acum[i] = positivos reales entre los i valores más pequeños
+    pos_acum = np.concatenate(([0], np.cumsum(es_positivo)))
+    support_positive = int(pos_acum[-1])
+    n_validos = len(y_proba) - int(np.isnan(proba_ordenada).sum())
+
+    # idx = cuántos valores quedan estrictamente por debajo de t
+    idx = np.searchsorted(proba_ordenada[:n_validos], thresholds, side="left")
+    pred_pos = (n_validos - idx).astype(np.int64)
+    tp = pos_acum[n_validos] - pos_acum[idx]
+
+    return tp, pred_pos, support_positive
+
+
+def f1_desde_conteos(tp, pred_pos, support_positive):
+    """
+    F1 a partir de conteos, con la misma fórmula que sklearn:
+        f1 = 2 * tp / (positivos_reales + predichos_positivos)
+    Si el denominador es 0 se devuelve 0.0 (zero_division=0).
+    """
+    tp = np.asarray(tp)
+    denom = (support_positive + np.asarray(pred_pos)).astype(float)
+    f1 = np.zeros(np.broadcast(tp, denom).shape, dtype=float)
+    np.divide(2.0 * tp, denom, out=f1, where=denom > 0)
+    return f1
+
+
+def mejor_umbral_f1_vectorizado(y_true, y_proba, step=0.01, umbrales="grilla"):
+    """
+    Calcula el resultado de mejor_umbral_f1 sin el bucle de f1_score por umbral.
+
+    Parámetros:
+        umbrales (str): "grilla" evalúa los umbrales 0.0..1.0 del enunciado (resultado
+            idéntico al bucle de referencia); "unicos" evalúa cada probabilidad distinta,
+            que son todos los cortes posibles.
+
+    Retorna:
+        dict: best_threshold, best_f1, support_positive.
+    """
+    if umbrales == "grilla":
+        thresholds = generar_umbrales(step)
+    elif umbrales == "unicos":
+        thresholds = np.unique(np.asarray(y_proba, dtype=float))
+    else:
+        raise ValueError(f"umbrales debe ser 'grilla' o 'unicos', no {umbrales!r}")
+
+    with etapa("conteos"):
+        tp, pred_pos, support_positive = conteos_por_umbral(y_true, y_proba, thresholds)
+    with etapa("f1"):
+        f1 = f1_desde_conteos(tp, pred_pos, support_positive)
+
+    # Umbrales ascendentes: argmax devuelve el primer máximo => en empate gana el más pequeño
+    i = int(np.argmax(f1))
+
+    return {
+        "best_threshold": float(thresholds[i]),
+        "best_f1": float(f1[i]),
+        "support_positive": int(support_positive),
     }
 
-    # ------------------------------------------------------------
-    # 5) Calcular OUTPUT esperado (Ground Truth) según el enunciado:
-    #    - probar umbrales 0.0..1.0 inclusive con step
-    #    - y_pred = (y_proba >= t).astype(int)
-    #    - f1_score(zero_division=0)
-    #    - si empate: umbral más pequeño
-    # ------------------------------------------------------------
-    thresholds = np.arange(0.0, 1.0 + (step / 2), step, dtype=float)  # incluye 1.0 por tolerancia
+
+class BosquejoUmbralF1:
+    """
+    Resumen en streaming para mejor_umbral_f1: conteos de positivos y negativos
+    por cubeta de la grilla de umbrales (ver histograma_por_umbral).
+
+    La memoria es O(len(umbrales)) sin importar cuántas filas se procesen y el
+    resultado es idéntico al de la versión en memoria. Dos bosquejos con el
+    mismo step se pueden fusionar, así que cada shard puede contarse en un
+    proceso distinto y combinarse al final.
+    """
+
+    def __init__(self, step=0.01):
+        self.step = float(step)
+        self.thresholds = generar_umbrales(self.step)
+        self.pos = np.zeros(len(self.thresholds) + 1, dtype=np.int64)
+        self.neg = np.zeros(len(self.thresholds) + 1, dtype=np.int64)
+
+    @property
+    def n_muestras(self):
+        return int(self.pos.sum() + self.neg.sum())
+
+    def actualizar(self, y_true, y_proba):
+        """
+        Agrega un fragmento (y_true, y_proba) a los conteos.
+        """
+        pos, neg = histograma_por_umbral(y_true, y_proba, self.thresholds)
+        self.pos += pos[0]
+        self.neg += neg[0]
+        return self
+
+    def fusionar(self, otro):
+        """
+        Retorna un bosquejo nuevo con la suma de ambos conteos.
+        """
+        if otro.step != self.step:
+            raise ValueError(f"No se pueden fusionar bosquejos con step distinto ({self.step} vs {otro.step})")
+
+        fusionado = BosquejoUmbralF1(self.step)
+        fusionado.pos = self.pos + otro.pos
+        fusionado.neg = self.neg + otro.neg
+        return fusionado
+
+    def resultado(self):
+        """
+        Retorna:
+            dict: best_threshold, best_f1, support_positive (igual que mejor_umbral_f1).
+        """
+        tp, pred_pos, support_positive = conteos_desde_histograma(self.pos, self.neg)
+        f1 = f1_desde_conteos(tp, pred_pos, support_positive)
+        i = int(np.argmax(f1))  # primer máximo => umbral más pequeño
+
+        return {
+            "best_threshold": float(self.thresholds[i]),
+            "best_f1": float(f1[i]),
+            "support_positive": int(support_positive),
+        }
+
+
+def fusionar_bosquejos(bosquejos):
+    """
+    Reduce una secuencia de BosquejoUmbralF1 (por ejemplo, uno por shard) a uno solo.
+    """
+    bosquejos = list(bosquejos)
+    if len(bosquejos) == 0:
+        raise ValueError("Se necesita al menos un bosquejo para fusionar")
+
+    total = bosquejos[0]
+    for b in bosquejos[1:]:
+        total = total.fusionar(b)
+    return total
+
+
+def iterar_fragmentos_npy(ruta_y_true, ruta_y_proba, tamano_fragmento=1_000_000):
+    """
+    Recorre dos archivos .npy memory-mapped en fragmentos de tamano_fragmento filas.
+    Solo un fragmento a la vez se materializa en RAM.
+
+    Produce:
+        (y_true, y_proba) por fragmento.
+    """
+    y_true = np.load(ruta_y_true, mmap_mode="r")
+    y_proba = np.load(ruta_y_proba, mmap_mode="r")
+    if len(y_true) != len(y_proba):
+        raise ValueError(f"y_true ({len(y_true)}) y y_proba ({len(y_proba)}) tienen distinto largo")
+
+    for inicio in range(0, len(y_true), tamano_fragmento):
+        fin = inicio + tamano_fragmento
+        yield np.asarray(y_true[inicio:fin]), np.asarray(y_proba[inicio:fin])
+
+
+def mejor_umbral_f1_streaming(fragmentos, step=0.01):
+    """
+    mejor_umbral_f1 sobre un iterable de fragmentos (y_true, y_proba), por ejemplo
+    el de iterar_fragmentos_npy. Exacto en la grilla de umbrales e idéntico al
+    resultado en memoria.
+    """
+    bosquejo = BosquejoUmbralF1(step)
+    for y_true, y_proba in fragmentos:
+        bosquejo.actualizar(y_true, y_proba)
+    return bosquejo.resultado()
+
+
+def mejor_umbral_f1_bootstrap(y_true, y_proba, step=0.01, n_bootstrap=1000, nivel=0.95,
+                              semilla=None, tamano_bloque=None):
+    """
+    Intervalos bootstrap para el umbral óptimo de F1.
+
+    Todas las remuestras se representan como una matriz de conteos
+    (n_bootstrap x n) tomada de una multinomial, y el F1 de cada remuestra en
+    cada umbral sale de sumas acumuladas sobre esa matriz: no hay un bucle de
+    f1_score por remuestra ni por umbral. Las remuestras se procesan en bloques
+    de tamano_bloque filas para acotar la memoria.
+
+    Parámetros:
+        n_bootstrap (int): número de remuestras.
+        nivel (float): nivel de confianza de los intervalos (percentiles).
+        semilla: semilla o np.random.Generator (se pasa a np.random.default_rng).
+        tamano_bloque (int): remuestras por bloque; por defecto ~2e7 celdas por bloque.
+
+    Retorna:
+        dict con:
+            best_threshold, best_f1, support_positive: resultado sobre los datos completos.
+            umbrales_bootstrap (np.ndarray): mejor umbral de cada remuestra.
+            intervalo_umbral (tuple): intervalo de confianza del umbral.
+            f1_en_umbral (np.ndarray): F1 de cada remuestra en best_threshold.
+            intervalo_f1 (tuple): intervalo de confianza de ese F1.
+    """
+    y_true = np.asarray(y_true)
+    y_proba = np.asarray(y_proba, dtype=float)
+    n = len(y_proba)
+
+    thresholds = generar_umbrales(step)
+    completo = mejor_umbral_f1_vectorizado(y_true, y_proba, step=step)
+    i_completo = int(np.searchsorted(thresholds, completo["best_threshold"]))
+
+    # Ordenar las muestras por cubeta: los predichos positivos del umbral i son
+    # las posiciones desde limites[i] hasta el final (los NaN, en la cubeta 0).
+    cubetas = np.where(np.isnan(y_proba), 0, np.searchsorted(thresholds, y_proba, side="right"))
+    orden = np.argsort(cubetas, kind="stable")
+    es_positivo = (y_true[orden] == 1)
+    limites = np.searchsorted(cubetas[orden], np.arange(1, len(thresholds) + 1), side="left")
+
+    if tamano_bloque is None:
+        tamano_bloque = max(1, 20_000_000 // max(n, 1))
+
+    rng = np.random.default_rng(semilla)
+    pvals = np.full(n, 1.0 / n)
+
+    umbrales_bootstrap = np.empty(n_bootstrap, dtype=float)
+    f1_en_umbral = np.empty(n_bootstrap, dtype=float)
+
+    for inicio in range(0, n_bootstrap, tamano_bloque):
+        b = min(tamano_bloque, n_bootstrap - inicio)
+
+        # Conteos de cada muestra en cada remuestra (b x n), en el orden por cubeta
+        pesos = rng.multinomial(n, pvals, size=b)[:, orden]
+
+        ceros = np.zeros((b, 1), dtype=np.int64)
+        acum_total = np.concatenate([ceros, np.cumsum(pesos, axis=1)], axis=1)
+        acum_pos = np.concatenate([ceros, np.cumsum(pesos * es_positivo, axis=1)], axis=1)
+
+        pred_pos = acum_total[:, -1:] - acum_total[:, limites]
+        tp = acum_pos[:, -1:] - acum_pos[:, limites]
+        support_positive = acum_pos[:, -1:]
+
+        f1 = f1_desde_conteos(tp, pred_pos, support_positive)
+        i = np.argmax(f1, axis=1)  # primer máximo => umbral más pequeño
+
+        umbrales_bootstrap[inicio:inicio + b] = thresholds[i]
+        f1_en_umbral[inicio:inicio + b] = f1[:, i_completo]
+
+    alfa = (1.0 - nivel) / 2.0
+    cuantiles = [alfa, 1.0 - alfa]
+
+    return {
+        **completo,
+        "umbrales_bootstrap": umbrales_bootstrap,
+        "intervalo_umbral": tuple(float(v) for v in np.quantile(umbrales_bootstrap, cuantiles)),
+        "f1_en_umbral": f1_en_umbral,
+        "intervalo_f1": tuple(float(v) for v in np.quantile(f1_en_umbral, cuantiles)),
+    }
+
+
+def mejor_umbral_f1_referencia(y_true, y_proba, step=0.01):
+    """
+    Implementación directa del enunciado (un f1_score por umbral).
+    Se conserva para verificar el motor vectorizado.
+    """
+    # sklearn se importa aquí: el generador (motor vectorizado) no lo necesita
+    from sklearn.metrics import f1_score
+
+    y_true = np.asarray(y_true)
+    y_proba = np.asarray(y_proba, dtype=float)
+
+    thresholds = generar_umbrales(step)
     best_threshold = float(thresholds[0])
     best_f1 = -1.0
 
     for t in thresholds:
         y_pred = (y_proba >= t).astype(int)
-        score = float(f1_score(y_true, y_pred, zero_division=0))
+        with etapa("f1_score"):
+            score = float(f1_score(y_true, y_pred, zero_division=0))
 
         if score > best_f1:
             best_f1 = score
@@ -87,15 +356,358 @@ def generar_caso_de_uso_mejor_umbral_f1():
         elif score == best_f1 and float(t) < best_threshold:
             best_threshold = float(t)
 
-    output_data = {
+    return {
         "best_threshold": float(best_threshold),
         "best_f1": float(best_f1),
         "support_positive": int(y_true.sum()),
     }
 
+
+def histograma_por_umbral(y_true, y_proba, thresholds, claves=None, n_claves=1):
+    """
+    Cuenta positivos y negativos reales por "cubeta" de la grilla de umbrales.
+
+    La cubeta de una probabilidad p es r = cuántos umbrales son <= p
+    (searchsorted side="right"), así que p >= thresholds[i] equivale a r > i.
+    Como solo se compara p contra la grilla, los conteos son exactos y sirven
+    para cualquier forma de y_proba. Los NaN van a la cubeta 0 (nunca son
+    predichos positivos).
+
+    Parámetros:
+        claves: array opcional de enteros en [0, n_claves) con la misma forma que
+            y_proba; separa los conteos (por ejemplo grupo x modelo).
+
+    Retorna:
+        pos, neg (np.ndarray): conteos int64 de forma (n_claves, len(thresholds) + 1).
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    n_bins = len(thresholds) + 1
+
+    y_proba = np.asarray(y_proba, dtype=float).ravel()
+    cubetas = np.where(np.isnan(y_proba), 0, np.searchsorted(thresholds, y_proba, side="right"))
+    if claves is not None:
+        cubetas = np.asarray(claves, dtype=np.int64).ravel() * n_bins + cubetas
+
+    es_positivo = (np.asarray(y_true) == 1).ravel()
+    total = np.bincount(cubetas, minlength=n_claves * n_bins)
+    pos = np.bincount(cubetas, weights=es_positivo, minlength=n_claves * n_bins)
+
+    pos = pos.astype(np.int64).reshape(n_claves, n_bins)
+    neg = total.reshape(n_claves, n_bins) - pos
+    return pos, neg
+
+
+def conteos_desde_histograma(pos, neg):
+    """
+    Convierte conteos por cubeta (última dimensión) en TP y predichos positivos
+    por umbral con una suma acumulada desde la derecha.
+
+    Retorna:
+        tp, pred_pos (np.ndarray): forma (..., n_bins - 1).
+        support_positive (np.ndarray): forma (...).
+    """
+    pos_der = np.cumsum(pos[..., ::-1], axis=-1)[..., ::-1]
+    total_der = np.cumsum((pos + neg)[..., ::-1], axis=-1)[..., ::-1]
+
+    # Umbral i: predichos positivos = cubetas i+1 en adelante
+    return pos_der[..., 1:], total_der[..., 1:], pos_der[..., 0]
+
+
+def mejor_umbral_f1_lote(y_true, y_proba, step=0.01, grupos=None):
+    """
+    Versión por lotes de mejor_umbral_f1: evalúa varias columnas de probabilidades
+    (modelos) y, opcionalmente, varios grupos de filas en una sola pasada.
+
+    Parámetros:
+        y_true: array (n_samples,) compartido por todos los modelos o (n_samples, n_models).
+        y_proba: array (n_samples, n_models).
+        step (float): tamaño del paso de la grilla de umbrales.
+        grupos: array opcional (n_samples,) con el grupo de cada fila.
+
+    Retorna:
+        dict con best_threshold, best_f1 y support_positive como arrays de forma
+        (n_models,), o (n_grupos, n_models) si se pasan grupos; en ese caso se
+        agrega "grupos" con las etiquetas en el orden de las filas del resultado.
+    """
+    y_proba = np.asarray(y_proba, dtype=float)
+    if y_proba.ndim == 1:
+        y_proba = y_proba.reshape(-1, 1)
+    n_samples, n_models = y_proba.shape
+
+    y_true = np.asarray(y_true)
+    if y_true.ndim == 1:
+        y_true = np.broadcast_to(y_true.reshape(-1, 1), (n_samples, n_models))
+    if y_true.shape != y_proba.shape:
+        raise ValueError(f"y_true {y_true.shape} no es compatible con y_proba {y_proba.shape}")
+
+    if grupos is None:
+        etiquetas = None
+        codigos = np.zeros(n_samples, dtype=np.int64)
+    else:
+        etiquetas, codigos = np.unique(np.asarray(grupos), return_inverse=True)
+    n_grupos = 1 if etiquetas is None else len(etiquetas)
+
+    # Clave por celda: grupo de la fila x columna del modelo
+    claves = codigos.reshape(-1, 1) * n_models + np.arange(n_models)
+
+    thresholds = generar_umbrales(step)
+    with etapa("histograma"):
+        pos, neg = histograma_por_umbral(y_true, y_proba, thresholds, claves, n_grupos * n_models)
+    with etapa("conteos"):
+        tp, pred_pos, support_positive = conteos_desde_histograma(pos, neg)
+    with etapa("f1"):
+        f1 = f1_desde_conteos(tp, pred_pos, support_positive[:, None])
+
+    # Primer máximo por fila => en empate gana el umbral más pequeño
+    i = np.argmax(f1, axis=1)
+    best_f1 = f1[np.arange(len(i)), i]
+
+    forma = (n_models,) if etiquetas is None else (n_grupos, n_models)
+    resultado = {
+        "best_threshold": thresholds[i].reshape(forma),
+        "best_f1": best_f1.reshape(forma),
+        "support_positive": support_positive.reshape(forma),
+    }
+    if etiquetas is not None:
+        resultado["grupos"] = etiquetas
+    return resultado
+
+
+def mejor_umbral_f1_lote_referencia(y_true, y_proba, step=0.01, grupos=None):
+    """
+    Mismo contrato que mejor_umbral_f1_lote, pero llamando a
+    mejor_umbral_f1_referencia columna por columna (y grupo por grupo).
+    """
+    y_proba = np.asarray(y_proba, dtype=float)
+    if y_proba.ndim == 1:
+        y_proba = y_proba.reshape(-1, 1)
+    n_samples, n_models = y_proba.shape
+
+    y_true = np.asarray(y_true)
+    if y_true.ndim == 1:
+        y_true = np.broadcast_to(y_true.reshape(-1, 1), (n_samples, n_models))
+
+    grupos_arr = np.zeros(n_samples) if grupos is None else np.asarray(grupos)
+    etiquetas = np.unique(grupos_arr)
+
+    forma = (len(etiquetas), n_models)
+    resultado = {
+        "best_threshold": np.zeros(forma, dtype=float),
+        "best_f1": np.zeros(forma, dtype=float),
+        "support_positive": np.zeros(forma, dtype=np.int64),
+    }
+    for g, etiqueta in enumerate(etiquetas):
+        filas = grupos_arr == etiqueta
+        for j in range(n_models):
+            r = mejor_umbral_f1_referencia(y_true[filas, j], y_proba[filas, j], step)
+            for clave, valor in r.items():
+                resultado[clave][g, j] = valor
+
+    if grupos is None:
+        resultado = {clave: valor[0] for clave, valor in resultado.items()}
+    else:
+        resultado["grupos"] = etiquetas
+    return resultado
+
+
+def generar_entrada_mejor_umbral_f1(size=None, seed=None):
+    """
+    Input aleatorio de un caso de uso de mejor_umbral_f1 (pasos 1 a 4 de
+    generar_caso_de_uso_mejor_umbral_f1), sin calcular el ground truth.
+
+    Parámetros:
+        size (int): número de muestras; por defecto 40 a 179.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
+
+    Retorna:
+        input_data (dict): Diccionario con las claves esperadas por la función solución.
+    """
+
+    rng = np.random.default_rng(seed)  # aleatorio distinto en cada ejecución, salvo con seed
+
+    # ------------------------------------------------------------
+    # 1) Tamaño del dataset y step
+    # ------------------------------------------------------------
+    n = int(rng.integers(40, 180)) if size is None else int(size)  # 40 a 179 muestras
+    possible_steps = np.array([0.01, 0.02, 0.05, 0.1], dtype=float)
+    step = float(rng.choice(possible_steps))
+
+    # ------------------------------------------------------------
+    # 2) Generar y_true con proporción de positivos aleatoria (evitar extremos triviales)
+    # ------------------------------------------------------------
+    y_true = _simular_etiquetas(rng, n)
+
+    # ------------------------------------------------------------
+    # 3) Generar y_proba con cierta "separación" (pero con ruido)
+    #    - positivos tienden a proba más alta
+    #    - negativos tienden a proba más baja
+    # ------------------------------------------------------------
+    y_proba = _simular_probabilidades(rng, y_true)
+
+    # ------------------------------------------------------------
+    # 4) Construir INPUT
+    # ------------------------------------------------------------
+    input_data = {
+        "y_true": y_true.copy(),
+        "y_proba": y_proba.copy(),
+        "step": step,
+    }
+
+    return input_data
+
+
+def generar_caso_de_uso_mejor_umbral_f1(size=None, seed=None, cache=None):
+    """
+    Genera un caso de uso aleatorio (input/output esperado) para la función:
+
+        mejor_umbral_f1(y_true, y_proba, step=0.01)
+
+    Parámetros:
+        size (int): número de muestras; por defecto 40 a 179.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
+        cache (CacheResultados): cache en disco del ground truth; por defecto la
+            global de cache_resultados.configurar_cache (cache=False la ignora).
+
+    Retorna:
+        input_data (dict): Diccionario con las claves esperadas por la función solución.
+        output_data (dict): Diccionario esperado con best_threshold, best_f1, support_positive.
+    """
+
+    with caso("mejor_umbral_f1", size=size):
+        with etapa("entrada"):
+            input_data = generar_entrada_mejor_umbral_f1(size=size, seed=seed)
+
+        # ------------------------------------------------------------
+        # 5) Calcular OUTPUT esperado (Ground Truth) según el enunciado:
+        #    - probar umbrales 0.0..1.0 inclusive con step
+        #    - y_pred = (y_proba >= t).astype(int)
+        #    - f1_score(zero_division=0)
+        #    - si empate: umbral más pequeño
+        #    Se usa el motor vectorizado (un solo sort + cumsum), que da exactamente
+        #    el mismo resultado que mejor_umbral_f1_referencia.
+        # ------------------------------------------------------------
+        with etapa("ground_truth"):
+            output_data = calcular_con_cache(mejor_umbral_f1_vectorizado, cache=cache, **input_data)
+
+    return input_data, output_data
+
+
+def generar_entrada_mejor_umbral_f1_lote(size=None, seed=None):
+    """
+    Input aleatorio de un caso de uso de mejor_umbral_f1_lote (pasos 1 a 4 de
+    generar_caso_de_uso_mejor_umbral_f1_lote), sin calcular el ground truth.
+
+    Parámetros:
+        size (int): número de muestras; por defecto 100 a 599.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
+
+    Retorna:
+        input_data (dict): y_true, y_proba (n_samples, n_models), step, grupos.
+    """
+
+    rng = np.random.default_rng(seed)  # aleatorio distinto en cada ejecución, salvo con seed
+
+    # ------------------------------------------------------------
+    # 1) Tamaño del dataset, número de modelos y step
+    # ------------------------------------------------------------
+    n = int(rng.integers(100, 600)) if size is None else int(size)
+    n_models = int(rng.integers(2, 9))  # 2 a 8 modelos
+    possible_steps = np.array([0.01, 0.02, 0.05, 0.1], dtype=float)
+    step = float(rng.choice(possible_steps))
+
+    # ------------------------------------------------------------
+    # 2) Etiquetas compartidas y una columna de probabilidades por modelo
+    # ------------------------------------------------------------
+    y_true = _simular_etiquetas(rng, n)
+    separaciones = rng.uniform(2.5, 8.0, size=n_models)
+    y_proba = np.column_stack([_simular_probabilidades(rng, y_true, float(s)) for s in separaciones])
+
+    # ------------------------------------------------------------
+    # 3) A veces segmentar filas en grupos (slices de etiquetas)
+    # ------------------------------------------------------------
+    grupos = None
+    if rng.random() < 0.6:
+        n_grupos = int(rng.integers(2, 5))
+        grupos = rng.choice(np.array([f"G{i}" for i in range(1, n_grupos + 1)]), size=n)
+
+    # ------------------------------------------------------------
+    # 4) Construir INPUT
+    # ------------------------------------------------------------
+    input_data = {
+        "y_true": y_true.copy(),
+        "y_proba": y_proba.copy(),
+        "step": step,
+        "grupos": None if grupos is None else grupos.copy(),
+    }
+
+    return input_data
+
+
+def generar_caso_de_uso_mejor_umbral_f1_lote(size=None, seed=None, cache=None):
+    """
+    Genera un caso de uso aleatorio para la versión por lotes:
+
+        mejor_umbral_f1_lote(y_true, y_proba, step=0.01, grupos=None)
+
+    y_proba tiene una columna por modelo (cada uno con distinta calidad) y, en
+    algunos casos, las filas vienen etiquetadas por grupo.
+
+    Parámetros:
+        size (int): número de muestras; por defecto 100 a 599.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
+        cache (CacheResultados): cache en disco del ground truth; por defecto la
+            global de cache_resultados.configurar_cache (cache=False la ignora).
+
+    Retorna:
+        input_data (dict): y_true, y_proba (n_samples, n_models), step, grupos.
+        output_data (dict): best_threshold, best_f1, support_positive por columna
+            (y por grupo si grupos no es None).
+    """
+
+    with caso("mejor_umbral_f1_lote", size=size):
+        with etapa("entrada"):
+            input_data = generar_entrada_mejor_umbral_f1_lote(size=size, seed=seed)
+
+        # ------------------------------------------------------------
+        # 5) Calcular OUTPUT esperado con el motor por lotes
+        #    (equivale a mejor_umbral_f1 por columna y por grupo)
+        # ------------------------------------------------------------
+        with etapa("ground_truth"):
+            output_data = calcular_con_cache(mejor_umbral_f1_lote, cache=cache, **input_data)
+
     return input_data, output_data
 
 
+def iterar_casos(n_cases, size=None, seed=None, cache=None):
+    """
+    Mismos casos que generate (mismas semillas), uno a la vez: para lotes
+    grandes que se escriben a disco sin tenerlos todos en memoria.
+    """
+    for semilla in np.random.SeedSequence(seed).spawn(int(n_cases)):
+        yield generar_caso_de_uso_mejor_umbral_f1(size=size, seed=semilla, cache=cache)
+
+
+def generate(n_cases, size=None, seed=None, cache=None):
+    """
+    Genera n_cases casos de uso de mejor_umbral_f1.
+
+    Parámetros:
+        size (int): muestras por caso (ver generar_caso_de_uso_mejor_umbral_f1);
+            puede llegar a millones para pruebas de carga.
+        seed (int): semilla del lote; cada caso usa una semilla derivada
+            (SeedSequence.spawn), así el lote completo es reproducible.
+        cache (CacheResultados): cache en disco del ground truth (ver calcular_con_cache).
+
+    Retorna:
+        list[tuple]: (input_data, output_data) por caso.
+    """
+    return list(iterar_casos(n_cases, size=size, seed=seed, cache=cache))
+
+
 if __name__ == "__main__":
     entrada, salida_esperada = generar_caso_de_uso_mejor_umbral_f1()
 
@@ -107,4 +719,32 @@ if __name__ == "__main__":
     print("y_proba (primeros 20):", np.round(entrada["y_proba"][:20], 4))
 
     print("\n=== OUTPUT ESPERADO ===")
-    print(salida_esperada)
\ No newline at end of file
+    print(salida_esperada)
+
+    # Verificación rápida contra el bucle de f1_score del enunciado
+    referencia = mejor_umbral_f1_referencia(entrada["y_true"], entrada["y_proba"], entrada["step"])
+    print("\nCoincide con la referencia:", referencia == salida_esperada)
+
+    # Misma respuesta procesando el caso en fragmentos (streaming)
+    fragmentos = zip(
+        np.array_split(entrada["y_true"], 4),
+        np.array_split(entrada["y_proba"], 4),
+    )
+    print("Coincide en streaming:", mejor_umbral_f1_streaming(fragmentos, entrada["step"]) == salida_esperada)
+
+    # Estabilidad del umbral: intervalos bootstrap
+    bootstrap = mejor_umbral_f1_bootstrap(entrada["y_true"], entrada["y_proba"], entrada["step"], n_bootstrap=1000)
+    print("IC 95% del umbral:", bootstrap["intervalo_umbral"])
+    print("IC 95% del F1 en el umbral elegido:", bootstrap["intervalo_f1"])
+
+    # Caso por lotes (varios modelos y grupos) validado contra la versión escalar
+    entrada_lote, salida_lote = generar_caso_de_uso_mejor_umbral_f1_lote()
+    referencia_lote = mejor_umbral_f1_lote_referencia(**entrada_lote)
+
+    print("\n=== CASO POR LOTES ===")
+    print("y_proba shape:", entrada_lote["y_proba"].shape)
+    print("grupos:", None if entrada_lote["grupos"] is None else salida_lote["grupos"])
+    print("best_threshold:\n", salida_lote["best_threshold"])
+    print("Coincide con la referencia:", all(
+        np.array_equal(salida_lote[clave], referencia_lote[clave]) for clave in referencia_lote
+    ))
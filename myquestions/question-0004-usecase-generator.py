@@ -1,21 +1,477 @@
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import silhouette_score
+from sklearn.metrics.pairwise import euclidean_distances
+from threadpoolctl import threadpool_limits
+
+if not __package__:
+    # Corrido como script: los auxiliares se importan desde el paquete myquestions (PEP 366)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "myquestions"
+
+from .cache_resultados import calcular_con_cache
+from .perfilado import caso, etapa
 
 
-def generar_caso_de_uso_mejor_k_kmeans():
+def puntaje_k(X_scaled, k, random_state):
     """
-    Genera un caso de uso aleatorio (input/output esperado) para la función:
+    Silhouette de KMeans(n_clusters=k, random_state=random_state, n_init=10) sobre X_scaled.
+    """
+    model = KMeans(n_clusters=int(k), random_state=random_state, n_init=10)
+    with etapa("kmeans_fit_predict"):
+        labels = model.fit_predict(X_scaled)
+    with etapa("silhouette"):
+        return float(silhouette_score(X_scaled, labels))
 
-        mejor_k_kmeans(X, k_values, random_state=42)
+
+def elegir_mejor_k(scores_dict):
+    """
+    Mejor k según el enunciado: mayor score y, si hay empate, el k más pequeño.
+
+    Retorna:
+        dict: best_k, best_score y scores.
+    """
+    best_k = None
+    best_score = None
+
+    for k, score in scores_dict.items():
+        if best_score is None or score > best_score:
+            best_score = score
+            best_k = int(k)
+        elif score == best_score and int(k) < int(best_k):
+            best_k = int(k)
+
+    return {
+        "best_k": int(best_k),
+        "best_score": float(best_score),
+        "scores": {int(k): float(v) for k, v in scores_dict.items()},
+    }
+
+
+def mejor_k_kmeans_referencia(X, k_values, random_state=42):
+    """
+    Implementación directa del enunciado: escalar X y evaluar cada k en orden.
+    """
+    with etapa("escalado"):
+        X_scaled = StandardScaler().fit_transform(X)
+    scores_dict = {int(k): puntaje_k(X_scaled, k, random_state) for k in k_values}
+    return elegir_mejor_k(scores_dict)
+
+
+def etiquetas_kmeans(X_scaled, k_values, random_state=42):
+    """
+    Etiquetas de KMeans(n_clusters=k, random_state=random_state, n_init=10) para cada k.
+
+    Retorna:
+        dict: {k: etiquetas (np.ndarray)}.
+    """
+    return {
+        int(k): KMeans(n_clusters=int(k), random_state=random_state, n_init=10).fit_predict(X_scaled)
+        for k in k_values
+    }
+
+
+def silhouette_por_bloques(X, etiquetados, memoria_mb=256):
+    """
+    Silhouette promedio para varios etiquetados de las mismas filas sin construir
+    la matriz n x n de distancias.
+
+    Recorre X por bloques de filas: cada bloque de distancias (float32) se
+    multiplica por una matriz one-hot con los clusters de todos los etiquetados
+    apilados, así que las sumas de distancias por cluster de todos los k salen
+    del mismo bloque y las distancias se calculan una sola vez. El tamaño del
+    bloque se ajusta para que distancias + one-hot quepan en memoria_mb.
+
+    Coincide con sklearn.metrics.silhouette_score con |diferencia| <= 1e-5 en
+    datos estandarizados (las distancias se acumulan en float32).
+
+    Parámetros:
+        X (np.ndarray): datos (n_samples, n_features).
+        etiquetados (list): lista de arrays de etiquetas, uno por candidato.
+        memoria_mb (float): presupuesto aproximado de memoria de trabajo.
+
+    Retorna:
+        list: silhouette promedio (float) por etiquetado, en el mismo orden.
+    """
+    X32 = np.asarray(X, dtype=np.float32)
+    n = len(X32)
+
+    # Codificar cada etiquetado como 0..k-1 y ubicarlo en columnas consecutivas
+    codigos, desde, conteos = [], [], []
+    total_cols = 0
+    for etiquetas in etiquetados:
+        _, cod = np.unique(np.asarray(etiquetas), return_inverse=True)
+        n_labels = int(cod.max()) + 1
+        if not 2 <= n_labels <= n - 1:
+            raise ValueError(f"El número de etiquetas es {n_labels}. Los valores válidos son 2 a n_samples - 1 (inclusive)")
+        codigos.append(cod)
+        desde.append(total_cols)
+        conteos.append(np.bincount(cod).astype(float))
+        total_cols += n_labels
+
+    one_hot = np.zeros((n, total_cols), dtype=np.float32)
+    filas = np.arange(n)
+    for cod, d in zip(codigos, desde):
+        one_hot[filas, d + cod] = 1.0
+
+    # Filas por bloque: distancias (b x n) + sumas (b x total_cols) en float32
+    libre = memoria_mb * 1024 ** 2 - one_hot.nbytes
+    tamano_bloque = int(max(1, min(n, libre // (4 * (n + total_cols)))))
+
+    sumas_silhouette = np.zeros(len(etiquetados), dtype=float)
+
+    for inicio in range(0, n, tamano_bloque):
+        fin = min(n, inicio + tamano_bloque)
+        distancias = euclidean_distances(X32[inicio:fin], X32)
+        sumas_cluster = (distancias @ one_hot).astype(float)
+        del distancias
+        bloque = np.arange(fin - inicio)
+
+        for m, (cod, d, cnt) in enumerate(zip(codigos, desde, conteos)):
+            sumas = sumas_cluster[:, d:d + len(cnt)]
+            propio = cod[inicio:fin]
+            tam_propio = cnt[propio]
+
+            # a: distancia media al propio cluster (sin contarse a sí mismo)
+            a = sumas[bloque, propio] / np.maximum(tam_propio - 1, 1)
+
+            # b: menor distancia media a otro cluster
+            medias = sumas / cnt
+            medias[bloque, propio] = np.inf
+            b = medias.min(axis=1)
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                s = (b - a) / np.maximum(a, b)
+            s = np.nan_to_num(s)
+            s[tam_propio == 1] = 0.0  # convención de sklearn para clusters de un punto
+
+            sumas_silhouette[m] += s.sum()
+
+    return [float(v) for v in sumas_silhouette / n]
+
+
+def mejor_k_kmeans_por_bloques(X, k_values, random_state=42, memoria_mb=256):
+    """
+    Igual que mejor_k_kmeans_referencia, pero con silhouette_por_bloques:
+    la memoria de la silhouette queda acotada por memoria_mb y las distancias
+    se comparten entre todos los k. Los scores coinciden con sklearn solo hasta
+    1e-5, así que no se usa para el ground truth de los casos de uso.
+    """
+    with etapa("escalado"):
+        X_scaled = StandardScaler().fit_transform(X)
+    with etapa("kmeans_fit_predict"):
+        etiquetas = etiquetas_kmeans(X_scaled, k_values, random_state)
+    with etapa("silhouette"):
+        scores = silhouette_por_bloques(X_scaled, list(etiquetas.values()), memoria_mb=memoria_mb)
+    return elegir_mejor_k(dict(zip(etiquetas.keys(), scores)))
+
+
+def silhouette_simplificada(X, etiquetas, centros):
+    """
+    Silhouette simplificada (basada en centroides), O(n * k):
+        a = distancia al centroide propio
+        b = distancia al centroide más cercano de otro cluster
+        s = (b - a) / max(a, b)
+
+    Retorna:
+        float: promedio de s sobre todas las filas.
+    """
+    X = np.asarray(X, dtype=float)
+    etiquetas = np.asarray(etiquetas)
+    filas = np.arange(len(X))
+
+    distancias = euclidean_distances(X, np.asarray(centros, dtype=float))
+    a = distancias[filas, etiquetas]
+    distancias[filas, etiquetas] = np.inf
+    b = distancias.min(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s = np.nan_to_num((b - a) / np.maximum(a, b))
+    return float(s.mean())
+
+
+def muestra_estratificada(etiquetas, tamano_muestra, rng):
+    """
+    Índices de una muestra sin reemplazo estratificada por etiqueta
+    (asignación proporcional, al menos 2 filas por estrato cuando existen).
+    """
+    etiquetas = np.asarray(etiquetas)
+    n = len(etiquetas)
+    if tamano_muestra >= n:
+        return np.arange(n)
+
+    valores, cod = np.unique(etiquetas, return_inverse=True)
+    conteos = np.bincount(cod)
+    cuotas = np.minimum(conteos, np.maximum(2, np.round(conteos * tamano_muestra / n).astype(int)))
+
+    # Orden aleatorio dentro de cada estrato y tomar las primeras cuotas[c] filas
+    orden = np.lexsort((rng.random(n), cod))
+    inicio_estrato = np.concatenate(([0], np.cumsum(conteos)[:-1]))
+    posicion = np.arange(n) - np.repeat(inicio_estrato, conteos)
+    return np.sort(orden[posicion < np.repeat(cuotas, conteos)])
+
+
+def mejor_k_kmeans_aproximado(X, k_values, random_state=42, metodo="simplificada",
+                              tamano_muestra=5_000, n_repeticiones=5, n_init=1):
+    """
+    Modo aproximado (opt-in) de mejor_k_kmeans para X grandes.
+
+    - KMeans se entrena con n_init (por defecto 1 en vez de 10).
+    - metodo="simplificada": score = silhouette_simplificada sobre todo X, O(n * k).
+    - metodo="muestra": score = promedio de la silhouette exacta sobre
+      n_repeticiones muestras estratificadas de tamano_muestra filas.
+
+    Las muestras se estratifican por las etiquetas del k más grande (la partición
+    más fina) y son las mismas para todos los k, así que las comparaciones entre
+    k son pareadas.
+
+    El desacuerdo con el modo exacto se estima con esas muestras: en cada una se
+    calcula la silhouette exacta de todos los k y se cuenta si su mejor k difiere
+    del elegido.
+
+    Retorna:
+        dict: best_k, best_score, scores (como el modo exacto) más metodo,
+            k_por_muestra (mejor k exacto en cada muestra) y desacuerdo_estimado
+            (fracción de muestras que eligen otro k).
+    """
+    if metodo not in ("simplificada", "muestra"):
+        raise ValueError(f"metodo debe ser 'simplificada' o 'muestra', no {metodo!r}")
+
+    k_values = [int(k) for k in k_values]
+    X_scaled = StandardScaler().fit_transform(X)
+    rng = np.random.default_rng(random_state)
+
+    modelos = {
+        k: KMeans(n_clusters=k, random_state=random_state, n_init=n_init).fit(X_scaled)
+        for k in k_values
+    }
+
+    estratos = modelos[max(k_values)].labels_
+    muestras = [muestra_estratificada(estratos, tamano_muestra, rng) for _ in range(n_repeticiones)]
+
+    # Silhouette exacta por muestra: filas = muestras, columnas = k
+    exacta_muestras = np.array([
+        silhouette_por_bloques(X_scaled[idx], [modelos[k].labels_[idx] for k in k_values])
+        for idx in muestras
+    ])
+
+    if metodo == "simplificada":
+        scores_dict = {
+            k: silhouette_simplificada(X_scaled, m.labels_, m.cluster_centers_) for k, m in modelos.items()
+        }
+    else:
+        scores_dict = dict(zip(k_values, exacta_muestras.mean(axis=0).tolist()))
+
+    resultado = elegir_mejor_k(scores_dict)
+
+    # argmax devuelve el primer máximo; k_values ordenados => gana el k más pequeño
+    orden_k = np.argsort(k_values, kind="stable")
+    k_por_muestra = [int(np.array(k_values)[orden_k][np.argmax(fila[orden_k])]) for fila in exacta_muestras]
+
+    resultado["metodo"] = metodo
+    resultado["k_por_muestra"] = k_por_muestra
+    resultado["desacuerdo_estimado"] = float(np.mean([k != resultado["best_k"] for k in k_por_muestra]))
+    return resultado
+
+
+def iterar_fragmentos_X(fuente, tamano_fragmento=100_000):
+    """
+    Recorre una fuente de filas por fragmentos. Se puede llamar varias veces
+    (una por pasada), así que la fuente debe ser re-iterable:
+
+    - np.ndarray o memmap (np.load(..., mmap_mode="r")): se corta en tamano_fragmento filas.
+    - lista de rutas .npy (shards): cada shard se abre memory-mapped y se corta igual.
+    - función sin argumentos que devuelve un iterador nuevo de fragmentos.
+
+    Produce:
+        np.ndarray (float) por fragmento.
+    """
+    if callable(fuente):
+        for fragmento in fuente():
+            yield np.asarray(fragmento, dtype=float)
+        return
+
+    if isinstance(fuente, (list, tuple)) and all(isinstance(r, (str, os.PathLike)) for r in fuente):
+        for ruta in fuente:
+            yield from iterar_fragmentos_X(np.load(ruta, mmap_mode="r"), tamano_fragmento)
+        return
+
+    for inicio in range(0, len(fuente), tamano_fragmento):
+        yield np.asarray(fuente[inicio:inicio + tamano_fragmento], dtype=float)
+
+
+class ReservorioFilas:
+    """
+    Muestra uniforme sin reemplazo de tamaño fijo sobre un flujo de filas
+    (algoritmo R, vectorizado por fragmento). La memoria es O(tamano * n_features).
+    """
+
+    def __init__(self, tamano, rng):
+        self.tamano = int(tamano)
+        self.rng = rng
+        self.vistos = 0
+        self.muestra = None
+
+    def actualizar(self, fragmento):
+        fragmento = np.asarray(fragmento, dtype=float)
+        if self.muestra is None:
+            self.muestra = np.empty((0, fragmento.shape[1]), dtype=float)
+
+        # 1) Llenar el reservorio mientras no esté completo
+        faltan = self.tamano - len(self.muestra)
+        if faltan > 0:
+            self.muestra = np.vstack([self.muestra, fragmento[:faltan]])
+            self.vistos += min(faltan, len(fragmento))
+            fragmento = fragmento[faltan:]
+        if len(fragmento) == 0:
+            return self
+
+        # 2) La fila i-ésima (1-based) reemplaza una posición j < tamano con prob. tamano / i
+        posicion_global = self.vistos + np.arange(1, len(fragmento) + 1)
+        j = (self.rng.random(len(fragmento)) * posicion_global).astype(np.int64)
+        reemplaza = np.flatnonzero(j < self.tamano)
+
+        # Si dos filas caen en la misma posición gana la última (como en el algoritmo secuencial)
+        destinos = j[reemplaza][::-1]
+        _, primeras = np.unique(destinos, return_index=True)
+        origen = reemplaza[::-1][primeras]
+        self.muestra[j[origen]] = fragmento[origen]
+
+        self.vistos += len(fragmento)
+        return self
+
+
+def mejor_k_kmeans_fuera_de_memoria(fuente, k_values, random_state=42, tamano_fragmento=100_000,
+                                    tamano_reserva=10_000, n_epocas=1):
+    """
+    Variante out-of-core de mejor_k_kmeans para X que no cabe en RAM
+    (por ejemplo, shards .npy). La memoria pico depende de tamano_fragmento y
+    tamano_reserva, no del número total de filas.
+
+    1) Una pasada: StandardScaler.partial_fit (media y varianza en streaming) y
+       una muestra de reservorio de las filas.
+    2) n_epocas pasadas: MiniBatchKMeans.partial_fit de cada k sobre los fragmentos escalados
+       (el primer partial_fit de cada k junta fragmentos hasta tener al menos k filas).
+    3) Silhouette de cada k sobre la muestra de reservorio (silhouette_por_bloques).
+
+    Parámetros:
+        fuente: ver iterar_fragmentos_X.
+
+    Retorna:
+        dict: best_k, best_score, scores (sobre la muestra) y n_filas.
+    """
+    k_values = [int(k) for k in k_values]
+    rng = np.random.default_rng(random_state)
+
+    scaler = StandardScaler()
+    reservorio = ReservorioFilas(tamano_reserva, rng)
+    for fragmento in iterar_fragmentos_X(fuente, tamano_fragmento):
+        scaler.partial_fit(fragmento)
+        reservorio.actualizar(fragmento)
+    if reservorio.vistos <= max(k_values):
+        raise ValueError(f"La fuente tiene {reservorio.vistos} filas; se necesitan más que el mayor k ({max(k_values)})")
+
+    modelos = {k: MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3) for k in k_values}
+    # Fragmentos guardados de cada k hasta su primer partial_fit (que necesita al menos k filas)
+    pendientes = {k: [] for k in k_values}
+    for _ in range(n_epocas):
+        for fragmento in iterar_fragmentos_X(fuente, tamano_fragmento):
+            fragmento_scaled = scaler.transform(fragmento)
+            for k, modelo in modelos.items():
+                if pendientes[k] is None:
+                    modelo.partial_fit(fragmento_scaled)
+                    continue
+                pendientes[k].append(fragmento_scaled)
+                if sum(len(f) for f in pendientes[k]) >= k:
+                    modelo.partial_fit(np.vstack(pendientes[k]))
+                    pendientes[k] = None
+
+    muestra_scaled = scaler.transform(reservorio.muestra)
+    etiquetas = [modelos[k].predict(muestra_scaled) for k in k_values]
+    scores = silhouette_por_bloques(muestra_scaled, etiquetas)
+
+    resultado = elegir_mejor_k(dict(zip(k_values, scores)))
+    resultado["n_filas"] = int(reservorio.vistos)
+    return resultado
+
+
+# Estado de cada proceso trabajador del barrido paralelo
+_X_COMPARTIDO = None
+
+
+def _iniciar_trabajador(ruta_X):
+    """
+    Abre X_scaled memory-mapped una sola vez por proceso y limita los hilos
+    BLAS/OpenMP a 1 para no sobresuscribir la CPU con varios procesos.
+    """
+    global _X_COMPARTIDO
+    _X_COMPARTIDO = np.load(ruta_X, mmap_mode="r")
+    threadpool_limits(limits=1)
+
+
+def _puntaje_k_compartido(k, random_state):
+    return puntaje_k(_X_COMPARTIDO, k, random_state)
+
+
+def mejor_k_kmeans_paralelo(X, k_values, random_state=42, n_procesos=None):
+    """
+    Igual que mejor_k_kmeans_referencia, pero reparte los valores de k en un pool
+    de procesos. X_scaled se escribe una vez en un .npy temporal que cada
+    trabajador abre memory-mapped, en lugar de serializarlo por tarea.
+
+    El resultado es determinista (cada k usa el mismo random_state) y conserva
+    la regla de desempate del k más pequeño.
+
+    Parámetros:
+        n_procesos (int): tamaño del pool; por defecto min(len(k_values), os.cpu_count()).
+    """
+    k_values = [int(k) for k in k_values]
+    if n_procesos is None:
+        n_procesos = min(len(k_values), os.cpu_count() or 1)
+
+    with etapa("escalado"):
+        X_scaled = StandardScaler().fit_transform(X)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_X = os.path.join(carpeta, "X_scaled.npy")
+        np.save(ruta_X, X_scaled)
+
+        # Las etapas dentro de los trabajadores no se ven desde aquí: se mide el pool completo
+        with etapa("pool_k"), ProcessPoolExecutor(
+            max_workers=n_procesos,
+            initializer=_iniciar_trabajador,
+            initargs=(ruta_X,),
+        ) as pool:
+            scores = list(pool.map(partial(_puntaje_k_compartido, random_state=random_state), k_values))
+
+    return elegir_mejor_k(dict(zip(k_values, scores)))
+
+
+def generar_entrada_mejor_k_kmeans(size=None, seed=None):
+    """
+    Input aleatorio de un caso de uso de mejor_k_kmeans (pasos 1 a 4 de
+    generar_caso_de_uso_mejor_k_kmeans), sin calcular el ground truth.
+
+    Parámetros:
+        size (int): número exacto de filas de X (mínimo 10: 2 por cluster y más filas
+            que el mayor k candidato); por defecto 30 a 89 filas por cluster.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
 
     Retorna:
         input_data (dict): Diccionario con las claves esperadas por la función solución.
-        output_data (dict): Diccionario esperado con best_k, best_score y scores.
     """
+    if size is not None and int(size) < 10:
+        raise ValueError(f"size debe ser >= 10 (2 filas por cluster y más filas que el mayor k), no {size}")
 
-    rng = np.random.default_rng()  # aleatorio distinto en cada ejecución
+    rng = np.random.default_rng(seed)  # aleatorio distinto en cada ejecución, salvo con seed
 
     # ------------------------------------------------------------
     # 1) Elegir parámetros del dataset
@@ -23,8 +479,13 @@ def generar_caso_de_uso_mejor_k_kmeans():
     n_features = int(rng.integers(2, 6))   # 2 a 5 features
     true_k = int(rng.integers(2, 6))       # clusters "reales" 2 a 5
 
-    # Tamaño por cluster (evitar clusters muy pequeños)
-    sizes = rng.integers(30, 90, size=true_k)
+    # Tamaño por cluster (evitar clusters muy pequeños); con size, 2 filas fijas
+    # por cluster y el resto repartido con una multinomial, así la suma es exacta
+    if size is None:
+        sizes = rng.integers(30, 90, size=true_k)
+    else:
+        proporciones = rng.uniform(1.0, 3.0, size=true_k)
+        sizes = 2 + rng.multinomial(int(size) - 2 * true_k, proporciones / proporciones.sum())
     n_samples = int(np.sum(sizes))
 
     # ------------------------------------------------------------
@@ -36,13 +497,9 @@ def generar_caso_de_uso_mejor_k_kmeans():
     # Varianzas distintas por cluster (algo de diversidad)
     stds = rng.uniform(0.4, 1.8, size=true_k)
 
-    X_parts = []
-    for i in range(true_k):
-        cov = (stds[i] ** 2) * np.eye(n_features)
-        Xi = rng.multivariate_normal(mean=centers[i], cov=cov, size=int(sizes[i]))
-        X_parts.append(Xi)
-
-    X = np.vstack(X_parts)
+    # Covarianza isotrópica: centro + std * N(0, I), todos los clusters en una sola llamada
+    cluster = np.repeat(np.arange(true_k), sizes)
+    X = centers[cluster] + stds[cluster, None] * rng.standard_normal((n_samples, n_features))
 
     # Barajar filas para quitar estructura
     X = X[rng.permutation(n_samples)]
@@ -73,42 +530,80 @@ def generar_caso_de_uso_mejor_k_kmeans():
         "random_state": random_state,
     }
 
-    # ------------------------------------------------------------
-    # 5) Calcular OUTPUT esperado (Ground Truth) según el enunciado:
-    #    - escalar X con StandardScaler (fit_transform en todo X)
-    #    - para cada k: KMeans(n_clusters=k, random_state=..., n_init=10)
-    #    - silhouette_score sobre X escalado
-    #    - escoger mejor (si empate: k más pequeño)
-    # ------------------------------------------------------------
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    return input_data
 
-    scores_dict = {}
-    best_k = None
-    best_score = None
 
-    for k in k_values:
-        model = KMeans(n_clusters=int(k), random_state=random_state, n_init=10)
-        labels = model.fit_predict(X_scaled)
+def generar_caso_de_uso_mejor_k_kmeans(size=None, seed=None, cache=None, *, n_procesos=1):
+    """
+    Genera un caso de uso aleatorio (input/output esperado) para la función:
 
-        score = float(silhouette_score(X_scaled, labels))
-        scores_dict[int(k)] = score
+        mejor_k_kmeans(X, k_values, random_state=42)
 
-        if best_score is None or score > best_score:
-            best_score = score
-            best_k = int(k)
-        elif score == best_score and int(k) < int(best_k):
-            best_k = int(k)
+    Parámetros:
+        size (int): número exacto de filas de X, para casos grandes (por ejemplo, para
+            medir el modo aproximado); por defecto 30 a 89 filas por cluster.
+        seed (int | np.random.SeedSequence): semilla; el mismo seed (y size)
+            genera el mismo caso. Por defecto, aleatorio en cada llamada.
+        cache (CacheResultados): cache en disco del ground truth; por defecto la
+            global de cache_resultados.configurar_cache (cache=False la ignora).
+        n_procesos (int): 1 evalúa los k en secuencia; otro valor (o None para usar
+            todos los núcleos) usa mejor_k_kmeans_paralelo para el ground truth.
 
-    output_data = {
-        "best_k": int(best_k),
-        "best_score": float(best_score),
-        "scores": {int(k): float(v) for k, v in scores_dict.items()},
-    }
+    Retorna:
+        input_data (dict): Diccionario con las claves esperadas por la función solución.
+        output_data (dict): Diccionario esperado con best_k, best_score y scores.
+    """
+
+    with caso("mejor_k_kmeans", size=size, n_procesos=n_procesos):
+        with etapa("entrada"):
+            input_data = generar_entrada_mejor_k_kmeans(size=size, seed=seed)
+
+        # ------------------------------------------------------------
+        # 5) Calcular OUTPUT esperado (Ground Truth) según el enunciado:
+        #    - escalar X con StandardScaler (fit_transform en todo X)
+        #    - para cada k: KMeans(n_clusters=k, random_state=..., n_init=10)
+        #    - silhouette_score sobre X escalado
+        #    - escoger mejor (si empate: k más pequeño)
+        #    Siempre con silhouette_score de sklearn (ya calcula por bloques), sin
+        #    importar el tamaño: mejor_k_kmeans_por_bloques (float32) es solo opcional.
+        # ------------------------------------------------------------
+        with etapa("ground_truth"):
+            if n_procesos == 1:
+                output_data = calcular_con_cache(mejor_k_kmeans_referencia, cache=cache, **input_data)
+            else:
+                output_data = calcular_con_cache(
+                    mejor_k_kmeans_paralelo, n_procesos=n_procesos, cache=cache, **input_data
+                )
 
     return input_data, output_data
 
 
+def iterar_casos(n_cases, size=None, seed=None, cache=None, *, n_procesos=1):
+    """
+    Mismos casos que generate (mismas semillas), uno a la vez: para lotes
+    grandes que se escriben a disco sin tenerlos todos en memoria.
+    """
+    for semilla in np.random.SeedSequence(seed).spawn(int(n_cases)):
+        yield generar_caso_de_uso_mejor_k_kmeans(size=size, seed=semilla, cache=cache, n_procesos=n_procesos)
+
+
+def generate(n_cases, size=None, seed=None, cache=None, *, n_procesos=1):
+    """
+    Genera n_cases casos de uso de mejor_k_kmeans.
+
+    Parámetros:
+        size (int): filas de X por caso (ver generar_caso_de_uso_mejor_k_kmeans).
+        seed (int): semilla del lote; cada caso usa una semilla derivada
+            (SeedSequence.spawn), así el lote completo es reproducible.
+        cache (CacheResultados): cache en disco del ground truth (ver calcular_con_cache).
+        n_procesos (int): procesos para el ground truth de cada caso.
+
+    Retorna:
+        list[tuple]: (input_data, output_data) por caso.
+    """
+    return list(iterar_casos(n_cases, size=size, seed=seed, cache=cache, n_procesos=n_procesos))
+
+
 if __name__ == "__main__":
     entrada, salida_esperada = generar_caso_de_uso_mejor_k_kmeans()
 
@@ -125,3 +620,16 @@ if __name__ == "__main__":
     print("scores:")
     for k in sorted(salida_esperada["scores"].keys()):
         print(f"  k={k}: {salida_esperada['scores'][k]:.6f}")
+
+    # Verificación rápida: el barrido paralelo da el mismo resultado
+    paralelo = mejor_k_kmeans_paralelo(entrada["X"], entrada["k_values"], entrada["random_state"])
+    print("\nCoincide en paralelo:", paralelo == salida_esperada)
+
+    # Silhouette por bloques (memoria acotada, distancias compartidas entre k)
+    por_bloques = mejor_k_kmeans_por_bloques(entrada["X"], entrada["k_values"], entrada["random_state"])
+    diferencia = max(abs(por_bloques["scores"][k] - v) for k, v in salida_esperada["scores"].items())
+    print("Diferencia máxima por bloques vs sklearn:", diferencia)
+
+    # Modo aproximado: k elegido y desacuerdo estimado con el modo exacto
+    aproximado = mejor_k_kmeans_aproximado(entrada["X"], entrada["k_values"], entrada["random_state"])
+    print("best_k aproximado:", aproximado["best_k"], "| desacuerdo estimado:", aproximado["desacuerdo_estimado"])
@@ -0,0 +1,121 @@
+import importlib.util
+import os
+import pickle
+import sys
+
+
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Paquete bajo el que se registran los generadores (myquestions.question_0001_usecase_generator, ...)
+_PAQUETE = __package__ or os.path.basename(_DIRECTORIO)
+
+# Pregunta (nombre de la función que debe definir la solución) -> generador
+PREGUNTAS = {
+    "detectar_solapamientos": "question-0001-usecase-generator.py",
+    "matriz_transicion": "question-0002-usecase-generator.py",
+    "mejor_umbral_f1": "question-0003-usecase-generator.py",
+    "mejor_k_kmeans": "question-0004-usecase-generator.py",
+}
+
+# Pregunta -> enunciado
+ENUNCIADOS = {
+    "detectar_solapamientos": "question-0001.txt",
+    "matriz_transicion": "question-0002.txt",
+    "mejor_umbral_f1": "question-0003.txt",
+    "mejor_k_kmeans": "question-0004.txt",
+}
+
+# Dependencias que importa cada generador al cargarse. Las que solo usan las
+# implementaciones de referencia (sklearn en la pregunta 3, scipy en la 2) o
+# el índice incremental (sortedcontainers en la pregunta 1) se importan dentro
+# de esas funciones.
+DEPENDENCIAS = {
+    "detectar_solapamientos": ("numpy", "pandas"),
+    "matriz_transicion": ("numpy", "pandas"),
+    "mejor_umbral_f1": ("numpy",),
+    "mejor_k_kmeans": ("numpy", "sklearn", "threadpoolctl"),
+}
+
+
+def cargar_modulo(ruta, nombre=None):
+    """
+    Importa un .py por ruta (los generadores tienen guiones en el nombre). Queda
+    registrado en sys.modules para que sus funciones se puedan serializar.
+
+    Con un nombre dentro del paquete (myquestions.<módulo>) el módulo puede
+    usar imports relativos (from .cache_resultados import ...).
+    """
+    ruta = os.path.abspath(ruta)
+    nombre = nombre or os.path.splitext(os.path.basename(ruta))[0].replace("-", "_")
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    try:
+        spec.loader.exec_module(modulo)
+    except BaseException:
+        del sys.modules[nombre]
+        raise
+    return modulo
+
+
+def cargar_generador(pregunta):
+    """
+    Módulo generador de una pregunta. Se importa (con sus dependencias) la
+    primera vez que se pide y queda en sys.modules para el resto del proceso.
+    """
+    if pregunta not in PREGUNTAS:
+        raise ValueError(f"pregunta desconocida {pregunta!r}; opciones: {sorted(PREGUNTAS)}")
+    archivo = PREGUNTAS[pregunta]
+    nombre = f"{_PAQUETE}.{os.path.splitext(archivo)[0].replace('-', '_')}"
+    return cargar_modulo(os.path.join(_DIRECTORIO, archivo), nombre)
+
+
+def enunciado(pregunta):
+    """
+    Texto del enunciado de una pregunta.
+    """
+    with open(os.path.join(_DIRECTORIO, ENUNCIADOS[pregunta]), encoding="utf-8") as f:
+        return f.read()
+
+
+def iterar_casos(pregunta, n_casos, size=None, seed=None, cache=None, **opciones):
+    """
+    Casos (input_data, output_data) de una pregunta, uno a la vez; con la misma
+    seed son los mismos que generate(n_casos, ...) del generador.
+
+    Parámetros:
+        opciones: argumentos propios del generador (n_procesos en la pregunta 4).
+    """
+    generador = cargar_generador(pregunta)
+    return generador.iterar_casos(n_casos, size=size, seed=seed, cache=cache, **opciones)
+
+
+def escribir_casos(casos, ruta):
+    """
+    Escribe los casos en un archivo como pickles consecutivos, a medida que se
+    generan (no hace falta tener el lote completo en memoria).
+
+    Retorna:
+        int: cantidad de casos escritos.
+    """
+    n = 0
+    with open(ruta, "wb") as f:
+        for caso in casos:
+            pickle.dump(caso, f, protocol=pickle.HIGHEST_PROTOCOL)
+            n += 1
+    return n
+
+
+def leer_casos(ruta):
+    """
+    Lee uno a uno los casos de un archivo de escribir_casos.
+    """
+    with open(ruta, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
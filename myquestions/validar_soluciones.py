@@ -0,0 +1,445 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import numpy as np
+
+if not __package__:
+    # Corrido como script: los auxiliares se importan desde el paquete myquestions (PEP 366)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "myquestions"
+
+from .corpus import Corpus
+from .registro import PREGUNTAS, cargar_generador, cargar_modulo
+
+
+# Tolerancias de comparación por pregunta (silhouette depende del orden de las sumas)
+TOLERANCIAS = {
+    "detectar_solapamientos": {"rtol": 0.0, "atol": 0.0},
+    "matriz_transicion": {"rtol": 1e-9, "atol": 1e-12},
+    "mejor_umbral_f1": {"rtol": 1e-9, "atol": 1e-12},
+    "mejor_k_kmeans": {"rtol": 1e-6, "atol": 1e-9},
+}
+
+
+def cargar_solucion(ruta_solucion):
+    """
+    Importa una solución con un nombre derivado de su ruta, para que varias
+    entregas con el mismo nombre de archivo no choquen en sys.modules.
+    """
+    ruta = os.path.abspath(ruta_solucion)
+    return cargar_modulo(ruta, "_solucion_" + hashlib.sha1(ruta.encode()).hexdigest()[:12])
+
+
+def descubrir_funciones(ruta_solucion):
+    """
+    Preguntas que resuelve un módulo de solución: las de PREGUNTAS cuya función
+    está definida en él.
+    """
+    modulo = cargar_solucion(ruta_solucion)
+    return [p for p in PREGUNTAS if callable(getattr(modulo, p, None))]
+
+
+# ---- Comparación con el ground truth ----
+
+def comparar(obtenido, esperado, rtol=1e-9, atol=1e-12):
+    """
+    Compara la salida de una solución con la esperada según el tipo:
+
+    - DataFrame/Series: pd.testing con tolerancia en columnas numéricas, sin
+      exigir el mismo dtype (ns vs us, int32 vs int64) ni nombres de índice;
+    - dict: mismas claves y valores comparados recursivamente;
+    - float/arrays numéricos: np.isclose con rtol/atol;
+    - el resto: igualdad.
+
+    Retorna:
+        (bool, str): si coincide y, si no, el motivo.
+    """
+    if isinstance(esperado, pd.DataFrame):
+        if not isinstance(obtenido, pd.DataFrame):
+            return False, f"se esperaba DataFrame, se obtuvo {type(obtenido).__name__}"
+        try:
+            pd.testing.assert_frame_equal(
+                obtenido, esperado, check_dtype=False, check_names=False, check_index_type=False,
+                check_column_type=False, check_exact=rtol == 0 and atol == 0, rtol=rtol, atol=atol,
+            )
+        except AssertionError as e:
+            return False, " ".join(str(e).split())
+        return True, ""
+
+    if isinstance(esperado, pd.Series):
+        if not isinstance(obtenido, pd.Series):
+            return False, f"se esperaba Series, se obtuvo {type(obtenido).__name__}"
+        try:
+            pd.testing.assert_series_equal(
+                obtenido, esperado, check_dtype=False, check_names=False, check_index_type=False,
+                check_exact=rtol == 0 and atol == 0, rtol=rtol, atol=atol,
+            )
+        except AssertionError as e:
+            return False, " ".join(str(e).split())
+        return True, ""
+
+    if isinstance(esperado, dict):
+        if not isinstance(obtenido, dict):
+            return False, f"se esperaba dict, se obtuvo {type(obtenido).__name__}"
+        faltantes = set(esperado) - set(obtenido)
+        if faltantes:
+            return False, f"faltan claves: {sorted(faltantes, key=repr)}"
+        for clave, valor in esperado.items():
+            ok, motivo = comparar(obtenido[clave], valor, rtol, atol)
+            if not ok:
+                return False, f"[{clave!r}] {motivo}"
+        return True, ""
+
+    if isinstance(esperado, (float, np.floating, np.ndarray)) or isinstance(obtenido, (float, np.floating)):
+        try:
+            a = np.asarray(obtenido, dtype=float)
+            b = np.asarray(esperado, dtype=float)
+        except (TypeError, ValueError):
+            return False, f"no numérico: {obtenido!r}"
+        if a.shape != b.shape:
+            return False, f"forma {a.shape} != {b.shape}"
+        if not np.allclose(a, b, rtol=rtol, atol=atol, equal_nan=True):
+            return False, f"{obtenido!r} != {esperado!r}"
+        return True, ""
+
+    if obtenido != esperado:
+        return False, f"{obtenido!r} != {esperado!r}"
+    return True, ""
+
+
+# ---- Ejecución en procesos ----
+
+class _TiempoAgotado(BaseException):
+    # BaseException: un `except Exception` de la solución no debe poder atraparla
+    pass
+
+
+def _alarma(signum, frame):
+    raise _TiempoAgotado()
+
+
+def _ejecutar_caso(ruta_solucion, pregunta, input_data, timeout):
+    """
+    Tarea de un proceso: llama a la función de la solución con input_data.
+
+    El límite de tiempo se aplica dentro del proceso con signal.setitimer
+    (donde existe; en Windows solo se marca el caso como lento al terminar).
+
+    Retorna:
+        (estado, salida o mensaje de error, segundos): estado es "ok", "error" o "timeout".
+    """
+    try:
+        funcion = getattr(cargar_solucion(ruta_solucion), pregunta)
+    except Exception as e:
+        return "error", f"{type(e).__name__}: {e}", 0.0
+
+    con_alarma = timeout is not None and hasattr(signal, "setitimer")
+    if con_alarma:
+        signal.signal(signal.SIGALRM, _alarma)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    t0 = time.perf_counter()
+    try:
+        salida = funcion(**input_data)
+        estado = "ok"
+    except _TiempoAgotado:
+        salida, estado = f"superó {timeout} s", "timeout"
+    except Exception as e:
+        salida, estado = f"{type(e).__name__}: {e}", "error"
+    finally:
+        if con_alarma:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    segundos = time.perf_counter() - t0
+
+    if estado == "ok" and timeout is not None and segundos > timeout:
+        salida, estado = f"superó {timeout} s", "timeout"
+    return estado, salida, segundos
+
+
+# Corpus abiertos en este proceso (uno por directorio), para no releer el manifiesto por caso
+_CORPUS_ABIERTOS = {}
+
+
+def _abrir_corpus(directorio):
+    # Las soluciones reciben los dtypes del enunciado (texto como str, no categorías)
+    if directorio not in _CORPUS_ABIERTOS:
+        _CORPUS_ABIERTOS[directorio] = Corpus(directorio, vistas=False)
+    return _CORPUS_ABIERTOS[directorio]
+
+
+def _ejecutar_caso_corpus(ruta_solucion, pregunta, directorio, id_caso, timeout):
+    """
+    Como _ejecutar_caso, pero el proceso lee el input del corpus (mapeado desde
+    disco) en vez de recibirlo serializado.
+    """
+    input_data, _ = _abrir_corpus(directorio).leer(id_caso)
+    return _ejecutar_caso(ruta_solucion, pregunta, input_data, timeout)
+
+
+# Margen sobre el timeout antes de que el proceso principal dé por colgado un caso:
+# la alarma dentro del proceso no interrumpe código nativo
+_MARGEN_TIMEOUT_S = 5.0
+
+
+def _registrar_trabajador(pids):
+    """
+    Initializer de los procesos del pool: anota su PID en la cola compartida
+    (SimpleQueue escribe sin hilo auxiliar, así el PID queda anotado aunque
+    después el proceso se cuelgue en código nativo).
+    """
+    pids.put(os.getpid())
+
+
+def _nuevo_pool(capacidad):
+    """
+    ProcessPoolExecutor cuyos procesos anotan su PID en la cola que se retorna
+    junto al pool (ProcessPoolExecutor no expone sus procesos de forma pública).
+    """
+    pids = multiprocessing.SimpleQueue()
+    pool = ProcessPoolExecutor(max_workers=capacidad, initializer=_registrar_trabajador, initargs=(pids,))
+    return pool, pids
+
+
+def _terminar_pool(pool, pids):
+    """
+    Cierra un pool matando sus procesos (el que quedó colgado no terminaría solo).
+    """
+    senal = getattr(signal, "SIGKILL", signal.SIGTERM)  # en Windows SIGTERM termina el proceso
+    while not pids.empty():
+        try:
+            os.kill(pids.get(), senal)
+        except OSError:
+            pass  # ya había terminado
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def correr_tareas(funcion, tareas, n_procesos=None, timeout=None):
+    """
+    funcion(*args) para cada args de `tareas` en un pool de procesos, sin que
+    una solución pueda tumbar la corrida completa:
+
+    - si un proceso muere (os._exit, segfault, OOM) el pool se rompe y todas
+      las tareas en curso fallan; esas se vuelven a correr de a una, en pools
+      nuevos, para saber cuál fue y marcar solo esa como "error";
+    - si una tarea no responde en timeout + _MARGEN_TIMEOUT_S (código nativo
+      que ignora la alarma) se marca como "timeout", se matan los procesos del
+      pool y las demás tareas en curso vuelven a la cola.
+
+    Como mucho hay n_procesos tareas en curso, así el plazo de cada una corre
+    desde que empieza.
+
+    Retorna:
+        list[tuple]: (estado, salida, segundos) por tarea, en el orden de `tareas`.
+    """
+    n_procesos = n_procesos or os.cpu_count() or 1
+    plazo = None if timeout is None else timeout + _MARGEN_TIMEOUT_S
+    resultados = [None] * len(tareas)
+    pendientes = deque(range(len(tareas)))
+    sospechosas = deque()  # en curso cuando murió un proceso: se corren de a una
+
+    while pendientes or sospechosas:
+        aislar = bool(sospechosas)
+        cola = sospechosas if aislar else pendientes
+        capacidad = 1 if aislar else n_procesos
+
+        pool, pids = _nuevo_pool(capacidad)
+        en_curso = {}  # futuro -> (índice de la tarea, instante límite)
+        causa = None   # "caida" o "colgada" si hay que descartar el pool
+        try:
+            while (cola or en_curso) and causa is None:
+                while cola and len(en_curso) < capacidad:
+                    i = cola.popleft()
+                    limite = None if plazo is None else time.monotonic() + plazo
+                    en_curso[pool.submit(funcion, *tareas[i])] = (i, limite)
+
+                limites = [limite for _, limite in en_curso.values() if limite is not None]
+                espera = max(0.0, min(limites) - time.monotonic()) if limites else None
+                listos, _ = wait(en_curso, timeout=espera, return_when=FIRST_COMPLETED)
+
+                for f in listos:
+                    i, _ = en_curso.pop(f)
+                    try:
+                        resultados[i] = f.result()
+                    except BrokenProcessPool:
+                        causa = "caida"
+                        if aislar:
+                            resultados[i] = ("error", "el proceso de la solución terminó abruptamente", 0.0)
+                        else:
+                            sospechosas.append(i)
+                    except Exception as e:
+                        resultados[i] = ("error", f"{type(e).__name__}: {e}", 0.0)
+
+                if causa is None:
+                    ahora = time.monotonic()
+                    for f, (i, limite) in list(en_curso.items()):
+                        if limite is not None and limite <= ahora:
+                            del en_curso[f]
+                            resultados[i] = ("timeout", f"superó {timeout} s (el proceso no respondió)", plazo)
+                            causa = "colgada"
+        finally:
+            if causa is None:
+                pool.shutdown()
+            else:
+                _terminar_pool(pool, pids)
+            pids.close()
+
+        # Lo que seguía en curso: sospechoso si murió un proceso, si no vuelve a la cola
+        restantes = [i for i, _ in en_curso.values()]
+        if causa == "caida" and not aislar:
+            sospechosas.extend(restantes)
+        else:
+            cola.extendleft(reversed(restantes))
+
+    return resultados
+
+
+def generar_casos(pregunta, n_casos, size=None, seed=None):
+    """
+    n_casos (input_data, output_data) de una pregunta con el generate de su generador.
+    """
+    return cargar_generador(pregunta).generate(n_casos, size=size, seed=seed)
+
+
+def percentiles_latencia(segundos):
+    """
+    p50, p90, p99 y máximo (en segundos) de una lista de latencias.
+    """
+    if len(segundos) == 0:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    p50, p90, p99 = np.percentile(segundos, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(np.max(segundos))}
+
+
+def validar_soluciones(rutas_solucion, n_casos=20, preguntas=None, size=None, seed=None,
+                       n_procesos=None, timeout=10.0, corpus=None):
+    """
+    Corre cada solución contra n_casos casos generados por pregunta.
+
+    1) descubre qué preguntas define cada solución (o usa `preguntas`);
+    2) genera los casos una sola vez por pregunta (con seed son reproducibles)
+       y los comparte entre todas las soluciones;
+    3) ejecuta cada (solución, caso) en un pool de procesos con límite de tiempo
+       (ver correr_tareas: una solución que mata o cuelga su proceso solo
+       hace fallar su caso);
+    4) compara con el ground truth (ver comparar) y resume por solución y pregunta.
+
+    Parámetros:
+        n_procesos (int): procesos del pool; None usa todos los núcleos.
+        timeout (float): segundos máximos por caso (None sin límite).
+        corpus (str): directorio de un corpus (ver corpus.Corpus). Si se indica,
+            los casos son los primeros n_casos del corpus de cada pregunta (no se
+            generan) y cada proceso lee su input del disco en vez de recibirlo
+            serializado.
+
+    Retorna:
+        list[dict]: por (solución, pregunta): casos, aprobados, tasa, errores,
+            timeouts, percentiles de latencia y los primeros fallos.
+    """
+    rutas_solucion = [os.path.abspath(r) for r in rutas_solucion]
+    por_solucion = {}
+    reporte = []
+    for r in rutas_solucion:
+        try:
+            por_solucion[r] = preguntas or descubrir_funciones(r)
+        except Exception as e:
+            # La solución no se puede importar: sin casos que correr
+            por_solucion[r] = []
+            reporte.append({"solucion": r, "pregunta": None, "casos": 0, "aprobados": 0,
+                            "error_importacion": f"{type(e).__name__}: {e}"})
+
+    # Por pregunta: lista de (input_data, output_data), o de ids del corpus
+    casos = {}
+    if corpus is not None:
+        corpus = os.path.abspath(corpus)
+        corpus_local = _abrir_corpus(corpus)
+    for p in sorted({p for ps in por_solucion.values() for p in ps}):
+        if corpus is None:
+            casos[p] = generar_casos(p, n_casos, size=size, seed=seed)
+        else:
+            casos[p] = corpus_local.ids(p)[:n_casos]
+
+    tareas = [(r, p, i) for r in rutas_solucion for p in por_solucion[r] for i in range(len(casos[p]))]
+    if corpus is None:
+        resultados = correr_tareas(
+            _ejecutar_caso, [(r, p, casos[p][i][0], timeout) for r, p, i in tareas], n_procesos, timeout
+        )
+    else:
+        resultados = correr_tareas(
+            _ejecutar_caso_corpus, [(r, p, corpus, casos[p][i], timeout) for r, p, i in tareas], n_procesos, timeout
+        )
+
+    resumen = {}
+    for (r, p, i), (estado, salida, segundos) in zip(tareas, resultados):
+        fila = resumen.setdefault((r, p), {
+            "solucion": r, "pregunta": p, "casos": 0, "aprobados": 0,
+            "errores": 0, "timeouts": 0, "latencias": [], "fallos": [],
+        })
+        fila["casos"] += 1
+        fila["latencias"].append(segundos)
+
+        if estado == "ok":
+            esperado = casos[p][i][1] if corpus is None else corpus_local.leer(casos[p][i])[1]
+            ok, motivo = comparar(salida, esperado, **TOLERANCIAS[p])
+        else:
+            ok, motivo = False, salida
+            fila["errores" if estado == "error" else "timeouts"] += 1
+
+        if ok:
+            fila["aprobados"] += 1
+        elif len(fila["fallos"]) < 5:
+            fila["fallos"].append({"caso": i, "estado": estado, "motivo": motivo})
+
+    for fila in resumen.values():
+        latencias = fila.pop("latencias")
+        fila["tasa_aprobacion"] = fila["aprobados"] / fila["casos"] if fila["casos"] else 0.0
+        fila["latencia_s"] = percentiles_latencia(latencias)
+        reporte.append(fila)
+    return reporte
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Valida soluciones contra casos generados.")
+    parser.add_argument("soluciones", nargs="+", help="rutas a los .py de las soluciones")
+    parser.add_argument("--casos", type=int, default=20, help="casos por pregunta")
+    parser.add_argument("--pregunta", action="append", choices=sorted(PREGUNTAS),
+                        help="pregunta a validar (repetible); por defecto las que defina cada solución")
+    parser.add_argument("--size", type=int, default=None, help="tamaño de cada caso (filas/muestras)")
+    parser.add_argument("--seed", type=int, default=None, help="semilla de los casos")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del pool")
+    parser.add_argument("--timeout", type=float, default=10.0, help="segundos máximos por caso")
+    parser.add_argument("--corpus", default=None,
+                        help="directorio de un corpus: usar sus casos en vez de generarlos")
+    parser.add_argument("--json", action="store_true", help="imprimir el reporte como JSON lines")
+    args = parser.parse_args()
+
+    reporte = validar_soluciones(
+        args.soluciones, n_casos=args.casos, preguntas=args.pregunta, size=args.size,
+        seed=args.seed, n_procesos=args.procesos, timeout=args.timeout, corpus=args.corpus,
+    )
+
+    for fila in reporte:
+        if args.json:
+            print(json.dumps(fila, ensure_ascii=False))
+            continue
+        if fila["pregunta"] is None:
+            print(f"{os.path.basename(fila['solucion'])}: no se pudo importar ({fila['error_importacion']})")
+            continue
+        lat = fila["latencia_s"]
+        print(
+            f"{os.path.basename(fila['solucion'])} | {fila['pregunta']}: "
+            f"{fila['aprobados']}/{fila['casos']} ({fila['tasa_aprobacion']:.0%}) | "
+            f"errores={fila['errores']} timeouts={fila['timeouts']} | "
+            f"p50={lat['p50']:.4f}s p90={lat['p90']:.4f}s p99={lat['p99']:.4f}s"
+        )
+        for fallo in fila["fallos"]:
+            print(f"    caso {fallo['caso']} [{fallo['estado']}]: {fallo['motivo']}")
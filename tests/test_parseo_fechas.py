@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from myquestions import parseo_fechas
+from myquestions.parseo_fechas import CacheFechas, parsear_fechas
+
+
+def _columna_mixta(n_filas, seed, unidad="us"):
+    """
+    Columna object con ~60% strings "YYYY-MM-DD HH:MM:SS" y ~40% pd.Timestamp,
+    como el time_col de la pregunta 2.
+    """
+    rng = np.random.default_rng(seed)
+    momentos = pd.Timestamp("2026-02-01 08:00:00") + pd.to_timedelta(
+        np.sort(rng.integers(0, 60 * 24 * 30, size=200)), unit="min"
+    )
+    momentos = momentos.as_unit(unidad)
+    idx = rng.integers(0, len(momentos), size=n_filas)
+    como_texto = rng.random(n_filas) < 0.6
+    return pd.Series(np.where(
+        como_texto,
+        np.asarray(momentos.strftime("%Y-%m-%d %H:%M:%S"), dtype=object)[idx],
+        np.asarray(momentos, dtype=object)[idx],
+    ), dtype=object)
+
+
+def _igual_a_pandas(serie, cache=False):
+    esperado = pd.to_datetime(serie, errors="coerce")
+    obtenido = parsear_fechas(serie, cache=cache)
+    pd.testing.assert_series_equal(obtenido, esperado)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_mixta_60_40_igual_a_to_datetime(seed):
+    _igual_a_pandas(_columna_mixta(5_000, seed))
+
+
+def test_mixta_con_cache_caliente():
+    serie = _columna_mixta(5_000, 0)
+    cache = CacheFechas()
+    _igual_a_pandas(serie, cache=cache)
+    _igual_a_pandas(serie, cache=cache)
+    assert cache.aciertos > 0
+
+
+@pytest.mark.parametrize("primero", ["2026-02-01 08:00:00", pd.Timestamp("2026-02-01 08:00:00"), None])
+def test_mixta_con_nulos_y_primer_valor(primero):
+    serie = _columna_mixta(1_000, 1)
+    serie.iloc[0] = primero
+    serie.iloc[5::50] = None
+    serie.iloc[7::70] = np.nan
+    serie.iloc[9::90] = pd.NaT
+    _igual_a_pandas(serie)
+
+
+def test_mixta_timestamps_en_ns():
+    _igual_a_pandas(_columna_mixta(1_000, 2, unidad="ns"))
+
+
+def test_mixta_timestamps_con_zona_horaria():
+    serie = _columna_mixta(1_000, 3)
+    es_timestamp = serie.map(lambda v: isinstance(v, pd.Timestamp))
+    serie[es_timestamp] = serie[es_timestamp].map(lambda v: v.tz_localize("UTC"))
+    try:
+        pd.to_datetime(serie, errors="coerce")
+    except Exception as error:
+        # Si pandas no admite la mezcla, parsear_fechas falla igual
+        with pytest.raises(type(error)):
+            parsear_fechas(serie, cache=False)
+    else:
+        _igual_a_pandas(serie)
+
+
+def test_mixta_strings_no_iso():
+    serie = _columna_mixta(1_000, 4)
+    serie[serie.map(lambda v: isinstance(v, str))] = "01/02/2026 10:00"
+    _igual_a_pandas(serie)
+
+
+@pytest.mark.parametrize("textos", [
+    ["2026-02-01 08:00:00", None, "2026-02-01 09:00:00", None],
+    ["2026-02-01T08:00:00+01:00", None, "2026-02-01T09:00:00+01:00"],
+    ["01/02/2026", None, "03/02/2026", "no es fecha"],
+    [None, None],
+    [],
+])
+def test_strings_con_nulos(textos):
+    _igual_a_pandas(pd.Series(textos, dtype=object))
+    _igual_a_pandas(pd.Series(textos, dtype="str"))
+
+
+def test_benchmark_coincide():
+    for fila in parseo_fechas.benchmark_parseo(n_filas=20_000, n_unicos=100, repeticiones=1):
+        assert fila["coincide"]
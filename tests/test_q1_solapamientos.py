@@ -0,0 +1,125 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from myquestions import cargar_generador
+
+g = cargar_generador("detectar_solapamientos")
+
+COLUMNAS = {
+    "paciente_col": "paciente_id",
+    "fecha_col": "fecha",
+    "hora_inicio_col": "hora_inicio",
+    "duracion_min_col": "duracion_min",
+}
+
+
+def _citas(filas):
+    """
+    DataFrame de citas con las columnas y dtypes del generador.
+    """
+    df = pd.DataFrame(filas, columns=list(COLUMNAS.values()))
+    df["paciente_id"] = df["paciente_id"].astype("str")
+    df["fecha"] = df["fecha"].astype("str")
+    df["hora_inicio"] = df["hora_inicio"].astype("str")
+    df["duracion_min"] = df["duracion_min"].astype(np.int64)
+    return df
+
+
+def _igual_a_referencia(df, **opciones):
+    esperado = g.detectar_solapamientos_referencia(df, **COLUMNAS)
+    obtenido = g.detectar_solapamientos_columnar(df, **COLUMNAS, **opciones)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+def _solapada_fuerza_bruta(expected):
+    """
+    Modo barrido con un bucle: una cita queda solapada si empieza antes del
+    máximo fin de las citas anteriores (válidas) del mismo paciente.
+    """
+    solapada = np.zeros(len(expected), dtype=bool)
+    for _, grupo in expected.groupby("paciente_id", sort=False):
+        max_fin = None
+        for i, inicio, fin in zip(grupo.index, grupo["inicio_dt"], grupo["fin_dt"]):
+            if pd.isna(inicio):
+                continue
+            solapada[i] = max_fin is not None and inicio < max_fin
+            max_fin = fin if max_fin is None else max(max_fin, fin)
+    return solapada
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_columnar_igual_a_referencia(seed):
+    _igual_a_referencia(g.generar_entrada_detectar_solapamientos(size=2_000, seed=seed)["df"])
+
+
+def test_columnar_en_procesos_igual_a_referencia():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        for seed in range(2):
+            df = g.generar_entrada_detectar_solapamientos(size=3_000, seed=seed)["df"]
+            _igual_a_referencia(df, n_procesos=2, pool=pool)
+
+
+def test_tabla_vacia():
+    _igual_a_referencia(_citas([]))
+
+
+def test_una_cita():
+    _igual_a_referencia(_citas([("P001", "2026-02-10", "09:00", 30)]))
+
+
+def test_empates_de_inicio():
+    # Mismo paciente y mismo inicio: gana el orden original (sort estable)
+    _igual_a_referencia(_citas([
+        ("P001", "2026-02-10", "09:00", 30),
+        ("P001", "2026-02-10", "09:00", 45),
+        ("P001", "2026-02-10", "09:30", 15),
+        ("P002", "2026-02-10", "09:00", 30),
+        ("P001", "2026-02-10", "09:00", 10),
+    ]))
+
+
+def test_fechas_y_horas_invalidas_dan_nat():
+    _igual_a_referencia(_citas([
+        ("P001", "2026-02-10", "09:00", 60),
+        ("P001", "2026-02-30", "09:15", 30),
+        ("P001", "2026-02-10", "25:99", 30),
+        ("P001", "2026-02-10", "09:30", 30),
+        ("P002", "no es fecha", "10:00", 30),
+        ("P002", "2026-02-11", "10:00", 30),
+    ]))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_barrido_igual_a_fuerza_bruta(seed):
+    df = g.generar_entrada_detectar_solapamientos(size=500, seed=seed)["df"]
+    expected, pares = g.detectar_solapamientos_barrido(df, **COLUMNAS, pares=True)
+    np.testing.assert_array_equal(expected["solapada"].to_numpy(), _solapada_fuerza_bruta(expected))
+
+    # Cada par es del mismo paciente y la cita j empieza antes del fin de i
+    assert (expected["paciente_id"].to_numpy()[pares["i"]] == expected["paciente_id"].to_numpy()[pares["j"]]).all()
+    assert (expected["inicio_dt"].to_numpy()[pares["j"]] < expected["fin_dt"].to_numpy()[pares["i"]]).all()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_indice_incremental_igual_a_lotes(seed):
+    df = g.generar_entrada_detectar_solapamientos(size=150, seed=seed)["df"]
+    resultado = g.benchmark_reproduccion_incremental(df, **COLUMNAS, prob_cancelar=0.3, seed=seed)
+    assert resultado["coincide"]
+
+
+def test_indice_incremental_cancelar_todo():
+    indice = g.IndiceSolapamientos()
+    ids = [indice.agregar(fila)["id"] for fila in _citas([
+        ("P001", "2026-02-10", "09:00", 60),
+        ("P001", "2026-02-10", "09:30", 30),
+        ("P001", "2026-02-10", "09:45", 30),
+    ]).to_dict(orient="records")]
+    assert [indice.solapada(i) for i in ids] == [False, True, True]
+
+    assert indice.cancelar(ids[0])["cambios"] == {ids[1]: False}
+    indice.cancelar(ids[1])
+    indice.cancelar(ids[2])
+    assert len(indice) == 0
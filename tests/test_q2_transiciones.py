@@ -0,0 +1,142 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from myquestions import cargar_generador
+
+g = cargar_generador("matriz_transicion")
+
+COLUMNAS = {"user_col": "user_id", "time_col": "timestamp", "state_col": "state"}
+
+
+def _eventos(filas):
+    """
+    DataFrame de eventos (user_id, timestamp, state) con timestamps object, como el generador.
+    """
+    return pd.DataFrame(filas, columns=list(COLUMNAS.values())).astype({"timestamp": object})
+
+
+def _igual_a_referencia(df, **opciones):
+    esperado = g.matriz_transicion_referencia(df, **COLUMNAS)
+    obtenido = g.matriz_transicion_bincount(df, **COLUMNAS, **opciones)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+    matriz, estados = g.matriz_transicion_bincount(df, **COLUMNAS, disperso=True, **opciones)
+    np.testing.assert_allclose(matriz.toarray(), esperado.to_numpy(dtype=float))
+    assert list(estados) == list(esperado.columns)
+
+
+def _orden_como_serie(matriz, contextos, estados):
+    """
+    Salida de matriz_transicion_orden con el formato de matriz_transicion_orden_referencia.
+    """
+    coo = matriz.tocoo()
+    indice = pd.MultiIndex.from_tuples(
+        [tuple(contextos[r]) + (estados[c],) for r, c in zip(coo.row, coo.col)],
+        names=list(contextos.names) + ["next_state"],
+    ) if coo.nnz else None
+    return pd.Series(coo.data, index=indice, dtype=float).sort_index()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bincount_igual_a_referencia(seed):
+    _igual_a_referencia(g.generar_entrada_matriz_transicion(size=3_000, seed=seed)["df"])
+
+
+def test_bincount_en_procesos_igual_a_referencia():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        for seed in range(2):
+            df = g.generar_entrada_matriz_transicion(size=3_000, seed=seed)["df"]
+            _igual_a_referencia(df, n_procesos=2, pool=pool)
+
+
+def test_tabla_vacia():
+    _igual_a_referencia(_eventos([]))
+
+    matriz, contextos, _ = g.matriz_transicion_orden(_eventos([]), **COLUMNAS, order=2)
+    assert matriz.shape[0] == 0 and len(contextos) == 0
+
+
+def test_un_evento():
+    _igual_a_referencia(_eventos([("U001", "2026-02-01 08:00:00", "Home")]))
+
+
+def test_empates_de_timestamp():
+    # Empate en el mismo usuario: se conserva el orden original de las filas
+    _igual_a_referencia(_eventos([
+        ("U001", "2026-02-01 08:00:00", "Home"),
+        ("U001", "2026-02-01 08:05:00", "Search"),
+        ("U001", "2026-02-01 08:05:00", "Cart"),
+        ("U002", pd.Timestamp("2026-02-01 08:05:00"), "Search"),
+        ("U002", "2026-02-01 08:05:00", "Home"),
+        ("U001", pd.Timestamp("2026-02-01 08:01:00"), "Product"),
+    ]))
+
+
+def test_timestamps_y_estados_nulos():
+    _igual_a_referencia(_eventos([
+        ("U001", "2026-02-01 08:00:00", "Home"),
+        ("U001", None, "Search"),
+        ("U001", "2026-02-01 08:02:00", None),
+        ("U001", "no es fecha", "Cart"),
+        ("U001", "2026-02-01 08:03:00", "Product"),
+        ("U002", pd.NaT, "Home"),
+        ("U002", "2026-02-01 09:00:00", "Product"),
+        ("U002", pd.Timestamp("2026-02-01 09:10:00"), "Cart"),
+    ]))
+
+
+@pytest.mark.parametrize("n_procesos", [1, 2])
+def test_particionada_igual_a_bincount(n_procesos):
+    df = g.generar_entrada_matriz_transicion(size=2_000, seed=7)["df"]
+    esperado = g.matriz_transicion_bincount(df, **COLUMNAS)
+
+    # Particiones en orden temporal (por ejemplo, una por rango de fechas)
+    df = df.iloc[np.argsort(pd.to_datetime(df["timestamp"]).to_numpy(), kind="stable")]
+    particiones = [df.iloc[:500], df.iloc[500:1_300], df.iloc[1_300:]]
+    obtenido = g.matriz_transicion_particionada(particiones, **COLUMNAS, n_procesos=n_procesos, tamano_fragmento=200)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+@pytest.mark.parametrize("order", [1, 2, 3])
+@pytest.mark.parametrize("seed", range(3))
+def test_orden_igual_a_referencia(order, seed):
+    df = g.generar_entrada_matriz_transicion_orden(order=order, size=1_500, seed=seed)[0]["df"]
+    esperado = g.matriz_transicion_orden_referencia(df, **COLUMNAS, order=order)
+    obtenido = _orden_como_serie(*g.matriz_transicion_orden(df, **COLUMNAS, order=order))
+    pd.testing.assert_series_equal(obtenido, esperado, check_index_type=False)
+
+
+def test_orden_1_igual_a_bincount():
+    df = g.generar_entrada_matriz_transicion(size=1_000, seed=3)["df"]
+    matriz, contextos, estados = g.matriz_transicion_orden(df, **COLUMNAS, order=1)
+    densa = g.matriz_transicion_bincount(df, **COLUMNAS)
+    filas = densa.loc[list(contextos.get_level_values(0))]
+    np.testing.assert_allclose(matriz.toarray(), filas.to_numpy(dtype=float))
+    assert list(estados) == list(densa.columns)
+
+
+def test_orden_usuarios_mas_cortos_que_el_contexto():
+    df = _eventos([
+        ("U001", "2026-02-01 08:00:00", "Home"),
+        ("U001", "2026-02-01 08:01:00", "Search"),
+        ("U002", "2026-02-01 08:00:00", "Home"),
+    ])
+    matriz, contextos, _ = g.matriz_transicion_orden(df, **COLUMNAS, order=2)
+    assert matriz.shape[0] == 0 and len(contextos) == 0
+
+
+def test_orden_patrones_plantados_con_probabilidad_1():
+    _, salida = g.generar_caso_de_uso_matriz_transicion_orden(order=2, size=5_000, seed=0, cache=False)
+    serie = _orden_como_serie(salida["matriz"], salida["contextos"], salida["estados"])
+    for contexto, siguiente in salida["patrones"].items():
+        if contexto in serie.index.droplevel(-1):
+            assert serie.loc[contexto + (siguiente,)] == 1.0
+
+
+@pytest.mark.parametrize("size", [0, -1])
+def test_size_invalido(size):
+    with pytest.raises(ValueError):
+        g.generar_entrada_matriz_transicion(size=size, seed=0)
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from myquestions import cargar_generador
+
+g = cargar_generador("mejor_umbral_f1")
+
+STEPS = [0.01, 0.02, 0.05, 0.1]
+
+
+def _casos_borde():
+    """
+    (nombre, y_true, y_proba) con empates, NaN y clases degeneradas.
+    """
+    grilla = g.generar_umbrales(0.1)
+    return [
+        ("solo_negativos", np.zeros(6, dtype=int), np.linspace(0.0, 1.0, 6)),
+        ("solo_positivos", np.ones(6, dtype=int), np.linspace(0.0, 1.0, 6)),
+        ("empates", np.array([1, 0, 1, 0, 1, 0]), np.array([0.5, 0.5, 0.3, 0.3, 0.7, 0.7])),
+        # Probabilidades exactamente sobre la grilla (0.30000000000000004, ...): >= las incluye
+        ("sobre_la_grilla", np.array([1, 0, 1, 1, 0, 0]), grilla[[3, 3, 6, 9, 1, 10]]),
+        ("con_nan", np.array([1, 0, 1, 0, 1]), np.array([0.9, np.nan, np.nan, 0.2, 0.6])),
+        ("una_muestra", np.array([1]), np.array([0.42])),
+    ]
+
+
+def _igual(obtenido, esperado):
+    assert obtenido["best_threshold"] == esperado["best_threshold"]
+    assert obtenido["best_f1"] == pytest.approx(esperado["best_f1"], rel=1e-12)
+    assert obtenido["support_positive"] == esperado["support_positive"]
+
+
+@pytest.mark.parametrize("step", STEPS)
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorizado_igual_a_referencia(seed, step):
+    entrada = g.generar_entrada_mejor_umbral_f1(size=500, seed=seed)
+    y_true, y_proba = entrada["y_true"], entrada["y_proba"]
+    _igual(g.mejor_umbral_f1_vectorizado(y_true, y_proba, step), g.mejor_umbral_f1_referencia(y_true, y_proba, step))
+
+
+@pytest.mark.parametrize("nombre, y_true, y_proba", _casos_borde(), ids=lambda v: v if isinstance(v, str) else "")
+def test_casos_borde_igual_a_referencia(nombre, y_true, y_proba):
+    esperado = g.mejor_umbral_f1_referencia(y_true, y_proba, 0.1)
+    _igual(g.mejor_umbral_f1_vectorizado(y_true, y_proba, 0.1), esperado)
+    _igual(g.mejor_umbral_f1_streaming([(y_true, y_proba)], 0.1), esperado)
+
+    lote = g.mejor_umbral_f1_lote(y_true, y_proba.reshape(-1, 1), 0.1)
+    _igual({k: v[0] for k, v in lote.items()}, esperado)
+
+    bootstrap = g.mejor_umbral_f1_bootstrap(y_true, y_proba, 0.1, n_bootstrap=20, semilla=0)
+    _igual(bootstrap, esperado)
+
+
+def test_vacio():
+    # La referencia (f1_score) rechaza arrays vacíos; los motores dan F1 0 en el primer umbral
+    vacio = {"best_threshold": 0.0, "best_f1": 0.0, "support_positive": 0}
+    _igual(g.mejor_umbral_f1_vectorizado(np.array([], dtype=int), np.array([]), 0.1), vacio)
+    _igual(g.mejor_umbral_f1_streaming([], 0.1), vacio)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_lote_igual_a_referencia(seed):
+    entrada = g.generar_entrada_mejor_umbral_f1_lote(size=200, seed=seed)
+    esperado = g.mejor_umbral_f1_lote_referencia(**entrada)
+    obtenido = g.mejor_umbral_f1_lote(**entrada)
+
+    assert obtenido.keys() == esperado.keys()
+    np.testing.assert_array_equal(obtenido["best_threshold"], esperado["best_threshold"])
+    np.testing.assert_allclose(obtenido["best_f1"], esperado["best_f1"], rtol=1e-12)
+    np.testing.assert_array_equal(obtenido["support_positive"], esperado["support_positive"])
+    if "grupos" in esperado:
+        np.testing.assert_array_equal(obtenido["grupos"], esperado["grupos"])
+
+
+def test_lote_grupo_de_un_solo_elemento():
+    y_true = np.array([1, 0, 1, 0, 1])
+    y_proba = np.array([[0.9, 0.1], [0.2, 0.8], [0.6, 0.6], [0.4, 0.3], [0.7, 0.5]])
+    grupos = np.array(["A", "A", "A", "A", "B"])
+    obtenido = g.mejor_umbral_f1_lote(y_true, y_proba, 0.1, grupos=grupos)
+    esperado = g.mejor_umbral_f1_lote_referencia(y_true, y_proba, 0.1, grupos=grupos)
+    for clave in ("best_threshold", "best_f1", "support_positive"):
+        np.testing.assert_allclose(obtenido[clave], esperado[clave])
+
+
+def test_streaming_y_bosquejos_fusionados_igual_a_memoria():
+    entrada = g.generar_entrada_mejor_umbral_f1(size=3_000, seed=11)
+    y_true, y_proba, step = entrada["y_true"], entrada["y_proba"], entrada["step"]
+    esperado = g.mejor_umbral_f1_vectorizado(y_true, y_proba, step)
+
+    fragmentos = [(y_true[i:i + 700], y_proba[i:i + 700]) for i in range(0, len(y_true), 700)]
+    _igual(g.mejor_umbral_f1_streaming(fragmentos, step), esperado)
+
+    bosquejos = [g.BosquejoUmbralF1(step).actualizar(t, p) for t, p in fragmentos]
+    _igual(g.fusionar_bosquejos(bosquejos).resultado(), esperado)
+
+    with pytest.raises(ValueError):
+        g.BosquejoUmbralF1(0.01).fusionar(g.BosquejoUmbralF1(0.02))
+
+
+def test_umbrales_unicos_es_el_mejor_corte():
+    from sklearn.metrics import f1_score
+
+    entrada = g.generar_entrada_mejor_umbral_f1(size=200, seed=4)
+    y_true, y_proba = entrada["y_true"], entrada["y_proba"]
+    obtenido = g.mejor_umbral_f1_vectorizado(y_true, y_proba, umbrales="unicos")
+
+    cortes = np.unique(y_proba)
+    f1 = [f1_score(y_true, (y_proba >= t).astype(int), zero_division=0) for t in cortes]
+    assert obtenido["best_threshold"] == cortes[int(np.argmax(f1))]
+    assert obtenido["best_f1"] == pytest.approx(max(f1), rel=1e-12)
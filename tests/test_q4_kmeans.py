@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+from myquestions import cargar_generador
+
+g = cargar_generador("mejor_k_kmeans")
+
+
+def _entrada(seed, size=150):
+    return g.generar_entrada_mejor_k_kmeans(size=size, seed=seed)
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_paralelo_igual_a_referencia(seed):
+    entrada = _entrada(seed)
+    assert g.mejor_k_kmeans_paralelo(**entrada, n_procesos=2) == g.mejor_k_kmeans_referencia(**entrada)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_por_bloques_igual_a_referencia(seed):
+    entrada = _entrada(seed)
+    esperado = g.mejor_k_kmeans_referencia(**entrada)
+    obtenido = g.mejor_k_kmeans_por_bloques(**entrada, memoria_mb=0.05)
+
+    assert obtenido["best_k"] == esperado["best_k"]
+    assert obtenido["scores"].keys() == esperado["scores"].keys()
+    for k, score in esperado["scores"].items():
+        assert obtenido["scores"][k] == pytest.approx(score, abs=1e-5)
+
+
+def test_silhouette_por_bloques_con_clusters_de_un_punto():
+    rng = np.random.default_rng(0)
+    X = StandardScaler().fit_transform(rng.normal(size=(40, 3)))
+    etiquetados = [
+        np.r_[np.zeros(39, dtype=int), 1],               # un cluster de un solo punto
+        np.r_[0, 1, 2, rng.integers(3, 6, size=37)],      # tres clusters de un punto
+        np.arange(40) % 2,
+    ]
+    obtenidos = g.silhouette_por_bloques(X, etiquetados, memoria_mb=0.01)
+    for etiquetas, obtenido in zip(etiquetados, obtenidos):
+        assert obtenido == pytest.approx(silhouette_score(X, etiquetas), abs=1e-5)
+
+
+@pytest.mark.parametrize("etiquetas", [np.zeros(10, dtype=int), np.arange(10)])
+def test_silhouette_por_bloques_numero_de_etiquetas_invalido(etiquetas):
+    with pytest.raises(ValueError):
+        g.silhouette_por_bloques(np.random.default_rng(0).normal(size=(10, 2)), [etiquetas])
+
+
+def test_empate_gana_el_k_mas_pequeno():
+    resultado = g.elegir_mejor_k({5: 0.7, 3: 0.7, 4: 0.2, 6: 0.7})
+    assert resultado["best_k"] == 3 and resultado["best_score"] == 0.7
+
+
+def test_aproximado_con_muestra_completa_igual_a_referencia():
+    entrada = _entrada(4)
+    esperado = g.mejor_k_kmeans_referencia(**entrada)
+    obtenido = g.mejor_k_kmeans_aproximado(
+        **entrada, metodo="muestra", tamano_muestra=len(entrada["X"]), n_repeticiones=1, n_init=10
+    )
+    assert obtenido["best_k"] == esperado["best_k"]
+    for k, score in esperado["scores"].items():
+        assert obtenido["scores"][k] == pytest.approx(score, abs=1e-5)
+    assert obtenido["desacuerdo_estimado"] == 0.0
+
+
+def test_muestra_estratificada_conserva_estratos_chicos():
+    rng = np.random.default_rng(0)
+    etiquetas = np.r_[np.zeros(1_000, dtype=int), np.ones(3, dtype=int)]
+    idx = g.muestra_estratificada(etiquetas, 100, rng)
+    assert len(np.unique(idx)) == len(idx)
+    assert (etiquetas[idx] == 1).sum() == 2
+
+
+def test_reservorio_sin_llenar_guarda_todas_las_filas():
+    X = np.arange(30, dtype=float).reshape(10, 3)
+    reservorio = g.ReservorioFilas(20, np.random.default_rng(0))
+    for inicio in range(0, 10, 3):
+        reservorio.actualizar(X[inicio:inicio + 3])
+    np.testing.assert_array_equal(reservorio.muestra, X)
+    assert reservorio.vistos == 10
+
+
+def test_fuera_de_memoria_con_fragmentos_mas_chicos_que_k(tmp_path):
+    X = _entrada(5, size=400)["X"]
+    k_values = [2, 5, 8]
+
+    # Fragmentos de 3 filas: el primer partial_fit de cada k junta fragmentos hasta tener k filas
+    en_memoria = g.mejor_k_kmeans_fuera_de_memoria(X, k_values, tamano_fragmento=3, tamano_reserva=400)
+    assert en_memoria["n_filas"] == len(X)
+    assert en_memoria["best_k"] in k_values
+
+    # Shards .npy de tamaños desiguales: el primero tiene una sola fila
+    rutas = []
+    for i, (desde, hasta) in enumerate([(0, 1), (1, 200), (200, 400)]):
+        rutas.append(str(tmp_path / f"shard_{i}.npy"))
+        np.save(rutas[-1], X[desde:hasta])
+    desde_shards = g.mejor_k_kmeans_fuera_de_memoria(rutas, k_values, tamano_fragmento=3, tamano_reserva=400)
+    assert desde_shards["n_filas"] == len(X)
+    assert desde_shards["best_k"] in k_values
+
+
+def test_fuera_de_memoria_con_menos_filas_que_k():
+    with pytest.raises(ValueError):
+        g.mejor_k_kmeans_fuera_de_memoria(np.zeros((4, 2)), [2, 4])
+
+
+@pytest.mark.parametrize("size", [10, 11, 250, 1_001])
+def test_generador_size_exacto(size):
+    for seed in range(3):
+        assert len(g.generar_entrada_mejor_k_kmeans(size=size, seed=seed)["X"]) == size
+
+
+def test_generador_size_invalido():
+    with pytest.raises(ValueError):
+        g.generar_entrada_mejor_k_kmeans(size=9, seed=0)